@@ -2,7 +2,10 @@ import streamlit as st
 import warnings
 
 from config.settings import PAGE_CONFIG, CUSTOM_CSS
-from utils import load_data, create_loan_status_column
+from utils import start_model_warmup
+from utils.data_source import get_data_source
+from utils.profiling import profile_run, render_profile_overlay, stage
+from utils.report import get_report
 from components import (
     render_header,
     render_footer,
@@ -11,7 +14,8 @@ from components import (
     show_filtered_count,
     render_dashboard_tab,
     render_prediction_tab,
-    render_data_explorer_tab
+    render_data_explorer_tab,
+    render_projection_tab
 )
 
 warnings.filterwarnings('ignore')
@@ -31,30 +35,56 @@ st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 # MAIN APPLICATION
 # =============================================================================
 def main():
-    """Hàm chính chạy ứng dụng Streamlit."""
+    """Hàm chính chạy ứng dụng Streamlit (profile từng lần rerun nếu được bật)."""
+    with profile_run() as profile:
+        render_app()
+        render_profile_overlay(profile)
+
+
+def render_app():
+    """Render toàn bộ trang cho một lần rerun."""
+    
+    # Load model/scaler trên background thread, không chặn lần render đầu
+    start_model_warmup()
     
     # Header
     render_header()
     
-    # Load data
-    df = load_data()
-    
-    if df.empty:
-        st.error("❌ Không thể load dữ liệu. Vui lòng kiểm tra file financial_loan_clean.csv")
+    # Data source: CSV trong bộ nhớ hoặc database (SQLite/DuckDB)
+    try:
+        source = get_data_source()
+    except Exception as e:
+        st.error(f"❌ Không thể mở data source: {str(e)}")
         st.stop()
     
-    # Tạo cột loan_status từ one-hot encoding
-    df = create_loan_status_column(df)
-    
-    # Sidebar filters
-    filters = render_sidebar(df)
+    if source.in_memory:
+        df = source.load()
+        
+        if df.empty:
+            st.error(f"❌ Không thể load dữ liệu. Vui lòng kiểm tra file {source.url}")
+            st.stop()
+        
+        # Sidebar filters
+        filters = render_sidebar(df)
+    else:
+        df = None
+        filters = render_sidebar(None, source.filter_options())
     
     # Check for custom uploaded data
     if 'custom_df' in filters:
         df = filters['custom_df']
     
+    # Report tính sẵn chỉ áp dụng cho dataset chính (CSV) khi không lọc dòng nào
+    main_dataset = source.in_memory and 'custom_df' not in filters
+    
     # Apply filters
-    filtered_df = apply_filters(df, filters)
+    if not source.in_memory and 'custom_df' not in filters:
+        # Filter chạy trong database; df là mẫu dòng của tập lọc
+        with stage('source_view'):
+            filtered_df = df = source.view(filters)
+    else:
+        source = None
+        filtered_df = apply_filters(df, filters)
     
     # Check if filtered data is empty
     if len(filtered_df) == 0:
@@ -62,23 +92,32 @@ def main():
         st.stop()
     
     # Update sidebar with filtered count
-    show_filtered_count(len(filtered_df))
+    show_filtered_count(filtered_df.attrs.get('rows', len(filtered_df)))
     
-    # Main content tabs
-    tab1, tab2, tab3 = st.tabs([
+    # Main content tabs (chỉ tab đang mở được tính toán)
+    tab1, tab2, tab3, tab4 = st.tabs([
         "Dashboard",
         "AI Interest Rate Prediction",
-        "Data Explorer"
-    ])
+        "Data Explorer",
+        "Portfolio Projection"
+    ], key="active_tab", on_change="rerun")
+    
+    if tab1.open:
+        with tab1, stage('dashboard_tab'):
+            report = get_report(df, filtered_df) if main_dataset and len(filtered_df) == len(df) else None
+            render_dashboard_tab(df, filtered_df, report, source)
     
-    with tab1:
-        render_dashboard_tab(df, filtered_df)
+    if tab2.open:
+        with tab2, stage('prediction_tab'):
+            render_prediction_tab()
     
-    with tab2:
-        render_prediction_tab()
+    if tab3.open:
+        with tab3, stage('data_explorer_tab'):
+            render_data_explorer_tab(df, filtered_df, source)
     
-    with tab3:
-        render_data_explorer_tab(df, filtered_df)
+    if tab4.open:
+        with tab4, stage('projection_tab'):
+            render_projection_tab(df, filtered_df, source)
     
     # Footer
     render_footer()
@@ -0,0 +1,3 @@
+"""
+Benchmarks cho các đường xử lý nóng của dashboard.
+"""
@@ -0,0 +1,96 @@
+"""
+Benchmark: scaler.transform + XGBoost predict so với CompiledPredictor.
+
+Usage:
+    python -m benchmarks.inference --model xgb.joblib --scaler scaler.pkl
+"""
+
+import argparse
+import sys
+import time
+import warnings
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config.settings import MODEL_FEATURES
+from utils.fast_inference import CompiledPredictor
+
+
+BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000]
+
+
+def random_features(n_rows: int, seed: int = 42) -> np.ndarray:
+    """Ma trận feature ngẫu nhiên trên miền input của form dự đoán."""
+    rng = np.random.default_rng(seed)
+    verification = rng.integers(0, 3, n_rows)
+    return np.column_stack([
+        rng.integers(0, 101, n_rows) * 0.5,
+        rng.integers(1, 51, n_rows) * 1000,
+        rng.choice([36, 60], n_rows),
+        rng.integers(1, 36, n_rows),
+        verification == 1,
+        verification == 2,
+        rng.integers(0, 2, n_rows)
+    ]).astype(np.float64)
+
+
+def time_call(func: Callable[[], object], min_seconds: float = 0.2) -> float:
+    """Thời gian trung bình (giây) mỗi lần gọi, lặp tới khi đủ min_seconds."""
+    func()
+    repeats = 0
+    started = time.perf_counter()
+    while True:
+        func()
+        repeats += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return elapsed / repeats
+
+
+def run(model, scaler, batch_sizes: List[int] = BATCH_SIZES) -> List[Dict[str, float]]:
+    """
+    Đo latency hai đường dự đoán và độ lệch kết quả cho từng batch size.
+    """
+    predictor = CompiledPredictor.from_artifacts(model, scaler)
+    results = []
+    for n_rows in batch_sizes:
+        X = random_features(n_rows)
+        frame = pd.DataFrame(X, columns=MODEL_FEATURES)
+
+        reference = model.predict(scaler.transform(frame))
+        compiled = predictor.predict(X)
+
+        sklearn_s = time_call(lambda: model.predict(scaler.transform(pd.DataFrame(X, columns=MODEL_FEATURES))))
+        compiled_s = time_call(lambda: predictor.predict(X))
+        results.append({
+            'rows': n_rows,
+            'sklearn_xgb_ms': sklearn_s * 1e3,
+            'compiled_ms': compiled_s * 1e3,
+            'speedup': sklearn_s / compiled_s,
+            'max_abs_diff': float(np.max(np.abs(reference - compiled)))
+        })
+    return results
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark compiled inference")
+    parser.add_argument('--model', default='xgb.joblib')
+    parser.add_argument('--scaler', default='scaler.pkl')
+    args = parser.parse_args(argv)
+
+    import joblib
+    warnings.filterwarnings('ignore')
+    model = joblib.load(args.model)
+    scaler = joblib.load(args.scaler)
+
+    print(f"{'rows':>8} {'sklearn+xgb ms':>15} {'compiled ms':>12} {'speedup':>8} {'max diff':>10}")
+    for r in run(model, scaler):
+        print(f"{r['rows']:>8,} {r['sklearn_xgb_ms']:>15.3f} {r['compiled_ms']:>12.3f} "
+              f"{r['speedup']:>7.1f}x {r['max_abs_diff']:>10.2e}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+Bộ benchmark tái lập được cho các stage chính của dashboard trên sổ khoản
+vay giả lập, kết quả ghi ra JSON để so sánh giữa các commit.
+
+Usage:
+    python -m benchmarks.suite --rows 10000 100000 1000000 -o bench.json
+    python -m benchmarks.suite --rows 100000 -o new.json --compare bench.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import write_loan_book
+
+
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+
+# Bộ filter điển hình của sidebar
+BENCH_FILTERS = {
+    'grades': ['A', 'B', 'C'],
+    'states': None,
+    'regions': ['West', 'South'],
+    'amount_range': (5_000, 25_000),
+    'rate_range': (0.05, 0.20),
+}
+
+# Tỉ lệ chậm hơn baseline bị đánh dấu là regression khi so sánh
+REGRESSION_RATIO = 1.2
+
+
+def measure(func: Callable[[], Any], repeats: int = 3) -> Dict[str, float]:
+    """Chạy func `repeats` lần, trả thời gian min/median (giây)."""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {'min_s': min(timings), 'median_s': float(np.median(timings)), 'repeats': repeats}
+
+
+def dataset_path(data_dir: str, n_rows: int, seed: int) -> str:
+    """CSV giả lập n_rows dòng (sinh một lần, dùng lại giữa các lần chạy)."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"loans_{n_rows}_s{seed}.csv")
+    if not os.path.exists(path):
+        write_loan_book(path, n_rows, seed)
+    return path
+
+
+def _load_model(model_path: str, scaler_path: str):
+    try:
+        import joblib
+        return joblib.load(model_path), joblib.load(scaler_path)
+    except (ImportError, OSError):
+        return None, None
+
+
+def scenarios(path: str, model=None, scaler=None) -> Dict[str, Callable[[], Any]]:
+    """
+    Các scenario cho một file dữ liệu, theo thứ tự chạy.
+
+    Mỗi scenario dùng dữ liệu đã chuẩn bị sẵn; cache kết quả lọc được xoá
+    trước mỗi lần gọi để đo đúng chi phí tính lại.
+    """
+    from charts import visualizations as charts
+    from utils.amortization import portfolio_cash_flows
+    from utils.projection import grade_charge_off_rates, portfolio_projection
+    from components.sidebar import apply_filters
+    from utils.batch_scoring import score_frame
+    from utils.cube import AggregationCube
+    from utils.data_loader import get_cache_path, load_data_uncached
+    from utils.filter_engine import FilterEngine, get_filter_cache, get_filter_options
+    from utils.helpers import create_loan_status_column
+
+    def load_cold():
+        if os.path.exists(get_cache_path(path)):
+            os.remove(get_cache_path(path))
+        return load_data_uncached(path)
+
+    df = load_data_uncached(path)
+    raw = df.drop(columns='loan_status')
+    filtered = apply_filters(df, BENCH_FILTERS)
+    cube = AggregationCube.from_frame(filtered)
+    rate_range = get_filter_options(df)['rate_range']
+    cache = get_filter_cache()
+
+    def uncached(func: Callable[[], Any]) -> Callable[[], Any]:
+        def run():
+            cache.clear()
+            return func()
+        return run
+
+    result = {
+        'load_data_cold': load_cold,
+        'load_data_warm': lambda: load_data_uncached(path),
+        'create_loan_status_column': lambda: create_loan_status_column(raw),
+        'filter_engine_build': lambda: FilterEngine(df),
+        'apply_filters': uncached(lambda: apply_filters(df, BENCH_FILTERS)),
+        'cube_build': lambda: AggregationCube.from_frame(filtered),
+        'chart_grade_distribution': lambda: charts.create_grade_distribution_chart(filtered, cube),
+        'chart_status_pie': lambda: charts.create_status_pie_chart(filtered, cube),
+        'chart_purpose': lambda: charts.create_purpose_chart(filtered, cube),
+        'chart_region': lambda: charts.create_region_map(filtered, cube),
+        'chart_interest_rate_histogram': uncached(
+            lambda: charts.create_interest_rate_histogram(filtered, rate_range)
+        ),
+        'chart_scatter': uncached(lambda: charts.create_scatter_plot(filtered)),
+        'portfolio_cash_flows': lambda: portfolio_cash_flows(df),
+        'portfolio_projection': lambda: portfolio_projection(filtered, grade_charge_off_rates(cube), 0.1),
+    }
+    if model is not None and scaler is not None:
+        result['batch_prediction'] = lambda: score_frame(df, model, scaler)
+    return result
+
+
+def run_suite(rows: List[int], data_dir: str, seed: int = 42, repeats: int = 3,
+              only: Optional[List[str]] = None, model=None, scaler=None) -> List[Dict[str, Any]]:
+    """
+    Chạy mọi scenario cho từng kích thước dữ liệu.
+
+    Returns:
+        Danh sách kết quả {'scenario', 'rows', 'min_s', 'median_s', 'repeats'}
+    """
+    results = []
+    for n_rows in rows:
+        path = dataset_path(data_dir, n_rows, seed)
+        for name, func in scenarios(path, model, scaler).items():
+            if only and name not in only:
+                continue
+            timing = measure(func, repeats)
+            results.append({'scenario': name, 'rows': n_rows, **timing})
+            print(f"{n_rows:>10,} {name:<32} {timing['min_s'] * 1e3:>10.1f} ms", flush=True)
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return subprocess.run(['git', '-C', root, 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(seed: int) -> Dict[str, Any]:
+    """Thông tin môi trường đi kèm kết quả (commit, phiên bản thư viện)."""
+    return {
+        'commit': _git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'seed': seed,
+    }
+
+
+def compare(current: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+            threshold: float = REGRESSION_RATIO) -> List[Dict[str, Any]]:
+    """
+    So sánh min_s với baseline cho các cặp (scenario, rows) có ở cả hai.
+
+    Returns:
+        Danh sách {'scenario', 'rows', 'baseline_s', 'current_s', 'ratio', 'regression'}
+    """
+    base = {(r['scenario'], r['rows']): r['min_s'] for r in baseline}
+    rows = []
+    for r in current:
+        key = (r['scenario'], r['rows'])
+        if key not in base:
+            continue
+        ratio = r['min_s'] / base[key] if base[key] > 0 else float('inf')
+        rows.append({'scenario': key[0], 'rows': key[1], 'baseline_s': base[key],
+                     'current_s': r['min_s'], 'ratio': ratio, 'regression': ratio > threshold})
+    return rows
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Entry point CLI."""
+    parser = argparse.ArgumentParser(description="Benchmark dashboard hot paths on synthetic data")
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('-o', '--output', help="Write results as JSON")
+    parser.add_argument('--compare', help="Baseline JSON to compare against")
+    parser.add_argument('--scenarios', nargs='+', help="Run only these scenarios")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', default=os.path.join('benchmarks', 'data'))
+    parser.add_argument('--model', default='xgb.joblib')
+    parser.add_argument('--scaler', default='scaler.pkl')
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore')
+    # Cache của Streamlit chạy ngoài `streamlit run` sẽ log cảnh báo ở mỗi lần gọi
+    from streamlit.logger import set_log_level
+    set_log_level(logging.ERROR)
+
+    model, scaler = _load_model(args.model, args.scaler)
+    if model is None:
+        print("Model/scaler not found, skipping batch_prediction", file=sys.stderr)
+
+    results = run_suite(args.rows, args.data_dir, args.seed, args.repeats, args.scenarios, model, scaler)
+    report = {'meta': metadata(args.seed), 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results -> {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        diffs = compare(results, baseline['results'])
+        print(f"\nvs {args.compare} (commit {baseline['meta'].get('commit')})")
+        for d in diffs:
+            flag = '  REGRESSION' if d['regression'] else ''
+            print(f"{d['rows']:>10,} {d['scenario']:<32} {d['baseline_s'] * 1e3:>9.1f} -> "
+                  f"{d['current_s'] * 1e3:>9.1f} ms ({d['ratio']:.2f}x){flag}")
+        if any(d['regression'] for d in diffs):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Sinh sổ khoản vay giả lập (cùng schema với financial_loan_clean.csv) cho
+benchmark, từ 10k tới 10M dòng, ghi theo chunk nên bộ nhớ không phụ thuộc
+số dòng.
+
+Usage:
+    python -m benchmarks.synthetic 1000000 -o loans_1m.csv
+"""
+
+import argparse
+import sys
+import time
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from config.settings import GRADE_ORDER, LOAN_STATUS_ORDER, PURPOSE_OPTIONS
+
+
+STATE_REGIONS = {
+    'CT': 'Northeast', 'ME': 'Northeast', 'MA': 'Northeast', 'NH': 'Northeast', 'RI': 'Northeast',
+    'VT': 'Northeast', 'NJ': 'Northeast', 'NY': 'Northeast', 'PA': 'Northeast',
+    'IL': 'Midwest', 'IN': 'Midwest', 'MI': 'Midwest', 'OH': 'Midwest', 'WI': 'Midwest', 'IA': 'Midwest',
+    'KS': 'Midwest', 'MN': 'Midwest', 'MO': 'Midwest', 'NE': 'Midwest', 'ND': 'Midwest', 'SD': 'Midwest',
+    'DE': 'South', 'FL': 'South', 'GA': 'South', 'MD': 'South', 'NC': 'South', 'SC': 'South', 'VA': 'South',
+    'DC': 'South', 'WV': 'South', 'AL': 'South', 'KY': 'South', 'MS': 'South', 'TN': 'South', 'AR': 'South',
+    'LA': 'South', 'OK': 'South', 'TX': 'South',
+    'AZ': 'West', 'CO': 'West', 'ID': 'West', 'MT': 'West', 'NV': 'West', 'NM': 'West', 'UT': 'West',
+    'WY': 'West', 'AK': 'West', 'CA': 'West', 'HI': 'West', 'OR': 'West', 'WA': 'West',
+}
+
+GRADE_WEIGHTS = [0.25, 0.30, 0.20, 0.13, 0.07, 0.04, 0.01]
+STATUS_WEIGHTS = [0.14, 0.03, 0.83]
+VERIFICATION_STATUSES = ['Verified', 'Not Verified', 'Source Verified']
+
+# Cột one-hot purpose: 'Debt consolidation' -> purpose_debt (feature của model)
+PURPOSE_COLUMNS = {
+    purpose: 'purpose_debt' if purpose == 'Debt consolidation'
+    else 'purpose_' + purpose.lower().replace(' ', '_')
+    for purpose in PURPOSE_OPTIONS
+}
+
+DEFAULT_CHUNK_ROWS = 500_000
+
+
+def generate_chunk(n_rows: int, seed: int = 42, chunk_index: int = 0, start_id: int = 1) -> pd.DataFrame:
+    """
+    Sinh một chunk khoản vay; cùng (seed, chunk_index) luôn cho cùng dữ liệu.
+
+    Lãi suất tăng theo grade, installment/total_payment tính từ amount,
+    lãi suất và kỳ hạn như dữ liệu thật.
+    """
+    rng = np.random.default_rng([seed, chunk_index])
+    grades = np.array(GRADE_ORDER)
+    states = np.array(list(STATE_REGIONS))
+
+    grade_index = rng.choice(len(grades), n_rows, p=GRADE_WEIGHTS)
+    sub_grade = rng.integers(1, 6, n_rows)
+    state = states[rng.integers(0, len(states), n_rows)]
+
+    int_rate = 0.055 + grade_index * 0.03 + sub_grade * 0.005 + rng.normal(0, 0.005, n_rows)
+    int_rate = np.round(np.clip(int_rate, 0.05, 0.30), 4)
+    loan_amount = (rng.integers(2, 71, n_rows) * 500).astype(np.float64)
+    term_months = rng.choice([36, 60], n_rows, p=[0.73, 0.27])
+    monthly_rate = int_rate / 12
+    installment = np.round(loan_amount * monthly_rate / (1 - (1 + monthly_rate) ** -term_months), 2)
+
+    df = pd.DataFrame({
+        'id': np.arange(start_id, start_id + n_rows),
+        'address_state': state,
+        'region': pd.Series(state).map(STATE_REGIONS).to_numpy(),
+        'grade': grades[grade_index],
+        'sub_grade': np.char.add(grades[grade_index], sub_grade.astype(str)),
+        'issue_date': (np.datetime64('2021-01-01') + rng.integers(0, 365, n_rows).astype('timedelta64[D]')),
+        'loan_amount': loan_amount,
+        'int_rate': int_rate,
+        'annual_income': np.round(rng.lognormal(11.0, 0.5, n_rows), 2),
+        'dti': np.round(rng.uniform(0, 0.3, n_rows), 4),
+        'term_months': term_months,
+        'installment': installment,
+        'total_payment': np.round(installment * term_months * rng.uniform(0.3, 1.0, n_rows)),
+    })
+
+    def one_hot(prefix_columns, labels, weights=None):
+        picked = rng.choice(len(labels), n_rows, p=weights)
+        for i, column in enumerate(prefix_columns):
+            df[column] = (picked == i).astype(np.int64)
+
+    one_hot(['loan_status_' + s for s in LOAN_STATUS_ORDER], LOAN_STATUS_ORDER, STATUS_WEIGHTS)
+    one_hot(list(PURPOSE_COLUMNS.values()), PURPOSE_OPTIONS)
+    one_hot(['verification_status_' + v for v in VERIFICATION_STATUSES], VERIFICATION_STATUSES)
+    return df
+
+
+def iter_loan_book(n_rows: int, seed: int = 42, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Sinh sổ khoản vay n_rows dòng theo từng chunk."""
+    for index, start in enumerate(range(0, n_rows, chunk_rows)):
+        yield generate_chunk(min(chunk_rows, n_rows - start), seed, index, start_id=start + 1)
+
+
+def generate_loan_book(n_rows: int, seed: int = 42, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> pd.DataFrame:
+    """Sổ khoản vay n_rows dòng trong bộ nhớ."""
+    return pd.concat(iter_loan_book(n_rows, seed, chunk_rows), ignore_index=True)
+
+
+def write_loan_book(path: str, n_rows: int, seed: int = 42, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> int:
+    """
+    Ghi sổ khoản vay ra CSV theo từng chunk.
+
+    Returns:
+        Số dòng đã ghi
+    """
+    total = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        for chunk in iter_loan_book(n_rows, seed, chunk_rows):
+            chunk.to_csv(f, index=False, header=(total == 0), date_format='%Y-%m-%d')
+            total += len(chunk)
+    return total
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Entry point CLI."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic loan book CSV")
+    parser.add_argument('rows', type=int, help="Number of loans")
+    parser.add_argument('-o', '--output', required=True)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    total = write_loan_book(args.output, args.rows, args.seed, args.chunk_rows)
+    print(f"Wrote {total:,} loans in {time.perf_counter() - started:.2f}s -> {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,7 +6,9 @@ from .visualizations import (
     create_region_map,
     create_scatter_plot,
     create_rate_gauge,
-    create_rate_comparison_chart
+    create_rate_comparison_chart,
+    create_amortization_chart,
+    create_cash_flow_projection_chart
 )
 
 __all__ = [
@@ -17,5 +19,7 @@ __all__ = [
     'create_region_map',
     'create_scatter_plot',
     'create_rate_gauge',
-    'create_rate_comparison_chart'
+    'create_rate_comparison_chart',
+    'create_amortization_chart',
+    'create_cash_flow_projection_chart'
 ]
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Cache figure Plotly theo tên biểu đồ + fingerprint input, kèm thống kê thời
+gian dựng và kích thước JSON của từng biểu đồ.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable
+
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+
+from config.settings import FIGURE_CACHE_MAX_MB
+from utils.cache import BoundedLRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class FigureCache(BoundedLRUCache):
+    """
+    LRU cache figure, ngân sách tính theo kích thước JSON đã serialize.
+
+    Mỗi lần dựng mới được ghi log (thời gian dựng, số KB gửi xuống trình
+    duyệt) và cộng vào thống kê theo tên biểu đồ.
+    """
+
+    def __init__(self, max_bytes: int):
+        super().__init__(max_bytes, sizeof=lambda entry: entry[1])
+        self._chart_stats: Dict[str, Dict[str, Any]] = {}
+        self._stats_lock = threading.Lock()
+
+    def _record(self, name: str, **values: Any) -> None:
+        with self._stats_lock:
+            stats = self._chart_stats.setdefault(
+                name, {'builds': 0, 'hits': 0, 'build_ms': 0.0, 'json_bytes': 0}
+            )
+            for field, value in values.items():
+                stats[field] = stats[field] + value if field in ('builds', 'hits') else value
+
+    def figure(self, name: str, key: Hashable, build: Callable[[], go.Figure]) -> go.Figure:
+        """
+        Figure đã cache cho (name, key), hoặc dựng mới bằng `build`.
+
+        Figure trả về được dùng chung giữa các session nên không được sửa.
+        """
+        entry = self.get((name, key))
+        if entry is not None:
+            self._record(name, hits=1)
+            return entry[0]
+
+        started = time.perf_counter()
+        fig = build()
+        build_ms = (time.perf_counter() - started) * 1000
+        json_bytes = len(fig.to_json())
+        logger.info("Built figure %s in %.1f ms (%.1f KB JSON)", name, build_ms, json_bytes / 1024)
+
+        self._record(name, builds=1, build_ms=build_ms, json_bytes=json_bytes)
+        self.put((name, key), (fig, json_bytes))
+        return fig
+
+    def chart_stats(self) -> pd.DataFrame:
+        """Thống kê theo biểu đồ: số lần dựng/hit, thời gian và kích thước lần dựng gần nhất."""
+        with self._stats_lock:
+            rows = {name: dict(stats) for name, stats in self._chart_stats.items()}
+        columns = ['builds', 'hits', 'build_ms', 'json_bytes']
+        return pd.DataFrame.from_dict(rows, orient='index', columns=columns).sort_values(
+            'json_bytes', ascending=False
+        )
+
+
+@st.cache_resource
+def get_figure_cache() -> FigureCache:
+    """Cache figure dùng chung cho mọi session."""
+    return FigureCache(max_bytes=FIGURE_CACHE_MAX_MB * 1024 * 1024)
+
+
+def cached_figure(name: str, key: Hashable, build: Callable[[], go.Figure]) -> go.Figure:
+    """Lấy figure `name` cho input `key` từ cache dùng chung (dựng nếu chưa có)."""
+    return get_figure_cache().figure(name, key, build)
@@ -2,24 +2,36 @@
 Visualization functions cho các biểu đồ Plotly.
 """
 
+from typing import Dict, Any, Optional, Tuple
+
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
-from config.settings import GRADE_ORDER, STATUS_COLORS
+from config.settings import GRADE_ORDER, STATUS_COLORS, SCATTER_WEBGL_MAX_POINTS, SCATTER_DENSITY_BINS
+from utils.cube import AggregationCube, grid_edges
+from utils.density import get_density_grid, get_histogram
+from utils.filter_engine import RANGE_STEPS
+from utils.profiling import profiled
+
 
+def _resolve_cube(df: pd.DataFrame, cube: Optional[AggregationCube]) -> AggregationCube:
+    """Dùng cube được truyền vào, hoặc dựng cube từ df khi gọi độc lập."""
+    return cube if cube is not None else AggregationCube.from_frame(df)
 
-def create_grade_distribution_chart(df: pd.DataFrame) -> go.Figure:
+
+@profiled()
+def create_grade_distribution_chart(df: pd.DataFrame, cube: Optional[AggregationCube] = None) -> go.Figure:
     """Tạo biểu đồ phân bố theo Grade."""
     if 'grade' not in df.columns:
         return go.Figure()
     
-    grade_data = df.groupby('grade').agg({
-        'loan_amount': ['sum', 'mean', 'count'],
-        'int_rate': 'mean'
-    }).round(2)
+    grade_data = _resolve_cube(df, cube).rollup('grade')
+    grade_data = grade_data[[
+        'loan_amount_sum', 'loan_amount_mean', 'loan_amount_count', 'int_rate_mean'
+    ]].round(2)
     
     grade_data.columns = ['Total_Volume', 'Avg_Loan', 'Count', 'Avg_Interest']
     grade_data = grade_data.reset_index()
@@ -71,20 +83,22 @@ def create_grade_distribution_chart(df: pd.DataFrame) -> go.Figure:
     return fig
 
 
-def create_purpose_chart(df: pd.DataFrame) -> go.Figure:
+@profiled()
+def create_purpose_chart(df: pd.DataFrame, cube: Optional[AggregationCube] = None) -> go.Figure:
     """Tạo biểu đồ phân bố theo Purpose."""
     purpose_cols = [col for col in df.columns if col.startswith('purpose_')]
     
     if not purpose_cols:
         return go.Figure()
     
+    purpose_rollup = _resolve_cube(df, cube).rollup('purpose')
     purpose_data = []
-    for col in purpose_cols:
-        purpose_name = col.replace('purpose_', '').replace('_', ' ').title()
-        count = df[col].sum()
-        if count > 0:
-            avg_amount = df[df[col] == 1]['loan_amount'].mean() if 'loan_amount' in df.columns else 0
-            purpose_data.append({'Purpose': purpose_name, 'Count': count, 'Avg_Amount': avg_amount})
+    for purpose, row in purpose_rollup.iterrows():
+        if 'purpose_' + purpose not in purpose_cols or row['count'] <= 0:
+            continue
+        purpose_name = purpose.replace('_', ' ').title()
+        avg_amount = row['loan_amount_mean'] if 'loan_amount_mean' in row.index else 0
+        purpose_data.append({'Purpose': purpose_name, 'Count': int(row['count']), 'Avg_Amount': avg_amount})
     
     if not purpose_data:
         return go.Figure()
@@ -115,12 +129,15 @@ def create_purpose_chart(df: pd.DataFrame) -> go.Figure:
     return fig
 
 
-def create_status_pie_chart(df: pd.DataFrame) -> go.Figure:
+@profiled()
+def create_status_pie_chart(df: pd.DataFrame, cube: Optional[AggregationCube] = None) -> go.Figure:
     """Tạo biểu đồ tròn cho Loan Status."""
     if 'loan_status' not in df.columns:
         return go.Figure()
     
-    status_counts = df['loan_status'].value_counts()
+    cube = _resolve_cube(df, cube)
+    status_counts = cube.rollup('loan_status')['count'].sort_values(ascending=False)
+    status_counts = status_counts[status_counts > 0]
     
     fig = go.Figure(data=[go.Pie(
         labels=status_counts.index,
@@ -136,44 +153,69 @@ def create_status_pie_chart(df: pd.DataFrame) -> go.Figure:
         title=dict(text="Loan Status Distribution", font=dict(size=20, color='#333'), x=0.5),
         template="plotly_white",
         height=400,
-        annotations=[dict(text=f'{len(df):,}<br>Total', x=0.5, y=0.5, font_size=16, showarrow=False)]
+        annotations=[dict(text=f'{cube.total_count:,}<br>Total', x=0.5, y=0.5, font_size=16, showarrow=False)]
     )
     
     return fig
 
 
-def create_interest_rate_histogram(df: pd.DataFrame) -> go.Figure:
-    """Tạo histogram cho Interest Rate theo Grade."""
+@profiled()
+def create_interest_rate_histogram(df: pd.DataFrame, rate_range: Optional[Tuple[float, float]] = None,
+                                   hist: Optional[Dict[str, Any]] = None) -> go.Figure:
+    """
+    Tạo histogram cho Interest Rate theo Grade.
+
+    Số đếm được tính trên server (một bar trace mỗi grade), mỗi bin là một
+    bước của slider lãi suất tính từ đầu `rate_range` (mặc định khoảng lãi
+    suất của df), nên kích thước figure không phụ thuộc số dòng. `hist`
+    (vd. từ cube.get_view_histogram) thay cho việc đếm trên các dòng của df.
+    """
     if 'int_rate' not in df.columns or 'grade' not in df.columns:
         return go.Figure()
     
-    fig = px.histogram(
-        df, x='int_rate', color='grade', nbins=50,
-        title="Interest Rate Distribution by Grade",
-        labels={'int_rate': 'Interest Rate', 'grade': 'Grade'},
-        color_discrete_sequence=px.colors.qualitative.Set2,
-        opacity=0.7
-    )
+    if hist is None:
+        if rate_range is None:
+            rate_range = (float(df['int_rate'].min()), float(df['int_rate'].max()))
+        edges = grid_edges(rate_range[0], RANGE_STEPS['rate_range'], rate_range[1])
+        hist = get_histogram(df, 'int_rate', edges, by='grade')
+    edges = hist['edges']
+    centers = (edges[:-1] + edges[1:]) / 2
+    
+    groups = sorted(hist['groups'], key=lambda g: GRADE_ORDER.index(g) if g in GRADE_ORDER else len(GRADE_ORDER))
+    palette = px.colors.qualitative.Set2
+    
+    fig = go.Figure()
+    for i, grade in enumerate(groups):
+        counts = hist['counts'][hist['groups'].index(grade)]
+        if not counts.any():
+            continue
+        fig.add_trace(go.Bar(
+            x=centers, y=counts, width=edges[1] - edges[0],
+            name=str(grade),
+            marker_color=palette[i % len(palette)],
+            opacity=0.7,
+            hovertemplate='Grade ' + str(grade) + '<br>Interest Rate: %{x:.2%}<br>Count: %{y:,}<extra></extra>'
+        ))
     
     fig.update_layout(
+        title=dict(text="Interest Rate Distribution by Grade"),
         template="plotly_white", height=400,
         xaxis_title="Interest Rate", yaxis_title="Count",
-        legend_title="Grade", barmode='overlay'
+        legend_title="Grade", barmode='overlay', bargap=0
     )
     fig.update_xaxes(tickformat='.1%')
     
     return fig
 
 
-def create_region_map(df: pd.DataFrame) -> go.Figure:
+@profiled()
+def create_region_map(df: pd.DataFrame, cube: Optional[AggregationCube] = None) -> go.Figure:
     """Tạo biểu đồ phân bố theo Region."""
     if 'region' not in df.columns:
         return go.Figure()
     
-    region_data = df.groupby('region').agg({
-        'loan_amount': ['sum', 'count'],
-        'int_rate': 'mean'
-    }).round(4)
+    region_data = _resolve_cube(df, cube).rollup('region')
+    region_data = region_data[['loan_amount_sum', 'loan_amount_count', 'int_rate_mean']].round(4)
     
     region_data.columns = ['Total_Volume', 'Count', 'Avg_Interest']
     region_data = region_data.reset_index()
@@ -198,21 +240,31 @@ def create_region_map(df: pd.DataFrame) -> go.Figure:
     return fig
 
 
-def create_scatter_plot(df: pd.DataFrame) -> go.Figure:
-    """Tạo scatter plot Income vs Loan Amount."""
+@profiled()
+def create_scatter_plot(df: pd.DataFrame, max_points: int = SCATTER_WEBGL_MAX_POINTS) -> go.Figure:
+    """
+    Tạo scatter plot Income vs Loan Amount.
+
+    Tới `max_points` dòng: vẽ mọi điểm bằng WebGL (Scattergl). Nhiều hơn:
+    vẽ mật độ theo lưới 2D tính sẵn trên server, mỗi ô tô màu theo grade
+    chiếm đa số, độ đậm theo số khoản vay.
+    """
     if 'annual_income' not in df.columns or 'loan_amount' not in df.columns:
         return go.Figure()
     
-    sample_df = df.sample(n=min(1000, len(df)), random_state=42)
+    if len(df) > max_points:
+        return _create_density_plot(df)
     
     fig = px.scatter(
-        sample_df, x='annual_income', y='loan_amount',
-        color='grade' if 'grade' in sample_df.columns else None,
-        size='int_rate' if 'int_rate' in sample_df.columns else None,
+        df, x='annual_income', y='loan_amount',
+        color='grade' if 'grade' in df.columns else None,
+        size='int_rate' if 'int_rate' in df.columns else None,
         title="Annual Income vs Loan Amount",
         labels={'annual_income': 'Annual Income ($)', 'loan_amount': 'Loan Amount ($)', 'grade': 'Grade', 'int_rate': 'Interest Rate'},
+        category_orders={'grade': GRADE_ORDER},
         color_discrete_sequence=px.colors.qualitative.Set2,
-        opacity=0.6
+        opacity=0.6,
+        render_mode='webgl'
     )
     
     fig.update_layout(
@@ -224,6 +276,59 @@ def create_scatter_plot(df: pd.DataFrame) -> go.Figure:
     return fig
 
 
+def _create_density_plot(df: pd.DataFrame) -> go.Figure:
+    """Heatmap mật độ Income vs Loan Amount, một trace cho mỗi grade."""
+    by = 'grade' if 'grade' in df.columns else None
+    grid = get_density_grid(df, 'annual_income', 'loan_amount', by, SCATTER_DENSITY_BINS)
+    counts = grid['counts']
+    total = counts.sum(axis=0)
+    dominant = counts.argmax(axis=0)
+    filled = total > 0
+    
+    x_centers = (grid['x_edges'][:-1] + grid['x_edges'][1:]) / 2
+    y_centers = (grid['y_edges'][:-1] + grid['y_edges'][1:]) / 2
+    z_all = np.log10(np.where(filled, total, 1))
+    z_max = max(float(z_all.max()), 1.0)
+    
+    palette = px.colors.qualitative.Set2
+    groups = grid['groups']
+    if by is not None:
+        groups = sorted(groups, key=lambda g: GRADE_ORDER.index(g) if g in GRADE_ORDER else len(GRADE_ORDER))
+    
+    fig = go.Figure()
+    for i, group in enumerate(groups):
+        g = grid['groups'].index(group)
+        cells = filled & (dominant == g)
+        if not cells.any():
+            continue
+        share = np.divide(counts[g], total, out=np.zeros(total.shape), where=filled)
+        text = np.char.add(np.char.add(total.astype(str), ' loans · '),
+                           np.char.add(np.round(share * 100).astype(int).astype(str), f'% grade {group}'))
+        rgb = palette[i % len(palette)][4:-1]
+        fig.add_trace(go.Heatmap(
+            x=x_centers, y=y_centers,
+            # Heatmap nhận z theo (y, x)
+            z=np.where(cells, z_all, np.nan).T,
+            text=text.T,
+            zmin=0, zmax=z_max,
+            colorscale=[[0, f'rgba({rgb}, 0.2)'], [1, f'rgba({rgb}, 1)']],
+            showscale=False,
+            name=f"Grade {group}" if by is not None else "Loans",
+            showlegend=by is not None,
+            hovertemplate='Income: $%{x:,.0f}<br>Loan: $%{y:,.0f}<br>%{text}<extra></extra>'
+        ))
+    
+    fig.update_layout(
+        title=dict(text=f"Annual Income vs Loan Amount (density of {int(total.sum()):,} loans)"),
+        template="plotly_white", height=450,
+        xaxis=dict(title='Annual Income ($)', tickformat='$,.0f'),
+        yaxis=dict(title='Loan Amount ($)', tickformat='$,.0f'),
+        legend_title="Dominant grade" if by is not None else None
+    )
+    
+    return fig
+
+
 def create_rate_gauge(rate: float, color: str) -> go.Figure:
     """Tạo gauge chart cho Interest Rate prediction."""
     fig = go.Figure(go.Indicator(
@@ -284,4 +389,100 @@ def create_rate_comparison_chart(predicted_rate: float, grade: str) -> go.Figure
         showlegend=False
     )
     
-    return fig
\ No newline at end of file
+    return fig
+
+
+def create_amortization_chart(schedule: pd.DataFrame, title: str = "Payment Schedule") -> go.Figure:
+    """
+    Biểu đồ lịch trả nợ: gốc + lãi mỗi tháng (cột chồng) và dư nợ (đường).
+
+    Args:
+        schedule: DataFrame index tháng, cột 'principal', 'interest', 'balance'
+            (utils.amortization.loan_schedule / portfolio_cash_flows)
+    """
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    months = schedule.index.to_numpy()
+
+    for column, name, color in (('principal', "Principal", '#667eea'), ('interest', "Interest", '#f5576c')):
+        fig.add_trace(
+            go.Bar(
+                x=months, y=schedule[column].to_numpy(), name=name, marker_color=color,
+                hovertemplate=f'Month %{{x}}<br>{name}: $%{{y:,.2f}}<extra></extra>'
+            ),
+            secondary_y=False
+        )
+
+    fig.add_trace(
+        go.Scatter(
+            x=months, y=schedule['balance'].to_numpy(), name="Remaining Balance",
+            mode='lines', line=dict(color='#38ef7d', width=3),
+            hovertemplate='Month %{x}<br>Balance: $%{y:,.2f}<extra></extra>'
+        ),
+        secondary_y=True
+    )
+
+    fig.update_layout(
+        title=dict(text=title, font=dict(size=20, color='#333'), x=0.5),
+        xaxis_title="Month",
+        barmode='stack',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        template="plotly_white",
+        height=400,
+        hovermode='x unified'
+    )
+    fig.update_yaxes(title_text="Monthly Payment ($)", secondary_y=False)
+    fig.update_yaxes(title_text="Balance ($)", secondary_y=True, rangemode='tozero')
+
+    return fig
+
+
+def create_cash_flow_projection_chart(monthly: pd.DataFrame, as_of: Optional[pd.Timestamp] = None) -> go.Figure:
+    """
+    Biểu đồ dòng tiền dự phóng của các khoản vay còn dư nợ theo tháng: gốc,
+    lãi, thu hồi (cột chồng dương), tổn thất (cột âm) và dư nợ kỳ vọng (đường).
+
+    Args:
+        monthly: DataFrame index tháng sau ngày chốt, từ utils.projection
+        as_of: Ngày chốt số liệu (hiện trên trục tháng)
+    """
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    months = monthly.index.to_numpy()
+
+    series = (
+        ('principal', "Principal", '#667eea', 1),
+        ('interest', "Interest", '#38ef7d', 1),
+        ('recovery', "Recovery", '#feca57', 1),
+        ('loss', "Projected Loss", '#f5576c', -1),
+    )
+    for column, name, color, sign in series:
+        fig.add_trace(
+            go.Bar(
+                x=months, y=sign * monthly[column].to_numpy(), name=name, marker_color=color,
+                customdata=monthly[column].to_numpy(),
+                hovertemplate=f'Month %{{x}}<br>{name}: $%{{customdata:,.0f}}<extra></extra>'
+            ),
+            secondary_y=False
+        )
+
+    fig.add_trace(
+        go.Scatter(
+            x=months, y=monthly['balance'].to_numpy(), name="Projected Balance",
+            mode='lines', line=dict(color='#333', width=2, dash='dot'),
+            hovertemplate='Month %{x}<br>Balance: $%{y:,.0f}<extra></extra>'
+        ),
+        secondary_y=True
+    )
+
+    fig.update_layout(
+        title=dict(text="Projected Monthly Cash Flows of Outstanding Loans", font=dict(size=20, color='#333'), x=0.5),
+        xaxis_title=f"Months after {as_of:%b %Y}" if as_of is not None else "Month",
+        barmode='relative',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        template="plotly_white",
+        height=450,
+        hovermode='x unified'
+    )
+    fig.update_yaxes(title_text="Cash Flow ($)", secondary_y=False)
+    fig.update_yaxes(title_text="Outstanding Balance ($)", secondary_y=True, rangemode='tozero')
+
+    return fig
@@ -1,7 +1,7 @@
 from .header import render_header, render_footer
 from .sidebar import render_sidebar, apply_filters, show_filtered_count
 from .kpi_metrics import render_kpi_metrics
-from .tabs import render_dashboard_tab, render_prediction_tab, render_data_explorer_tab
+from .tabs import render_dashboard_tab, render_prediction_tab, render_data_explorer_tab, render_projection_tab
 
 __all__ = [
     'render_header',
@@ -12,5 +12,6 @@ __all__ = [
     'render_kpi_metrics',
     'render_dashboard_tab',
     'render_prediction_tab',
-    'render_data_explorer_tab'
+    'render_data_explorer_tab',
+    'render_projection_tab'
 ]
\ No newline at end of file
@@ -4,54 +4,56 @@ KPI Metrics component.
 
 import streamlit as st
 import pandas as pd
+from typing import Dict, Any, Optional
 
+from utils.filter_engine import get_view_kpis
 
-def render_kpi_metrics(df: pd.DataFrame, filtered_df: pd.DataFrame):
-    """Hiển thị các KPI metrics chính."""
+
+def render_kpi_metrics(df: pd.DataFrame, filtered_df: pd.DataFrame, kpis: Optional[Dict[str, Any]] = None):
+    """Hiển thị các KPI metrics chính (tính từ filtered_df nếu không truyền kpis)."""
+    if kpis is None:
+        kpis = get_view_kpis(filtered_df)
     col1, col2, col3, col4 = st.columns(4)
-    
+
     # Total Loan Volume
-    total_volume = filtered_df['loan_amount'].sum() if 'loan_amount' in filtered_df.columns else 0
-    
+    total_volume = kpis['total_volume'] if kpis['total_volume'] is not None else 0
+
     with col1:
         st.metric(
             label="📊 Total Loan Volume",
             value=f"${total_volume/1e6:.1f}M",
-            delta=f"{len(filtered_df):,} loans"
+            delta=f"{kpis['count']:,} loans"
         )
-    
+
     # Average Interest Rate
-    avg_int_rate = filtered_df['int_rate'].mean() * 100 if 'int_rate' in filtered_df.columns else 0
-    
+    avg_int_rate = kpis['avg_int_rate'] * 100 if kpis['avg_int_rate'] is not None else 0
+
     with col2:
         st.metric(
             label="📈 Avg Interest Rate",
             value=f"{avg_int_rate:.2f}%",
-            delta=f"DTI: {filtered_df['dti'].mean():.2f}" if 'dti' in filtered_df.columns else "N/A"
+            delta=f"DTI: {kpis['avg_dti']:.2f}" if kpis['avg_dti'] is not None else "N/A"
         )
-    
+
     # Risk Rate (Charged Off)
-    if 'loan_status' in filtered_df.columns:
-        risk_count = len(filtered_df[filtered_df['loan_status'] == 'Charged Off'])
-        risk_rate = (risk_count / len(filtered_df)) * 100 if len(filtered_df) > 0 else 0
-    else:
-        risk_rate = 0
-        risk_count = 0
-    
+    has_status = kpis['risk_count'] is not None
+    risk_count = kpis['risk_count'] if has_status else 0
+    risk_rate = kpis['risk_rate'] if kpis['risk_rate'] is not None else 0
+
     with col3:
         st.metric(
             label="⚠️ Risk Rate",
             value=f"{risk_rate:.2f}%",
-            delta=f"{risk_count:,} charged off" if 'loan_status' in filtered_df.columns else "N/A",
+            delta=f"{risk_count:,} charged off" if has_status else "N/A",
             delta_color="inverse"
         )
-    
+
     # Average Loan Amount
-    avg_loan = filtered_df['loan_amount'].mean() if 'loan_amount' in filtered_df.columns else 0
-    
+    avg_loan = kpis['avg_loan'] if kpis['avg_loan'] is not None else 0
+
     with col4:
         st.metric(
             label="💵 Avg Loan Amount",
             value=f"${avg_loan:,.0f}",
-            delta=f"Max: ${filtered_df['loan_amount'].max():,.0f}" if 'loan_amount' in filtered_df.columns else "N/A"
-        )
\ No newline at end of file
+            delta=f"Max: ${kpis['max_loan']:,.0f}" if kpis['max_loan'] is not None else "N/A"
+        )
@@ -4,14 +4,22 @@ Sidebar filters component.
 
 import streamlit as st
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-from utils.helpers import create_loan_status_column
+from config.settings import UPLOAD_MAX_MB, AMOUNT_SLIDER_STEP, RATE_SLIDER_STEP
+from utils.filter_engine import select_view, get_filter_cache, get_filter_options
+from utils.upload import load_upload
+from utils.profiling import profiled
 
 
-def render_sidebar(df: pd.DataFrame) -> Dict[str, Any]:
+@profiled()
+def render_sidebar(df: Optional[pd.DataFrame], options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Render sidebar filters và trả về filter values.
+
+    Args:
+        df: Dataset trong bộ nhớ (None với data source SQL)
+        options: Lựa chọn filter có sẵn (từ data source); mặc định lấy từ df
     
     Returns:
         Dictionary chứa các giá trị filter
@@ -26,38 +34,40 @@ def render_sidebar(df: pd.DataFrame) -> Dict[str, Any]:
         uploaded_file = st.file_uploader(
             "Upload Custom Data",
             type=['csv'],
-            help="Upload your own CSV file with the same structure"
+            help="Upload your own CSV file with the same structure",
+            max_upload_size=UPLOAD_MAX_MB
         )
         
         if uploaded_file is not None:
             try:
-                df = pd.read_csv(uploaded_file)
-                df = create_loan_status_column(df)
+                df = load_upload(uploaded_file, reference=df)
                 st.success("✅ Custom data loaded successfully!")
                 filters['custom_df'] = df
+                options = None
             except Exception as e:
                 st.error(f"❌ Error loading file: {str(e)}")
         
+        if options is None:
+            options = get_filter_options(df)
+        
         st.markdown("---")
         
         # Grade Filter
-        if 'grade' in df.columns:
-            available_grades = sorted(df['grade'].dropna().unique().tolist())
+        if options['grades'] is not None:
             filters['grades'] = st.multiselect(
                 "Credit Grade",
-                options=available_grades,
-                default=available_grades,
+                options=options['grades'],
+                default=options['grades'],
                 help="Filter by credit grade (A=Best, G=Worst)"
             )
         else:
             filters['grades'] = []
         
         # State Filter
-        if 'address_state' in df.columns:
-            available_states = sorted(df['address_state'].dropna().unique().tolist())
+        if options['states'] is not None:
             filters['states'] = st.multiselect(
                 "State",
-                options=available_states,
+                options=options['states'],
                 default=[],
                 help="Filter by state (leave empty for all)"
             )
@@ -65,26 +75,26 @@ def render_sidebar(df: pd.DataFrame) -> Dict[str, Any]:
             filters['states'] = []
         
         # Region Filter
-        if 'region' in df.columns:
-            available_regions = sorted(df['region'].dropna().unique().tolist())
+        if options['regions'] is not None:
             filters['regions'] = st.multiselect(
                 "Region",
-                options=available_regions,
-                default=available_regions,
+                options=options['regions'],
+                default=options['regions'],
                 help="Filter by region"
             )
         else:
             filters['regions'] = []
         
         # Loan Amount Range
-        if 'loan_amount' in df.columns:
-            min_amount = int(df['loan_amount'].min())
-            max_amount = int(df['loan_amount'].max())
+        if options['amount_range'] is not None:
+            min_amount = int(options['amount_range'][0])
+            max_amount = int(options['amount_range'][1])
             filters['amount_range'] = st.slider(
                 "Loan Amount Range",
                 min_value=min_amount,
                 max_value=max_amount,
                 value=(min_amount, max_amount),
+                step=AMOUNT_SLIDER_STEP,
                 format="$%d",
                 help="Filter by loan amount range"
             )
@@ -92,14 +102,15 @@ def render_sidebar(df: pd.DataFrame) -> Dict[str, Any]:
             filters['amount_range'] = (0, float('inf'))
         
         # Interest Rate Range
-        if 'int_rate' in df.columns:
-            min_rate = float(df['int_rate'].min()) * 100
-            max_rate = float(df['int_rate'].max()) * 100
+        if options['rate_range'] is not None:
+            min_rate = options['rate_range'][0] * 100
+            max_rate = options['rate_range'][1] * 100
             rate_range = st.slider(
                 "Interest Rate Range",
                 min_value=min_rate,
                 max_value=max_rate,
                 value=(min_rate, max_rate),
+                step=RATE_SLIDER_STEP,
                 format="%.1f%%",
                 help="Filter by interest rate range"
             )
@@ -109,47 +120,50 @@ def render_sidebar(df: pd.DataFrame) -> Dict[str, Any]:
         
         st.markdown("---")
         st.markdown("### Data Summary")
-        st.info(f"Total Records: **{len(df):,}**")
+        st.info(f"Total Records: **{options['rows']:,}**")
+        memory = options.get('memory')
+        if memory:
+            st.caption(
+                f"In memory: {memory['after'] / 1024 / 1024:.1f} MB "
+                f"(raw {memory['before'] / 1024 / 1024:.1f} MB, "
+                f"{memory['before'] / max(memory['after'], 1):.1f}x smaller)"
+            )
     
     return filters
 
 
+@profiled()
 def apply_filters(df: pd.DataFrame, filters: Dict[str, Any]) -> pd.DataFrame:
-    """Apply filters to DataFrame."""
-    filtered_df = df.copy()
-    
-    # Apply Grade filter
-    if filters.get('grades') and 'grade' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['grade'].isin(filters['grades'])]
-    
-    # Apply State filter
-    if filters.get('states') and 'address_state' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['address_state'].isin(filters['states'])]
-    
-    # Apply Region filter
-    if filters.get('regions') and 'region' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['region'].isin(filters['regions'])]
-    
-    # Apply Loan Amount filter
-    if 'loan_amount' in filtered_df.columns:
-        amount_range = filters.get('amount_range', (0, float('inf')))
-        filtered_df = filtered_df[
-            (filtered_df['loan_amount'] >= amount_range[0]) &
-            (filtered_df['loan_amount'] <= amount_range[1])
-        ]
-    
-    # Apply Interest Rate filter
-    if 'int_rate' in filtered_df.columns:
-        rate_range = filters.get('rate_range', (0, 1))
-        filtered_df = filtered_df[
-            (filtered_df['int_rate'] >= rate_range[0]) &
-            (filtered_df['int_rate'] <= rate_range[1])
-        ]
-    
+    """
+    Apply filters to DataFrame.
+
+    Row selection comes from the dataset's FilterEngine and is memoized per
+    (dataset, normalized filters), so returning to a recent filter
+    combination only costs a single take.
+    """
+    key, entry = select_view(df, filters)
+    positions = entry['positions']
+    filtered_df = df.copy(deep=False) if positions is None else df.iloc[positions]
+
+    # Lineage append chỉ áp dụng cho dataset gốc, không cho tập con
+    filtered_df.attrs.pop('parent', None)
+    filtered_df.attrs['fingerprint'] = key
+    filtered_df.attrs['filters'] = entry['filters']
     return filtered_df
 
 
 def show_filtered_count(count: int):
     """Display filtered record count in sidebar."""
     with st.sidebar:
-        st.success(f"Filtered Records: **{count:,}**")
\ No newline at end of file
+        st.success(f"Filtered Records: **{count:,}**")
+        _show_filter_cache_stats()
+
+
+def _show_filter_cache_stats():
+    """Display hit rate and evictions of the shared filter result cache."""
+    stats = get_filter_cache().stats()
+    st.caption(
+        f"Filter cache: {stats['hit_rate']:.0%} hit rate · {stats['entries']} entries · "
+        f"{stats['bytes'] / 1024 / 1024:.1f}/{stats['max_bytes'] / 1024 / 1024:.0f} MB · "
+        f"{stats['evictions']} evictions"
+    )
\ No newline at end of file
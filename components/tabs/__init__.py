@@ -1,9 +1,11 @@
 from .dashboard import render_dashboard_tab
 from .prediction import render_prediction_tab
 from .data_explorer import render_data_explorer_tab
+from .projection import render_projection_tab
 
 __all__ = [
     'render_dashboard_tab',
     'render_prediction_tab',
-    'render_data_explorer_tab'
+    'render_data_explorer_tab',
+    'render_projection_tab'
 ]
\ No newline at end of file
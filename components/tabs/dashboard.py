@@ -4,6 +4,7 @@ Dashboard tab component.
 
 import streamlit as st
 import pandas as pd
+from typing import Dict, Any, Optional
 
 from components.kpi_metrics import render_kpi_metrics
 from charts import (
@@ -14,45 +15,77 @@ from charts import (
     create_interest_rate_histogram,
     create_scatter_plot
 )
+from charts.figure_cache import cached_figure, get_figure_cache
+from utils.cube import get_view_cube, get_view_histogram
+from utils.data_loader import dataset_fingerprint
+from utils.filter_engine import get_filter_options
+from utils.profiling import stage
 
 
-def render_dashboard_tab(df: pd.DataFrame, filtered_df: pd.DataFrame):
-    """Render Dashboard tab content."""
+def render_dashboard_tab(df: pd.DataFrame, filtered_df: pd.DataFrame, report: Optional[Dict[str, Any]] = None,
+                         source=None):
+    """
+    Render Dashboard tab content.
+
+    Figures are cached per chart and filter state (view fingerprint), so a
+    rerun with unchanged filters rebuilds nothing, not even the cube. When
+    a precomputed `report` (unfiltered view) is given, its KPIs and figures
+    are served as-is. With a SQL `source`, the interest-rate histogram is
+    counted in the database over the whole filtered set, not the sample.
+    """
     # KPI Metrics
     st.markdown("### Key Performance Indicators")
-    render_kpi_metrics(df, filtered_df)
+    render_kpi_metrics(df, filtered_df, report['kpis'] if report is not None else None)
     
     st.markdown("---")
     
+    view = dataset_fingerprint(filtered_df)
+    
+    # Một cube dùng chung cho các biểu đồ tổng hợp (chỉ dựng khi cần)
+    cube = None
+    
+    def view_cube():
+        nonlocal cube
+        if cube is None:
+            cube = get_view_cube(df, filtered_df)
+        return cube
+    
+    def chart(name: str, build):
+        with stage(name):
+            fig = report['figures'][name] if report is not None else cached_figure(name, view, build)
+            st.plotly_chart(fig, use_container_width=True)
+    
     # Charts Row 1
     col1, col2 = st.columns(2)
     
     with col1:
-        fig_grade = create_grade_distribution_chart(filtered_df)
-        st.plotly_chart(fig_grade, use_container_width=True)
+        chart('grade_distribution', lambda: create_grade_distribution_chart(filtered_df, view_cube()))
     
     with col2:
-        fig_status = create_status_pie_chart(filtered_df)
-        st.plotly_chart(fig_status, use_container_width=True)
+        chart('status_pie', lambda: create_status_pie_chart(filtered_df, view_cube()))
     
     # Charts Row 2
     col1, col2 = st.columns(2)
     
     with col1:
-        fig_purpose = create_purpose_chart(filtered_df)
-        st.plotly_chart(fig_purpose, use_container_width=True)
+        chart('purpose', lambda: create_purpose_chart(filtered_df, view_cube()))
     
     with col2:
-        fig_region = create_region_map(filtered_df)
-        st.plotly_chart(fig_region, use_container_width=True)
+        chart('region', lambda: create_region_map(filtered_df, view_cube()))
     
     # Charts Row 3
     col1, col2 = st.columns(2)
     
     with col1:
-        fig_histogram = create_interest_rate_histogram(filtered_df)
-        st.plotly_chart(fig_histogram, use_container_width=True)
+        rate_range = get_filter_options(df)['rate_range']
+        chart('interest_rate_histogram', lambda: create_interest_rate_histogram(
+            filtered_df, rate_range, get_view_histogram(df, filtered_df, source=source)
+        ))
     
     with col2:
-        fig_scatter = create_scatter_plot(filtered_df)
-        st.plotly_chart(fig_scatter, use_container_width=True)
\ No newline at end of file
+        chart('scatter', lambda: create_scatter_plot(filtered_df))
+    
+    with st.expander("Chart build stats"):
+        stats = get_figure_cache().chart_stats()
+        stats['json_kb'] = stats.pop('json_bytes') / 1024
+        st.dataframe(stats.round(1), use_container_width=True)
@@ -6,24 +6,33 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
+from utils.export import EXPORT_FORMATS, export_to_bytes
+from utils.pagination import select_rows, slice_page
+from utils.summary import describe_view
 
-def render_data_explorer_tab(df: pd.DataFrame, filtered_df: pd.DataFrame):
-    """Render Data Explorer tab content."""
+PAGE_SIZES = [25, 50, 100, 500]
+
+
+def render_data_explorer_tab(df: pd.DataFrame, filtered_df: pd.DataFrame, source=None):
+    """
+    Render Data Explorer tab content.
+
+    With a SQL data source, `filtered_df` is only a bounded sample: the grid,
+    export and summary query the source for the full filtered set instead.
+    """
     st.markdown("### Data Explorer")
     
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        st.markdown(f"**Showing {len(filtered_df):,} records** (filtered from {len(df):,} total)")
+        if source is not None:
+            total_rows = source.filter_options()['rows']
+            st.markdown(f"**Showing {filtered_df.attrs['rows']:,} records** (filtered from {total_rows:,} total)")
+        else:
+            st.markdown(f"**Showing {len(filtered_df):,} records** (filtered from {len(df):,} total)")
     
     with col2:
-        csv = filtered_df.to_csv(index=False)
-        st.download_button(
-            label="📥 Download Filtered Data",
-            data=csv,
-            file_name="filtered_loan_data.csv",
-            mime="text/csv"
-        )
+        _render_download(filtered_df, source)
     
     # Column selection
     all_columns = filtered_df.columns.tolist()
@@ -38,18 +47,77 @@ def render_data_explorer_tab(df: pd.DataFrame, filtered_df: pd.DataFrame):
     )
     
     if selected_columns:
-        st.dataframe(
-            filtered_df[selected_columns].head(100),
-            use_container_width=True,
-            height=400
-        )
+        _render_data_grid(filtered_df, selected_columns, source)
     
     # Statistical Summary
-    _render_statistical_summary(filtered_df)
+    _render_statistical_summary(df, filtered_df, source)
+
+
+def _render_data_grid(filtered_df: pd.DataFrame, columns: list, source=None):
+    """
+    Render a paginated grid; search, sort and paging happen server-side so
+    only the current page of the selected columns reaches the browser.
+    """
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    with col1:
+        query = st.text_input("Search", placeholder="Search in displayed columns...")
+    with col2:
+        sort_by = st.selectbox("Sort by", options=[None] + columns,
+                               format_func=lambda col: "(original order)" if col is None else col)
+    with col3:
+        descending = st.toggle("Descending", value=False, disabled=sort_by is None)
+    with col4:
+        page_size = st.selectbox("Rows per page", options=PAGE_SIZES, index=2)
+
+    if source is not None:
+        filters = filtered_df.attrs['source_filters']
+        total = source.count(filters, columns, query)
+    else:
+        rows = select_rows(filtered_df, columns, sort_by, not descending, query)
+        total = len(filtered_df) if rows is None else len(rows)
+    n_pages = max(1, -(-total // page_size))
+    page = st.number_input(f"Page (of {n_pages:,})", min_value=1, max_value=n_pages, value=1, step=1)
 
+    if source is not None:
+        page_df = source.page(filters, columns, int(page), page_size, sort_by, not descending, query)
+    else:
+        page_df = slice_page(filtered_df, rows, columns, int(page), page_size)
+    st.dataframe(page_df, use_container_width=True, height=400)
 
-def _render_statistical_summary(filtered_df: pd.DataFrame):
-    """Render statistical summary section."""
+    if total:
+        first = (int(page) - 1) * page_size + 1
+        st.caption(f"Rows {first:,}–{first + len(page_df) - 1:,} of {total:,}")
+    else:
+        st.caption("No rows match the search.")
+
+
+def _render_download(filtered_df: pd.DataFrame, source=None):
+    """Render export format picker and download button (file built on click)."""
+    fmt = st.selectbox(
+        "Export format",
+        options=list(EXPORT_FORMATS),
+        format_func=lambda key: EXPORT_FORMATS[key]['label'],
+        label_visibility="collapsed"
+    )
+    st.download_button(
+        label="📥 Download Filtered Data",
+        data=lambda: export_to_bytes(
+            source.iter_chunks(filtered_df.attrs['source_filters']) if source is not None else filtered_df, fmt
+        ),
+        file_name=f"filtered_loan_data{EXPORT_FORMATS[fmt]['extension']}",
+        mime=EXPORT_FORMATS[fmt]['mime']
+    )
+
+
+def _render_statistical_summary(df: pd.DataFrame, filtered_df: pd.DataFrame, source=None):
+    """
+    Render statistical summary section.
+
+    Quantiles come from per-cell sketches merged for the current filters
+    (within one sketch bin of the true value); toggle exact mode to run
+    describe() on the filtered rows instead. With a SQL source, moments are
+    computed in the database and quantiles on the sample.
+    """
     st.markdown("### Statistical Summary")
     
     numeric_cols = filtered_df.select_dtypes(include=[np.number]).columns.tolist()
@@ -63,6 +131,16 @@ def _render_statistical_summary(filtered_df: pd.DataFrame):
             default=default_summary
         )
         
+        if source is not None:
+            if summary_cols:
+                summary_df = source.describe(filtered_df.attrs['source_filters'], summary_cols, filtered_df)
+                st.dataframe(summary_df.round(2), use_container_width=True)
+                st.caption(f"Quantiles estimated from a sample of {len(filtered_df):,} rows.")
+            return
+        
+        exact = st.toggle("Exact quantiles", value=False,
+                          help="Compute quantiles from the filtered rows instead of merged sketches")
+        
         if summary_cols:
-            summary_df = filtered_df[summary_cols].describe().T.round(2)
+            summary_df = describe_view(df, filtered_df, summary_cols, exact=exact).round(2)
             st.dataframe(summary_df, use_container_width=True)
\ No newline at end of file
@@ -3,10 +3,16 @@ AI Prediction tab component.
 """
 
 import streamlit as st
+import pandas as pd
 
-from utils import load_model, load_scaler, calculate_installment, process_prediction_input, get_rate_category
-from charts import create_rate_gauge, create_rate_comparison_chart
-from config.settings import PURPOSE_OPTIONS
+from utils import start_model_warmup, calculate_installment, process_prediction_input, get_rate_category
+from charts import create_rate_gauge, create_rate_comparison_chart, create_amortization_chart
+from charts.figure_cache import cached_figure
+from utils.amortization import loan_schedule
+from utils.batch_scoring import score_frame
+from utils.prediction_cache import get_prediction_cache
+from utils.upload import hash_upload
+from config.settings import PURPOSE_OPTIONS, PREDICTION_INPUT_GRID
 
 
 def render_prediction_tab():
@@ -23,8 +29,14 @@ def render_prediction_tab():
     </div>
     """, unsafe_allow_html=True)
     
-    model = load_model()
-    scaler = load_scaler()
+    resources = start_model_warmup()
+    if not resources.ready:
+        with st.spinner("Loading prediction model in the background..."):
+            resources.wait()
+    model, scaler = resources.model, resources.scaler
+    
+    for error in resources.errors.values():
+        st.warning(error)
     
     if model is None:
         _render_model_unavailable()
@@ -32,7 +44,15 @@ def render_prediction_tab():
         _render_scaler_unavailable()
     else:
         st.success("✅ Model and Scaler loaded successfully!")
-        _render_prediction_form(model, scaler)
+        mode = st.radio(
+            "Prediction Mode",
+            options=["Single Applicant", "Batch (CSV Upload)"],
+            horizontal=True
+        )
+        if mode == "Single Applicant":
+            _render_prediction_form(model, scaler)
+        else:
+            _render_batch_scoring(model, scaler)
 
 
 def _render_model_unavailable():
@@ -64,9 +84,10 @@ def _render_prediction_form(model, scaler):
     col1, col2 = st.columns(2)
     
     with col1:
+        amount_min, amount_max, amount_step = PREDICTION_INPUT_GRID['loan_amount']
         loan_amount = st.number_input(
             "Loan Amount ($)",
-            min_value=1000, max_value=50000, value=15000, step=1000,
+            min_value=amount_min, max_value=amount_max, value=15000, step=amount_step,
             help="Amount you want to borrow"
         )
         
@@ -77,9 +98,10 @@ def _render_prediction_form(model, scaler):
             help="Repayment period"
         )
         
+        dti_min, dti_max, dti_step = PREDICTION_INPUT_GRID['dti']
         dti = st.slider(
             "DTI - Debt-to-Income Ratio (%)",
-            min_value=0.0, max_value=50.0, value=15.0, step=0.5,
+            min_value=dti_min, max_value=dti_max, value=15.0, step=dti_step,
             help="Monthly debt payments / Monthly income"
         )
         
@@ -127,6 +149,74 @@ def _render_prediction_form(model, scaler):
         )
 
 
+def _render_batch_scoring(model, scaler):
+    """Render upload-and-score mode for a whole file of applications."""
+    st.markdown("#### Score a File of Applications")
+    st.caption(
+        "CSV columns: dti, loan_amount, term_months and either grade_encoded or grade + sub_grade, "
+        "verification_status (or its one-hot columns), purpose (or purpose_debt)."
+    )
+    
+    uploaded_file = st.file_uploader("Upload Applications", type=['csv'], key="batch_scoring_file")
+    if uploaded_file is None:
+        return
+    
+    try:
+        applications = _score_upload(uploaded_file, model, scaler)
+    except Exception as e:
+        st.error(f"❌ Scoring Error: {str(e)}")
+        return
+    
+    rates = applications['predicted_int_rate']
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(label="Applications Scored", value=f"{len(applications):,}")
+    with col2:
+        st.metric(label="Avg Predicted Rate", value=f"{rates.mean():.2f}%")
+    with col3:
+        st.metric(label="Rate Range", value=f"{rates.min():.2f}% – {rates.max():.2f}%")
+    
+    st.dataframe(applications.head(100), use_container_width=True, height=400)
+    st.download_button(
+        label="📥 Download Scored Applications",
+        data=lambda: applications.to_csv(index=False).encode('utf-8'),
+        file_name="scored_applications.csv",
+        mime="text/csv"
+    )
+
+
+def _score_upload(uploaded_file, model, scaler) -> pd.DataFrame:
+    """
+    Scored applications for an uploaded file, memoized in the session by
+    content hash (like load_upload) so reruns don't re-read or re-score it.
+    Only the latest file is kept; a failed parse is remembered too.
+    """
+    hashes = st.session_state.setdefault('batch_scoring_hashes', {})
+    file_id = getattr(uploaded_file, 'file_id', None)
+    content_hash = hashes.get(file_id) if file_id is not None else None
+    if content_hash is None:
+        content_hash = hash_upload(uploaded_file)
+        if file_id is not None:
+            hashes[file_id] = content_hash
+    
+    cached = st.session_state.get('batch_scoring_result')
+    if cached is None or cached[0] != content_hash:
+        try:
+            applications = pd.read_csv(uploaded_file)
+            applications['predicted_int_rate'] = score_frame(applications, model, scaler)
+            result = applications
+        except Exception as e:
+            result = e
+        finally:
+            uploaded_file.seek(0)
+        cached = (content_hash, result)
+        st.session_state['batch_scoring_result'] = cached
+    
+    if isinstance(cached[1], Exception):
+        raise cached[1]
+    return cached[1]
+
+
 def _make_prediction(model, scaler, dti, loan_amount, term_months,
                      grade, sub_grade, verification_status, purpose):
     """Make prediction and display results."""
@@ -142,15 +232,8 @@ def _make_prediction(model, scaler, dti, loan_amount, term_months,
             purpose=purpose
         )
         
-        # Scale features
-        features_scaled = scaler.transform(features)
-        
-        # Predict
-        predicted_rate = model.predict(features_scaled)[0]
-        
-        # Convert to percentage if needed
-        if predicted_rate < 1:
-            predicted_rate = predicted_rate * 100
+        # Scale + predict (memoized across sessions, percentage)
+        predicted_rate = get_prediction_cache(model, scaler).predict(features)
         
         category, color, description = get_rate_category(predicted_rate)
         
@@ -188,7 +271,8 @@ def _display_prediction_results(predicted_rate, category, color, description,
         """, unsafe_allow_html=True)
     
     with col2:
-        fig_gauge = create_rate_gauge(predicted_rate, color)
+        fig_gauge = cached_figure('rate_gauge', (predicted_rate, color),
+                                  lambda: create_rate_gauge(predicted_rate, color))
         st.plotly_chart(fig_gauge, use_container_width=True)
     
     # Payment details
@@ -196,7 +280,8 @@ def _display_prediction_results(predicted_rate, category, color, description,
     
     # Comparison chart
     st.markdown("### Interest Rate Comparison by Grade")
-    fig_compare = create_rate_comparison_chart(predicted_rate, grade)
+    fig_compare = cached_figure('rate_comparison', (predicted_rate, grade),
+                                lambda: create_rate_comparison_chart(predicted_rate, grade))
     st.plotly_chart(fig_compare, use_container_width=True)
     
     # Tips
@@ -228,6 +313,11 @@ def _display_payment_details(predicted_rate, loan_amount, term_months, grade, su
     with col4:
         st.metric(label="Credit Grade", value=f"{grade}{sub_grade}", delta=category)
 
+    rate = predicted_rate / 100
+    fig_schedule = cached_figure('amortization', (loan_amount, rate, term_months),
+                                 lambda: create_amortization_chart(loan_schedule(loan_amount, rate, term_months)))
+    st.plotly_chart(fig_schedule, use_container_width=True)
+
 
 def _display_improvement_tips(dti, grade, sub_grade, verification_status, loan_amount):
     """Display tips to improve interest rate."""
@@ -0,0 +1,104 @@
+"""
+Portfolio Projection tab component.
+"""
+
+import streamlit as st
+import pandas as pd
+
+from charts import create_cash_flow_projection_chart
+from charts.figure_cache import cached_figure
+from config.settings import PROJECTION_RECOVERY_RATE
+from utils.cube import get_cube
+from utils.data_loader import dataset_fingerprint
+from utils.projection import grade_charge_off_rates, get_portfolio_projection, projection_as_of
+
+REQUIRED_COLUMNS = ['loan_amount', 'int_rate', 'term_months']
+
+
+def _share(value: float, balance: float) -> str:
+    return f"{value / balance * 100:.1f}% of balance" if balance > 0 else "N/A"
+
+
+def render_projection_tab(df: pd.DataFrame, filtered_df: pd.DataFrame, source=None):
+    """
+    Render Portfolio Projection tab content.
+
+    Projected monthly cash flows and losses of the outstanding (Current)
+    loans in the filtered set, from the dataset's as-of date (latest issue
+    date) over each loan's remaining term, with default probabilities from
+    the grade charge-off rates. Resolved loans are shown as realised totals
+    only. Rates are calibrated on the whole dataset. For a SQL source, whose
+    `filtered_df` is only a sample, the projection is computed from GROUP BY
+    aggregates of the full filtered set.
+    """
+    st.markdown("### Portfolio Cash-Flow Projection")
+
+    missing = [col for col in REQUIRED_COLUMNS if col not in filtered_df.columns]
+    if missing:
+        st.info(f"Projection needs the columns: {', '.join(missing)}")
+        return
+
+    recovery_rate = st.slider(
+        "Recovery rate on defaulted balance (%)", min_value=0, max_value=100,
+        value=int(PROJECTION_RECOVERY_RATE * 100), step=5
+    ) / 100
+
+    if source is None:
+        rates, as_of = grade_charge_off_rates(get_cube(df)), projection_as_of(df)
+    else:
+        rates, as_of = grade_charge_off_rates(source.cached_cube({})), source.latest_date()
+    projection = get_portfolio_projection(filtered_df, rates, recovery_rate, as_of, source)
+    monthly, by_grade = projection['monthly'], projection['by_grade']
+
+    if by_grade.empty:
+        st.info("No outstanding (Current) loans in the filtered set to project.")
+    else:
+        balance = by_grade['balance'].sum()
+        inflow = monthly['inflow'].sum()
+        interest = monthly['interest'].sum()
+        loss = monthly['loss'].sum()
+
+        col1, col2, col3, col4 = st.columns(4)
+
+        with col1:
+            st.metric(label="Outstanding Balance", value=f"${balance/1e6:.1f}M",
+                      delta=f"{by_grade['loans'].sum():,.0f} current loans")
+
+        with col2:
+            st.metric(label="Projected Inflows", value=f"${inflow/1e6:.1f}M", delta=_share(inflow, balance))
+
+        with col3:
+            st.metric(label="Projected Interest", value=f"${interest/1e6:.1f}M", delta=_share(interest, balance))
+
+        with col4:
+            st.metric(label="Projected Loss", value=f"${loss/1e6:.1f}M", delta=_share(loss, balance),
+                      delta_color="inverse")
+
+        view = dataset_fingerprint(filtered_df)
+        fig = cached_figure('cash_flow_projection', (view, recovery_rate, as_of),
+                            lambda: create_cash_flow_projection_chart(monthly, as_of))
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.markdown("#### Projected Loss by Grade (Remaining Term)")
+        table = by_grade.rename(columns={
+            'loans': 'Loans', 'balance': 'Balance ($)', 'charge_off_rate': 'Charge-off Rate (%)',
+            'projected_interest': 'Projected Interest ($)', 'projected_loss': 'Projected Loss ($)',
+            'loss_pct': 'Loss (% of balance)'
+        })
+        table['Charge-off Rate (%)'] *= 100
+        st.dataframe(table.round(2), use_container_width=True)
+
+    realised = projection['realised']
+    if not realised.empty:
+        st.markdown("#### Realised (Resolved Loans)")
+        st.dataframe(realised.rename(columns={
+            'loans': 'Loans', 'principal': 'Principal ($)', 'collected': 'Collected ($)'
+        }).round(2), use_container_width=True)
+
+    as_of_text = f"{as_of:%d %b %Y}" if as_of is not None else "origination (no issue dates)"
+    st.caption(
+        f"Projection from {as_of_text}. Current loans are assumed to have paid on schedule since their "
+        "issue date and default over their remaining term at their grade's charge-off rate "
+        "(Charged Off / (Charged Off + Fully Paid)), spread as a constant monthly hazard; a default "
+        "forfeits that month's payment and the outstanding balance less recoveries."
+    )
@@ -2,6 +2,8 @@
 Configuration và CSS styling 
 """
 
+import os
+
 # Page configuration
 PAGE_CONFIG = {
     "page_title": "Financial Analytics Dashboard",
@@ -148,6 +150,9 @@ CUSTOM_CSS = """
 GRADE_ORDER = ['A', 'B', 'C', 'D', 'E', 'F', 'G']
 GRADE_NUM_MAPPING = {'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7}
 
+# Loan status, theo thứ tự ưu tiên khi decode one-hot
+LOAN_STATUS_ORDER = ['Charged Off', 'Current', 'Fully Paid']
+
 # Loan status colors
 STATUS_COLORS = {
     'Fully Paid': '#38ef7d',
@@ -170,6 +175,84 @@ PURPOSE_OPTIONS = [
     'Other'
 ]
 
+# Features của model XGB, đúng thứ tự model yêu cầu
+MODEL_FEATURES = [
+    'dti', 'loan_amount', 'term_months', 'grade_encoded',
+    'verification_status_Verified', 'verification_status_Not Verified', 'purpose_debt'
+]
+
+# Lưới input của form dự đoán: (min, max, step)
+PREDICTION_INPUT_GRID = {
+    'dti': (0.0, 50.0, 0.5),
+    'loan_amount': (1000, 50000, 1000)
+}
+
+# Dựng sẵn bảng tra dự đoán cho toàn bộ lưới input khi load model
+PREWARM_PREDICTION_GRID = False
+
+# Ngân sách bộ nhớ cho cache kết quả lọc (dùng chung giữa các session)
+FILTER_CACHE_MAX_MB = 256
+
+# Bước của slider khoảng ở sidebar (số tiền vay: $, lãi suất: điểm %).
+# Cube chia bin loan_amount/int_rate theo đúng lưới này để cắt được theo
+# slider mà không phải quét lại các dòng
+AMOUNT_SLIDER_STEP = 500
+RATE_SLIDER_STEP = 0.5
+
+# Ngân sách cho cache figure Plotly (tính theo kích thước JSON của figure)
+FIGURE_CACHE_MAX_MB = 64
+
+# Schema nén dtype khi load dữ liệu (utils.data_loader.compact_dtypes)
+CATEGORY_COLUMNS = [
+    'address_state', 'region', 'grade', 'sub_grade', 'home_ownership',
+    'emp_length', 'term', 'verification_status', 'purpose', 'application_type'
+]
+ONE_HOT_PREFIXES = ('loan_status_', 'purpose_', 'verification_status_')
+# Cột chuỗi khác thành category nếu tỉ lệ giá trị phân biệt / số dòng dưới ngưỡng
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+# Chu kỳ (giây) kiểm tra file dữ liệu có thay đổi / được ghi thêm
+DATA_RELOAD_CHECK_SECONDS = 10
+
+# Nguồn dữ liệu: file CSV, hoặc database nhúng (sqlite:///loans.db,
+# duckdb:///loans.duckdb, hoặc đường dẫn .db / .sqlite / .duckdb)
+DATA_SOURCE = os.environ.get('LOAN_DATA_SOURCE', 'financial_loan_clean.csv')
+DATA_SOURCE_TABLE = 'loans'
+# Số dòng mẫu lấy từ database cho các biểu đồ cần dữ liệu từng dòng
+SQL_SAMPLE_ROWS = 50_000
+
+# Scatter Income vs Loan Amount: vẽ từng điểm (WebGL) tới ngưỡng này,
+# nhiều hơn thì vẽ mật độ theo lưới SCATTER_DENSITY_BINS x SCATTER_DENSITY_BINS
+SCATTER_WEBGL_MAX_POINTS = 100_000
+SCATTER_DENSITY_BINS = 60
+
+# Số dòng (khoản vay) mỗi khối ma trận dòng x tháng khi tính lịch trả nợ
+# của cả danh mục (utils.amortization)
+AMORTIZATION_CHUNK_ROWS = 10_000
+
+# Tỉ lệ thu hồi mặc định trên dư nợ của khoản vỡ nợ (tab Portfolio Projection)
+PROJECTION_RECOVERY_RATE = 0.10
+
+# Thư mục bundle report tĩnh của dashboard không lọc (python -m utils.report)
+REPORT_DIR = 'reports'
+
+# Giới hạn file CSV upload ở sidebar
+UPLOAD_MAX_MB = 500
+UPLOAD_MAX_ROWS = 5_000_000
+# Bộ nhớ tối đa của dữ liệu upload sau khi parse và nén dtype
+UPLOAD_MAX_MEMORY_MB = 1024
+UPLOAD_CHUNK_ROWS = 100_000
+# Số file upload đã parse được giữ lại trong mỗi session
+UPLOAD_SESSION_ENTRIES = 2
+
+# Profiling từng lần rerun (utils.profiling): bật bằng LOAN_PROFILE=1.
+# Khi bật, sidebar hiện bảng thời gian theo stage; LOAN_PROFILE_LOG ghi thêm
+# mỗi rerun một dòng JSON; LOAN_PROFILE_MEMORY=1 đo bộ nhớ cấp phát
+# (tracemalloc, làm chậm app đáng kể)
+PROFILE_ENABLED = os.environ.get('LOAN_PROFILE', '0') not in ('', '0')
+PROFILE_LOG_PATH = os.environ.get('LOAN_PROFILE_LOG') or None
+PROFILE_TRACK_MEMORY = os.environ.get('LOAN_PROFILE_MEMORY', '0') not in ('', '0')
+
 # Average rates by grade (for comparison)
 AVG_RATES_BY_GRADE = {
     'A': 7.5, 'B': 10.5, 'C': 13.5, 'D': 17.0, 
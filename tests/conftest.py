@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def loan_book():
+    """Sổ khoản vay giả lập nhỏ, đã có cột loan_status."""
+    from benchmarks.synthetic import generate_loan_book
+    from utils.helpers import create_loan_status_column
+    return create_loan_status_column(generate_loan_book(20_000, seed=7))
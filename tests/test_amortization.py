@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from utils.amortization import balances, cash_flows, expected_cash_flows, installments, schedule
+
+TERM = 360
+
+
+def _reference_installment(monthly_rate: float) -> float:
+    """PMT theo chuỗi Taylor (chính xác tới r^2 khi r rất nhỏ) hoặc np.power."""
+    if monthly_rate < 1e-6:
+        return 1 / TERM + monthly_rate * (TERM + 1) / (2 * TERM)
+    growth = (1 + monthly_rate) ** TERM
+    return monthly_rate * growth / (growth - 1)
+
+
+@pytest.mark.parametrize('annual_rate', [0.0, 1e-15, 1e-12, 1e-9, 1e-6, 0.12])
+def test_installment_near_zero_rate(annual_rate):
+    payment = installments(1.0, annual_rate, TERM)
+
+    assert np.isfinite(payment)
+    np.testing.assert_allclose(payment, _reference_installment(annual_rate / 12), rtol=1e-9)
+
+
+@pytest.mark.parametrize('annual_rate', [0.0, 1e-15, 1e-12, 1e-9])
+def test_schedule_near_zero_rate_is_straight_line(annual_rate):
+    rows = schedule(10_000.0, annual_rate, TERM)
+    months = np.arange(1, TERM + 1)
+
+    np.testing.assert_allclose(rows['balance'][0], 10_000.0 * (1 - months / TERM), rtol=1e-6, atol=1e-6)
+    np.testing.assert_allclose(rows['principal'][0].sum(), 10_000.0)
+    assert np.all(rows['interest'][0] >= 0) and rows['interest'][0].sum() < 1e-3
+    np.testing.assert_allclose(balances(10_000.0, annual_rate, TERM, TERM // 2), 5_000.0, rtol=1e-6)
+
+
+@pytest.mark.parametrize('annual_rate', [1e-15, 1e-12, 1e-9, 1e-7])
+def test_portfolio_flows_near_zero_rate_match_zero_rate(annual_rate):
+    principal = np.array([10_000.0, 25_000.0])
+    term = np.array([36, 60])
+    zero = expected_cash_flows(principal, [0.0, 0.0], term, default_rate=0.1, recovery_rate=0.2)
+    tiny = expected_cash_flows(principal, [annual_rate, annual_rate], term, default_rate=0.1, recovery_rate=0.2)
+
+    assert np.isfinite(tiny.to_numpy()).all()
+    np.testing.assert_allclose(tiny.to_numpy(), zero.to_numpy(), rtol=1e-5, atol=1e-3)
+    np.testing.assert_allclose(cash_flows(principal, [annual_rate] * 2, term)['principal'].sum(), principal.sum())
+
+
+def test_portfolio_flows_match_schedule():
+    principal = np.array([10_000.0, 25_000.0, 5_000.0])
+    rate = np.array([0.11, 0.0, 0.07])
+    term = np.array([36, 60, 60])
+    flows = cash_flows(principal, rate, term)
+    rows = schedule(principal, rate, term)
+
+    for column in ['payment', 'principal', 'interest', 'balance']:
+        np.testing.assert_allclose(flows[column].to_numpy(), rows[column].sum(axis=0), rtol=1e-9, atol=1e-6)
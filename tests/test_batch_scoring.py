@@ -0,0 +1,22 @@
+import pandas as pd
+import pytest
+
+from utils.batch_scoring import build_feature_matrix
+
+
+def _applications(grades):
+    return pd.DataFrame({
+        'grade': grades, 'sub_grade': ['3'] * len(grades), 'dti': 0.1, 'loan_amount': 10_000, 'term_months': 36,
+        'verification_status': 'Verified', 'purpose': 'Debt consolidation',
+    })
+
+
+def test_grade_and_sub_grade_forms_encode_alike():
+    X = build_feature_matrix(_applications(['B', ' b3 ', 'G']))
+    features = pd.DataFrame(X)
+    pd.testing.assert_series_equal(features.iloc[0], features.iloc[1], check_names=False)
+
+
+def test_unknown_grade_lists_rows():
+    with pytest.raises(ValueError, match=r"rows: 1, 3$"):
+        build_feature_matrix(_applications(['A', 'Z', 'C', None]).drop(index=0))
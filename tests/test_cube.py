@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from components.sidebar import apply_filters
+from utils.cube import AggregationCube, get_binned_cube, get_view_cube
+from utils.density import histogram
+from utils.filter_engine import get_filter_options
+
+ROLLUP_COLUMNS = ['count', 'loan_amount_sum', 'int_rate_sum', 'dti_count', 'loan_amount_max']
+
+
+def _grid_filters(df, amount_steps=None, rate_steps=None, **categories):
+    options = get_filter_options(df)
+    amount_low, amount_high = options['amount_range']
+    rate_low, rate_high = options['rate_range']
+    filters = {'grades': None, 'states': None, 'regions': None,
+               'amount_range': (amount_low, amount_high), 'rate_range': (rate_low, rate_high)}
+    if amount_steps:
+        filters['amount_range'] = tuple(int(amount_low) + k * 500 for k in amount_steps)
+    if rate_steps:
+        filters['rate_range'] = tuple((rate_low * 100 + k * 0.5) / 100 for k in rate_steps)
+    filters.update(categories)
+    return filters
+
+
+@pytest.mark.parametrize('filters', [
+    dict(amount_steps=(4, 40)),
+    dict(rate_steps=(3, 20), grades=['A', 'B']),
+    dict(amount_steps=(1, 60), rate_steps=(0, 10), states=['CA', 'NY', 'TX']),
+    dict(amount_steps=(10, 10)),
+])
+def test_binned_slice_matches_filtered_rows(loan_book, filters):
+    filtered = apply_filters(loan_book, _grid_filters(loan_book, **filters))
+    cube = get_view_cube(loan_book, filtered)
+    expected = AggregationCube.from_frame(filtered)
+
+    assert cube.total_count == len(filtered)
+    for dim in ['grade', 'region', 'loan_status', 'purpose']:
+        np.testing.assert_allclose(cube.rollup(dim)[ROLLUP_COLUMNS].to_numpy(),
+                                   expected.rollup(dim)[ROLLUP_COLUMNS].to_numpy())
+
+
+def test_off_grid_range_is_not_sliced(loan_book):
+    filters = _grid_filters(loan_book)
+    filters['amount_range'] = (1234.5, filters['amount_range'][1])
+    assert get_binned_cube(loan_book).slice(filters) is None
+
+
+@pytest.mark.parametrize('filters', [
+    dict(),
+    dict(rate_steps=(3, 20), grades=['A', 'B']),
+    dict(amount_steps=(1, 60), rate_steps=(0, 10), states=['CA', 'NY', 'TX']),
+])
+def test_view_histogram_matches_filtered_rows(loan_book, filters):
+    filtered = apply_filters(loan_book, _grid_filters(loan_book, **filters))
+    hist = get_binned_cube(loan_book).histogram('int_rate', filtered.attrs['filters'], 'grade')
+    expected = histogram(filtered, 'int_rate', hist['edges'], 'grade')
+
+    assert hist['rows'] == len(filtered)
+    counts = dict(zip(hist['groups'], hist['counts']))
+    for grade, row in zip(expected['groups'], expected['counts']):
+        np.testing.assert_array_equal(counts[grade], row)
+    assert hist['counts'].sum() == expected['counts'].sum()
@@ -0,0 +1,106 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils.data_loader as data_loader
+from benchmarks.synthetic import write_loan_book
+from utils.cube import AggregationCube
+from utils.data_loader import load_data_uncached, refresh_data
+from utils.filter_engine import FilterEngine
+from utils.summary import SummaryEngine
+
+FILTERS = [
+    {'grades': ['A', 'B'], 'states': None, 'regions': None},
+    {'grades': None, 'states': ['CA', 'TX'], 'regions': None,
+     'amount_range': (5_000, 20_000), 'rate_range': (0.08, 0.15)},
+]
+
+
+@pytest.fixture
+def loan_csv(tmp_path):
+    """CSV 20k dòng; trả về (đường dẫn, nội dung đầy đủ, offset sau ~15k dòng)."""
+    path = str(tmp_path / 'loans.csv')
+    write_loan_book(path, 20_000, seed=11)
+    with open(path, 'rb') as f:
+        content = f.read()
+    split = content.index(b'\n', len(content) * 3 // 4) + 1
+    with open(path, 'wb') as f:
+        f.write(content[:split])
+    return path, content, split
+
+
+def _cold(tmp_path, content):
+    path = str(tmp_path / 'cold.csv')
+    with open(path, 'wb') as f:
+        f.write(content)
+    return load_data_uncached(path)
+
+
+def test_append_extends_engines_like_cold_rebuild(loan_csv, tmp_path):
+    path, content, split = loan_csv
+    base = load_data_uncached(path)
+    filter_engine = FilterEngine(base)
+    cube = AggregationCube.from_frame(base)
+    summary = SummaryEngine(base)
+    summary.sketch('loan_amount')
+
+    with open(path, 'ab') as f:
+        f.write(content[split:])
+    df = refresh_data(path, base)
+    cold = _cold(tmp_path, content)
+
+    assert df.attrs['parent'] == {'fingerprint': base.attrs['fingerprint'], 'rows': len(base)}
+    assert len(df) == len(cold) == 20_000
+    pd.testing.assert_frame_equal(df, cold, check_dtype=False, check_categorical=False)
+
+    extended = filter_engine.extended(df.iloc[len(base):])
+    rebuilt = FilterEngine(cold)
+    for filters in FILTERS:
+        np.testing.assert_array_equal(extended.select(filters), rebuilt.select(filters))
+
+    merged = cube.merge(AggregationCube.from_frame(df.iloc[len(base):]))
+    expected = AggregationCube.from_frame(cold)
+    for dim in ['grade', 'region', 'loan_status']:
+        pd.testing.assert_frame_equal(merged.rollup(dim), expected.rollup(dim), check_dtype=False)
+
+    summary = summary.extended(df)
+    rebuilt = SummaryEngine(cold)
+    for filters in FILTERS:
+        pd.testing.assert_frame_equal(
+            summary.describe(['loan_amount', 'int_rate'], summary.cell_mask(filters)),
+            rebuilt.describe(['loan_amount', 'int_rate'], rebuilt.cell_mask(filters)),
+        )
+
+
+def test_touch_records_new_mtime(loan_csv, monkeypatch):
+    path, _, _ = loan_csv
+    df = load_data_uncached(path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    touched = refresh_data(path, df)
+    assert touched is not df
+    assert touched.attrs['fingerprint'] == df.attrs['fingerprint']
+    assert touched.attrs['source']['mtime_ns'] == stat.st_mtime_ns + 10**9
+
+    def fail(*args, **kwargs):
+        raise AssertionError("file re-hashed after touch")
+
+    monkeypatch.setattr(data_loader, 'hash_file', fail)
+    assert refresh_data(path, touched) is touched
+
+
+def test_rewrite_reloads(loan_csv):
+    path, content, split = loan_csv
+    df = load_data_uncached(path)
+    header_end = content.index(b'\n') + 1
+    # Cùng header, bỏ dòng dữ liệu đầu và ghi thêm phần còn lại: không phải append
+    with open(path, 'wb') as f:
+        f.write(content[:header_end] + content[content.index(b'\n', header_end) + 1:])
+
+    reloaded = refresh_data(path, df)
+    assert 'parent' not in reloaded.attrs
+    assert reloaded.attrs['fingerprint'] != df.attrs['fingerprint']
+    assert len(reloaded) == 20_000 - 1
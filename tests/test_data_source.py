@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_source import SQLDataSource, import_csv
+
+
+@pytest.fixture
+def sqlite_source(loan_book, tmp_path):
+    df = loan_book.head(5_000).drop(columns=['loan_status'])
+    # Giá trị lớn với độ lệch nhỏ: AVG(x*x) - AVG(x)^2 mất hết chữ số
+    df['offset_amount'] = 1e9 + df['loan_amount'] / 1e3
+    csv_path = tmp_path / 'loans.csv'
+    df.to_csv(csv_path, index=False)
+    import_csv(str(csv_path), str(tmp_path / 'loans.db'))
+    return SQLDataSource('loans.db', 'sqlite', str(tmp_path / 'loans.db')), df
+
+
+def test_describe_matches_pandas(sqlite_source):
+    source, df = sqlite_source
+    columns = ['loan_amount', 'int_rate', 'term_months', 'offset_amount']
+    filters = {'grades': ['A', 'B', 'C'], 'states': None, 'regions': None}
+    stats = source.describe(filters, columns)
+    expected = df[df['grade'].isin(filters['grades'])][columns].describe().T
+
+    np.testing.assert_allclose(stats['count'], expected['count'])
+    np.testing.assert_allclose(stats['mean'], expected['mean'], rtol=1e-12)
+    np.testing.assert_allclose(stats['std'], expected['std'], rtol=1e-6)
+
+
+def test_projection_aggregates_match_in_memory_projection(sqlite_source, loan_book):
+    from utils.cube import AggregationCube
+    from utils.projection import (
+        grade_charge_off_rates, portfolio_projection, project_outstanding, projection_as_of
+    )
+
+    source, _ = sqlite_source
+    books = loan_book.head(5_000)
+    filters = {'grades': ['B', 'C', 'D'], 'states': None, 'regions': None}
+    rates = grade_charge_off_rates(AggregationCube.from_frame(loan_book))
+    as_of = source.latest_date()
+    assert as_of == projection_as_of(books)
+
+    aggregates = source.projection_aggregates(filters, as_of)
+    monthly, by_grade = project_outstanding(aggregates['outstanding'], rates, 0.1)
+    expected = portfolio_projection(books[books['grade'].isin(filters['grades'])], rates, 0.1, as_of)
+
+    assert aggregates['outstanding']['loans'].sum() < len(books)
+    np.testing.assert_allclose(monthly.to_numpy(), expected['monthly'].to_numpy(), rtol=1e-9)
+    pd.testing.assert_frame_equal(by_grade, expected['by_grade'], check_dtype=False, rtol=1e-9)
+    pd.testing.assert_frame_equal(aggregates['realised'], expected['realised'], check_dtype=False)
+
+
+def test_view_histogram_counts_whole_filtered_set(sqlite_source, loan_book, monkeypatch):
+    from utils.cube import AggregationCube, bin_grid, get_view_histogram
+
+    source, _ = sqlite_source
+    # Mẫu nhỏ hơn tập lọc: số đếm phải đến từ database, không từ mẫu
+    monkeypatch.setattr(SQLDataSource.sample, '__defaults__', (500,))
+    books = loan_book.head(5_000)
+    books.attrs.clear()
+    options = source.filter_options()
+    rate_low = options['rate_range'][0]
+    filters = {'grades': ['A', 'B', 'C'], 'states': None, 'regions': None,
+               'amount_range': options['amount_range'],
+               'rate_range': (rate_low, (rate_low * 100 + 12 * 0.5) / 100)}
+
+    view = source.view(filters)
+    hist = get_view_histogram(view, view, source=source)
+    assert len(view) == 500 < view.attrs['rows']
+    assert hist['counts'].sum() == hist['rows'] == view.attrs['rows']
+
+    expected = AggregationCube.from_frame(books, dict(bin_grid(books))).histogram('int_rate', filters, 'grade')
+    np.testing.assert_allclose(hist['edges'], expected['edges'])
+    for group, counts in zip(expected['groups'], expected['counts']):
+        if counts.any():
+            np.testing.assert_array_equal(hist['counts'][hist['groups'].index(group)], counts)
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.pagination import sort_permutation
+
+
+@pytest.mark.parametrize('column', ['grade', 'loan_amount', 'dti'])
+def test_descending_sort_is_stable(loan_book, column):
+    df = loan_book.head(5_000).copy()
+    df.loc[df.index[::7], 'dti'] = np.nan
+    expected = df[column].reset_index(drop=True).sort_values(
+        ascending=False, kind='stable', na_position='last').index.to_numpy()
+
+    np.testing.assert_array_equal(sort_permutation(df, column, ascending=False), expected)
+
+
+def test_descending_keeps_ties_in_original_order():
+    df = pd.DataFrame({'value': [2.0, 1.0, np.nan, 2.0, 1.0, 3.0]})
+    np.testing.assert_array_equal(sort_permutation(df, 'value', ascending=False), [5, 0, 3, 1, 4, 2])
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from utils.amortization import schedule
+from utils.projection import grade_charge_off_rates, portfolio_projection
+from utils.cube import AggregationCube
+
+
+def _rates(default_rate: float) -> pd.DataFrame:
+    rates = pd.DataFrame({'charge_off_rate': [default_rate]}, index=pd.Index(['A'], name='grade'))
+    rates.attrs['overall'] = default_rate
+    return rates
+
+
+def _book(status, issue_date, int_rate=0.12):
+    return pd.DataFrame({
+        'grade': ['A'] * len(status), 'loan_status': status,
+        'issue_date': pd.to_datetime(issue_date), 'loan_amount': 12_000.0,
+        'int_rate': int_rate, 'term_months': 36, 'total_payment': 1_000.0,
+    })
+
+
+def test_projects_remaining_schedule_of_current_loans_only():
+    df = _book(['Current', 'Fully Paid', 'Charged Off', 'Current'],
+               ['2021-03-15', '2021-01-01', '2021-02-01', '2021-12-01'])
+    result = portfolio_projection(df, _rates(0.0), 0.0, as_of=pd.Timestamp('2021-12-31'))
+
+    full = schedule(12_000.0, 0.12, 36)['payment'][0]
+    expected = np.zeros(36)
+    expected[:36 - 9] += full[9:]      # Current từ tháng 3: đã trả 9 kỳ
+    expected[:36] += full              # Current từ tháng 12: chưa trả kỳ nào
+    np.testing.assert_allclose(result['monthly']['payment'].to_numpy(), expected[:len(result['monthly'])])
+    assert len(result['monthly']) == 36
+
+    assert result['by_grade'].loc['A', 'loans'] == 2
+    assert result['realised']['loans'].to_dict() == {'Charged Off': 1.0, 'Fully Paid': 1.0}
+
+
+def test_remaining_default_probability_matches_lifetime_hazard(loan_book):
+    rates = grade_charge_off_rates(AggregationCube.from_frame(loan_book))
+    current = loan_book[loan_book['loan_status'] == 'Current']
+    result = portfolio_projection(loan_book, rates, 0.2)
+
+    monthly = result['monthly']
+    assert np.isfinite(monthly.to_numpy()).all()
+    # Mọi dư nợ hiện tại hoặc được trả (gốc) hoặc vỡ nợ
+    np.testing.assert_allclose(monthly['principal'].sum() + monthly['default'].sum(),
+                               result['by_grade']['balance'].sum(), rtol=1e-9)
+    assert result['by_grade']['loans'].sum() == len(current)
+    np.testing.assert_allclose(monthly['recovery'].sum(), 0.2 * monthly['default'].sum())
+
+
+def test_near_zero_rate_projection_is_finite():
+    df = _book(['Current', 'Current'], ['2021-06-01', '2021-09-01'], int_rate=1e-15)
+    result = portfolio_projection(df, _rates(0.1), 0.1, as_of=pd.Timestamp('2021-12-31'))
+
+    assert np.isfinite(result['monthly'].to_numpy()).all()
+    np.testing.assert_allclose(result['by_grade'].loc['A', 'balance'], 12_000.0 * (30 + 33) / 36)
+
+
+def test_no_outstanding_loans():
+    df = _book(['Fully Paid'], ['2021-01-01'])
+    result = portfolio_projection(df, _rates(0.1), 0.1)
+
+    assert result['by_grade'].empty
+    assert result['monthly']['payment'].sum() == 0
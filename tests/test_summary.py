@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components.sidebar import apply_filters
+from utils import summary
+from utils.cube import bin_grid
+from utils.filter_engine import get_filter_options
+from utils.summary import SummaryEngine, describe_view
+
+COLUMNS = ['loan_amount', 'int_rate', 'dti']
+
+
+def _grid_filters(df, amount_steps=None, rate_steps=None, **categories):
+    options = get_filter_options(df)
+    filters = {'grades': None, 'states': None, 'regions': None,
+               'amount_range': options['amount_range'], 'rate_range': options['rate_range']}
+    if amount_steps:
+        filters['amount_range'] = tuple(int(options['amount_range'][0]) + k * 500 for k in amount_steps)
+    if rate_steps:
+        filters['rate_range'] = tuple((options['rate_range'][0] * 100 + k * 0.5) / 100 for k in rate_steps)
+    filters.update(categories)
+    return filters
+
+
+@pytest.mark.parametrize('filters', [
+    dict(amount_steps=(4, 40)),
+    dict(rate_steps=(3, 20), grades=['A', 'B']),
+    dict(amount_steps=(1, 60), rate_steps=(0, 10), states=['CA', 'NY', 'TX']),
+])
+def test_range_filters_describe_from_sketch(loan_book, monkeypatch, filters):
+    filtered = apply_filters(loan_book, _grid_filters(loan_book, **filters))
+    assert len(filtered) < len(loan_book)
+
+    def no_exact():
+        raise AssertionError("slider range on the grid should not fall back to describe()")
+    monkeypatch.setattr(summary, 'get_filter_cache', no_exact)
+    result = describe_view(loan_book, filtered, COLUMNS)
+
+    expected = filtered[COLUMNS].describe().T
+    pd.testing.assert_series_equal(result['count'], expected['count'], check_dtype=False)
+    for stat in ['mean', 'std', 'min', 'max']:
+        np.testing.assert_allclose(result[stat], expected[stat], rtol=1e-9)
+    for stat in ['25%', '50%', '75%']:
+        np.testing.assert_allclose(result[stat], expected[stat], rtol=0.02)
+
+
+def test_off_grid_range_has_no_cell_mask(loan_book):
+    engine = SummaryEngine(loan_book, dict(bin_grid(loan_book)))
+    filters = _grid_filters(loan_book, amount_steps=(4, 40))
+    filters['amount_range'] = (filters['amount_range'][0] + 1, filters['amount_range'][1])
+    assert engine.cell_mask(filters) is None
+
+
+def test_extended_binned_engine_matches_rebuilt(loan_book):
+    grid = dict(bin_grid(loan_book))
+    base = loan_book.iloc[:15_000]
+    engine = SummaryEngine(base, grid)
+    engine.sketch('int_rate')
+    extended = engine.extended(loan_book)
+    rebuilt = SummaryEngine(loan_book, grid)
+
+    filters = _grid_filters(loan_book, amount_steps=(2, 30), rate_steps=(1, 12), grades=['C'])
+    pd.testing.assert_frame_equal(
+        extended.describe(['int_rate'], extended.cell_mask(filters)),
+        rebuilt.describe(['int_rate'], rebuilt.cell_mask(filters)),
+    )
@@ -1,7 +1,9 @@
 from .data_loader import load_data
-from .model_loader import load_model, load_scaler
+from .model_loader import load_model, load_scaler, start_model_warmup
 from .helpers import (
     create_loan_status_column,
+    decode_one_hot,
+    compute_kpis,
     calculate_installment,
     calculate_grade_encoded,
     process_prediction_input,
@@ -14,7 +16,10 @@ __all__ = [
     'load_data',
     'load_model',
     'load_scaler',
+    'start_model_warmup',
     'create_loan_status_column',
+    'decode_one_hot',
+    'compute_kpis',
     'calculate_installment',
     'calculate_grade_encoded',
     'process_prediction_input',
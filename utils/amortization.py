@@ -0,0 +1,235 @@
+"""
+Engine trả góp (amortization) vector hoá: installment, lịch trả nợ từng tháng
+(gốc, lãi, dư nợ) và tổng lãi cho cả mảng khoản vay trong một lần tính NumPy.
+
+Lãi suất là lãi năm dạng thập phân (0.12 = 12%), trả đều hàng tháng; lãi
+suất 0 được trả đều gốc (principal / term).
+"""
+
+from typing import Dict, Optional
+
+import pandas as pd
+import numpy as np
+
+from config.settings import AMORTIZATION_CHUNK_ROWS
+from utils.profiling import profiled
+
+
+SCHEDULE_COLUMNS = ['payment', 'principal', 'interest', 'balance']
+
+# Lãi suất tháng nhỏ hơn ngưỡng này được coi là 0 trong _term_flows: dạng
+# B_k = c(1+r)^k + a triệt tiêu lẫn nhau khi a = A/r quá lớn, còn phần lãi
+# bị bỏ qua (cỡ P*r*n/2) nhỏ hơn sai số đó
+MIN_MONTHLY_RATE = 1e-9
+
+
+def _as_arrays(principal, annual_rate, term_months):
+    principal = np.asarray(principal, dtype=np.float64)
+    monthly_rate = np.asarray(annual_rate, dtype=np.float64) / 12
+    term = np.asarray(term_months, dtype=np.float64)
+    return principal, monthly_rate, term
+
+
+def _growth_minus_one(monthly_rate: np.ndarray, months) -> np.ndarray:
+    """(1+r)^k - 1 tính bằng expm1/log1p, không mất chữ số khi r rất nhỏ."""
+    return np.expm1(np.asarray(months, dtype=np.float64) * np.log1p(monthly_rate))
+
+
+def installments(principal, annual_rate, term_months) -> np.ndarray:
+    """
+    Khoản trả hàng tháng (công thức PMT) cho từng khoản vay.
+
+    Args:
+        principal: Số tiền vay (scalar hoặc mảng)
+        annual_rate: Lãi suất năm dạng thập phân
+        term_months: Kỳ hạn (tháng)
+
+    Returns:
+        Mảng installment, broadcast theo shape của các tham số
+    """
+    principal, r, n = _as_arrays(principal, annual_rate, term_months)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        grown = _growth_minus_one(r, n)
+        factor = np.where(r > 0, r * (grown + 1) / grown, 1 / n)
+    return principal * factor
+
+
+def balances(principal, annual_rate, term_months, months) -> np.ndarray:
+    """
+    Dư nợ còn lại sau `months` kỳ trả (dạng đóng, không lặp theo tháng).
+
+    B_k = P((1+r)^n - (1+r)^k) / ((1+r)^n - 1) (cùng giá trị với
+    P(1+r)^k - A((1+r)^k - 1)/r nhưng không trừ hai số lớn khi r nhỏ), với
+    r = 0 thì B_k = P(1 - k/n); bằng P khi k <= 0 và bằng 0 khi k >= term.
+    """
+    principal, r, n = _as_arrays(principal, annual_rate, term_months)
+    k = np.clip(np.asarray(months, dtype=np.float64), 0, n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        grown_n = _growth_minus_one(r, n)
+        remaining = np.where(r > 0, principal * ((grown_n - _growth_minus_one(r, k)) / grown_n),
+                             principal * (1 - k / n))
+    # Sai số làm tròn ở kỳ cuối
+    return np.where(k >= n, 0.0, np.maximum(remaining, 0.0))
+
+
+def schedule(principal, annual_rate, term_months, horizon: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Lịch trả nợ từng tháng cho một mảng khoản vay.
+
+    Args:
+        horizon: Số tháng của lịch (mặc định: kỳ hạn dài nhất)
+
+    Returns:
+        Dict 'payment', 'principal', 'interest', 'balance' -> mảng
+        (số khoản vay x horizon); cột j là tháng j+1, bằng 0 sau khi tất toán
+    """
+    principal, r, n = _as_arrays(principal, annual_rate, term_months)
+    principal, r, n = np.atleast_1d(principal, r, n)
+    if horizon is None:
+        horizon = int(n.max()) if n.size else 0
+    months = np.arange(horizon + 1, dtype=np.float64)
+
+    rate = r[:, None]
+    balance = balances(principal[:, None], rate * 12, n[:, None], months[None, :])
+    interest = rate * balance[:, :-1]
+    paid = balance[:, :-1] - balance[:, 1:]
+    return {'payment': interest + paid, 'principal': paid, 'interest': interest, 'balance': balance[:, 1:]}
+
+
+def total_interest(principal, annual_rate, term_months) -> np.ndarray:
+    """Tổng lãi phải trả trên toàn kỳ hạn của từng khoản vay."""
+    return installments(principal, annual_rate, term_months) * np.asarray(term_months) - np.asarray(principal)
+
+
+def loan_schedule(loan_amount: float, annual_rate: float, term_months: int) -> pd.DataFrame:
+    """Lịch trả nợ của một khoản vay, index là tháng 1..term_months."""
+    rows = schedule(loan_amount, annual_rate, term_months)
+    frame = pd.DataFrame({column: rows[column][0] for column in SCHEDULE_COLUMNS})
+    frame.index = pd.RangeIndex(1, len(frame) + 1, name='month')
+    return frame
+
+
+def _term_flows(principal: np.ndarray, annual_rate: np.ndarray, hazard: np.ndarray, term: int,
+                chunk_rows: int) -> Dict[str, np.ndarray]:
+    """
+    Tổng kỳ vọng theo tháng của các khoản vay cùng kỳ hạn, với xác suất vỡ
+    nợ mỗi tháng `hazard` (khoản vỡ nợ không trả kỳ đó và mất phần dư nợ).
+
+    Với r > 0, B_k = c(1+r)^k + a với a = A/r = P + P/((1+r)^n - 1),
+    c = P - a; với r = 0 (hoặc r < MIN_MONTHLY_RATE) thì B_k = P - A*k.
+    Nhân xác suất còn sống s^k (s = 1 - hazard), mọi tổng theo khoản vay
+    là tích ma trận-vector của trọng số với hai khối (dòng x tháng)
+    (s(1+r))^k và s^k.
+
+    Returns:
+        Dict 'balance' (tháng 0..term), 'payment', 'interest' và 'default'
+        (dư nợ kỳ vọng bị vỡ nợ trong tháng), cùng tháng 1..term
+    """
+    months = np.arange(term + 1, dtype=np.float64)
+    r = np.where(annual_rate / 12 < MIN_MONTHLY_RATE, 0.0, annual_rate / 12)
+    payment = installments(principal, r * 12, term)
+    positive = r > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth_weight = np.where(positive, -principal / _growth_minus_one(r, term), 0.0)
+    annuity = principal - growth_weight
+    linear_weight = np.where(positive, 0.0, payment)
+    survival = 1 - hazard
+    log_survival = np.log(survival)
+
+    totals = {
+        'balance': np.zeros(term + 1), 'payment': np.zeros(term),
+        'interest': np.zeros(term), 'default': np.zeros(term),
+    }
+    for start in range(0, len(r), chunk_rows):
+        block = slice(start, start + chunk_rows)
+        c, h = growth_weight[block], hazard[block]
+        a, linear, pay = annuity[block], linear_weight[block], payment[block]
+        grown = np.exp(np.outer(np.log1p(r[block]) + log_survival[block], months))
+        alive = np.exp(np.outer(log_survival[block], months))
+        g = np.stack([c, survival[block] * r[block] * c, h * c]) @ grown
+        s = np.stack([a, linear, pay, pay * positive[block], h * a, h * linear]) @ alive
+
+        totals['balance'] += g[0] + s[0] - months * s[1]
+        totals['payment'] += s[2, 1:]
+        totals['interest'] += g[1, :-1] + s[3, 1:]
+        totals['default'] += g[2, :-1] + s[4, :-1] - months[:-1] * s[5, :-1]
+
+    # Sai số làm tròn: dư nợ sau kỳ cuối bằng 0
+    totals['balance'][-1] = 0.0
+    totals['balance'] = np.maximum(totals['balance'], 0.0)
+    return totals
+
+
+def expected_cash_flows(principal, annual_rate, term_months, default_rate=0.0, recovery_rate: float = 0.0,
+                        chunk_rows: int = AMORTIZATION_CHUNK_ROWS) -> pd.DataFrame:
+    """
+    Dòng tiền kỳ vọng của cả danh mục, cộng theo tháng kể từ giải ngân.
+
+    `default_rate` là xác suất vỡ nợ trong suốt kỳ hạn của từng khoản vay,
+    đổi ra xác suất mỗi tháng không đổi 1 - (1 - p)^(1/term). Khoản vỡ nợ
+    trong tháng k không trả kỳ đó; phần dư nợ đầu kỳ thu hồi được
+    `recovery_rate`, còn lại là tổn thất.
+
+    Lịch trả nợ tuyến tính theo số tiền vay, nên các khoản cùng (kỳ hạn,
+    lãi suất, default_rate) được gộp thành một dòng trước; phần còn lại
+    được tính theo từng khối `chunk_rows` dòng của ma trận (dòng x tháng),
+    chỉ giữ tổng theo tháng nên bộ nhớ không phụ thuộc số khoản vay.
+
+    Returns:
+        DataFrame index tháng 1..kỳ hạn dài nhất, cột 'payment', 'principal',
+        'interest', 'balance' (dư nợ cuối tháng), 'default', 'recovery',
+        'loss' và 'inflow' (payment + recovery)
+    """
+    principal = np.asarray(principal, dtype=np.float64)
+    groups = pd.DataFrame({
+        'term': np.asarray(term_months, dtype=np.float64),
+        'rate': np.asarray(annual_rate, dtype=np.float64),
+        'default_rate': np.broadcast_to(np.asarray(default_rate, dtype=np.float64), principal.shape),
+        'principal': principal,
+    }).dropna()
+    groups = groups[groups['term'] >= 1]
+    groups['term'] = groups['term'].astype(np.int64)
+    groups = groups.groupby(['term', 'rate', 'default_rate'], sort=False)['principal'].sum().reset_index()
+
+    horizon = int(groups['term'].max()) if len(groups) else 0
+    totals = {column: np.zeros(horizon) for column in ['payment', 'interest', 'balance', 'default']}
+    for term, block in groups.groupby('term'):
+        term = int(term)
+        lifetime = np.clip(block['default_rate'].to_numpy(), 0.0, 1 - 1e-12)
+        hazard = 1 - np.power(1 - lifetime, 1 / term)
+        flows = _term_flows(block['principal'].to_numpy(), block['rate'].to_numpy(), hazard, term, chunk_rows)
+        for column in ['payment', 'interest', 'default']:
+            totals[column][:term] += flows[column]
+        totals['balance'][:term] += flows['balance'][1:]
+
+    frame = pd.DataFrame({
+        'payment': totals['payment'],
+        'principal': totals['payment'] - totals['interest'],
+        'interest': totals['interest'],
+        'balance': totals['balance'],
+        'default': totals['default'],
+        'recovery': totals['default'] * recovery_rate,
+        'loss': totals['default'] * (1 - recovery_rate),
+    })
+    frame['inflow'] = frame['payment'] + frame['recovery']
+    frame.index = pd.RangeIndex(1, horizon + 1, name='month')
+    return frame
+
+
+def cash_flows(principal, annual_rate, term_months, chunk_rows: int = AMORTIZATION_CHUNK_ROWS) -> pd.DataFrame:
+    """
+    Dòng tiền theo hợp đồng (không vỡ nợ) của cả danh mục theo tháng.
+
+    Returns:
+        DataFrame index tháng 1..kỳ hạn dài nhất, cột 'payment',
+        'principal', 'interest' và 'balance' (dư nợ cuối tháng)
+    """
+    return expected_cash_flows(principal, annual_rate, term_months, chunk_rows=chunk_rows)[SCHEDULE_COLUMNS]
+
+
+@profiled()
+def portfolio_cash_flows(df: pd.DataFrame, chunk_rows: int = AMORTIZATION_CHUNK_ROWS) -> pd.DataFrame:
+    """cash_flows cho các khoản vay trong df (loan_amount, int_rate, term_months)."""
+    return cash_flows(df['loan_amount'].to_numpy(dtype=np.float64, na_value=np.nan),
+                      df['int_rate'].to_numpy(dtype=np.float64, na_value=np.nan),
+                      df['term_months'].to_numpy(dtype=np.float64, na_value=np.nan), chunk_rows)
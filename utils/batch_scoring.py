@@ -0,0 +1,165 @@
+"""
+Batch scoring: dự đoán lãi suất cho cả file hồ sơ vay trong một lần.
+
+Usage:
+    python -m utils.batch_scoring applications.csv -o scored.csv
+"""
+
+import argparse
+import sys
+import time
+from typing import Optional
+
+import pandas as pd
+import numpy as np
+
+from config.settings import MODEL_FEATURES
+from utils.fast_inference import get_compiled_predictor, COMPILED_MAX_BATCH_ROWS
+
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Số dòng lỗi tối đa được liệt kê trong thông báo lỗi
+MAX_REPORTED_ROWS = 20
+
+# Cùng mapping với calculate_grade_encoded
+_GRADE_INDEX = {'G': 0, 'F': 1, 'E': 2, 'D': 3, 'C': 4, 'B': 5, 'A': 6}
+
+
+def _sub_grade_number(sub_grade: pd.Series) -> np.ndarray:
+    """Số sub grade 1-5 từ '3', 3 hoặc 'B3'."""
+    if pd.api.types.is_numeric_dtype(sub_grade):
+        return sub_grade.to_numpy(dtype=np.float64)
+    digits = sub_grade.astype(str).str.strip().str[-1]
+    return pd.to_numeric(digits, errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _describe_rows(index: pd.Index) -> str:
+    """Liệt kê (tối đa MAX_REPORTED_ROWS) nhãn dòng cho thông báo lỗi."""
+    rows = ', '.join(map(str, index[:MAX_REPORTED_ROWS]))
+    if len(index) > MAX_REPORTED_ROWS:
+        rows += f" (+{len(index) - MAX_REPORTED_ROWS:,} more)"
+    return rows
+
+
+def build_feature_matrix(df: pd.DataFrame) -> np.ndarray:
+    """
+    Dựng ma trận 7 feature (theo MODEL_FEATURES) cho toàn bộ hồ sơ.
+
+    Chấp nhận cả cột đã encode (grade_encoded, verification_status_*,
+    purpose_debt) lẫn cột thô như form dự đoán (grade + sub_grade,
+    verification_status, purpose).
+
+    Raises:
+        ValueError: nếu thiếu cột để dựng một feature, hoặc có grade không
+            thuộc A-G (liệt kê index của các dòng lỗi)
+    """
+    n_rows = len(df)
+    X = np.empty((n_rows, len(MODEL_FEATURES)), dtype=np.float64)
+    missing = []
+
+    for j, feature in enumerate(MODEL_FEATURES):
+        if feature in df.columns:
+            X[:, j] = pd.to_numeric(df[feature], errors='coerce').to_numpy(dtype=np.float64)
+        elif feature == 'grade_encoded' and {'grade', 'sub_grade'} <= set(df.columns):
+            # Nhận 'B' hoặc 'B3'; giá trị khác (gõ sai, trống) là lỗi chứ không được coi là G
+            grade = df['grade'].astype(str).str.strip().str.upper()
+            known = grade.str.fullmatch(r'[A-G][1-5]?').to_numpy(dtype=bool, na_value=False)
+            if not known.all():
+                raise ValueError(f"Unknown grade (expected A-G) in rows: {_describe_rows(df.index[~known])}")
+            grade_index = grade.str[0].map(_GRADE_INDEX).to_numpy(dtype=np.float64)
+            X[:, j] = grade_index * 5 + (6 - _sub_grade_number(df['sub_grade']))
+        elif feature.startswith('verification_status_') and 'verification_status' in df.columns:
+            status = feature[len('verification_status_'):]
+            X[:, j] = (df['verification_status'].astype(str) == status).to_numpy(dtype=np.float64)
+        elif feature == 'purpose_debt' and 'purpose' in df.columns:
+            X[:, j] = (df['purpose'].astype(str) == 'Debt consolidation').to_numpy(dtype=np.float64)
+        else:
+            missing.append(feature)
+
+    if missing:
+        raise ValueError(f"Missing columns for features: {', '.join(missing)}")
+    return X
+
+
+def to_rate_percent(predictions: np.ndarray) -> np.ndarray:
+    """Đổi dự đoán dạng tỉ lệ (< 1) sang phần trăm, giống form dự đoán."""
+    predictions = np.asarray(predictions, dtype=np.float64)
+    return np.where(predictions < 1, predictions * 100, predictions)
+
+
+def score_features(X: np.ndarray, model, scaler, chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+    """
+    Scale và predict theo từng chunk; trả lãi suất dự đoán (%).
+
+    Batch nhỏ dùng CompiledPredictor (không qua DataFrame/sklearn/DMatrix),
+    batch lớn dùng predict native của XGBoost.
+    """
+    predictor = get_compiled_predictor(model, scaler)
+    if predictor is not None and len(X) <= COMPILED_MAX_BATCH_ROWS:
+        return to_rate_percent(predictor.predict(X))
+
+    predictions = np.empty(len(X), dtype=np.float64)
+    for start in range(0, len(X), chunk_size):
+        chunk = pd.DataFrame(X[start:start + chunk_size], columns=MODEL_FEATURES)
+        predictions[start:start + chunk_size] = model.predict(scaler.transform(chunk))
+    return to_rate_percent(predictions)
+
+
+def score_frame(df: pd.DataFrame, model, scaler, chunk_size: int = DEFAULT_CHUNK_SIZE) -> pd.Series:
+    """
+    Dự đoán lãi suất cho mọi hồ sơ trong DataFrame.
+
+    Returns:
+        Series 'predicted_int_rate' (%) cùng index với df
+    """
+    predictions = score_features(build_feature_matrix(df), model, scaler, chunk_size)
+    return pd.Series(predictions, index=df.index, name='predicted_int_rate')
+
+
+def score_csv(input_path: str, output_path: str, model, scaler,
+              chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Đọc file CSV theo chunk, dự đoán và ghi kết quả ra output_path.
+
+    Bộ nhớ chỉ phụ thuộc chunk_size, không phụ thuộc kích thước file.
+
+    Returns:
+        Số hồ sơ đã chấm điểm
+    """
+    total = 0
+    for i, chunk in enumerate(pd.read_csv(input_path, chunksize=chunk_size)):
+        chunk['predicted_int_rate'] = score_frame(chunk, model, scaler, chunk_size)
+        chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        total += len(chunk)
+    return total
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Entry point CLI."""
+    parser = argparse.ArgumentParser(description="Batch interest rate scoring")
+    parser.add_argument('input', help="CSV file of loan applications")
+    parser.add_argument('-o', '--output', help="Output CSV (default: <input>_scored.csv)")
+    parser.add_argument('--model', default='xgb.joblib', help="Path to XGBoost model")
+    parser.add_argument('--scaler', default='scaler.pkl', help="Path to fitted scaler")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    import joblib
+    model = joblib.load(args.model)
+    scaler = joblib.load(args.scaler)
+
+    output = args.output or args.input.rsplit('.', 1)[0] + '_scored.csv'
+    started = time.perf_counter()
+    try:
+        total = score_csv(args.input, output, model, scaler, args.chunk_size)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"Scored {total:,} applications in {elapsed:.2f}s -> {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,418 @@
+"""
+Aggregation cube: tổng hợp sẵn count/sum theo các chiều của dashboard.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+from utils.data_loader import dataset_fingerprint, parent_frame
+from utils.density import get_histogram
+from utils.filter_engine import (
+    CATEGORY_FILTERS, RANGE_DEFAULTS, RANGE_FILTERS, get_filter_cache, get_filter_options, range_grid
+)
+from utils.helpers import decode_one_hot
+from utils.profiling import profiled
+
+
+CUBE_DIMENSIONS = ['grade', 'region', 'loan_status', 'purpose', 'address_state']
+CUBE_MEASURES = ['loan_amount', 'int_rate', 'dti', 'annual_income']
+
+# Sai số khi so giá trị với điểm lưới của slider
+GRID_TOLERANCE = 1e-3
+
+
+def bin_codes(values: np.ndarray, origin: float, step: float) -> np.ndarray:
+    """
+    Mã bin trên lưới gốc + k * bước: 2k cho giá trị đúng bằng điểm lưới k,
+    2k + 1 cho giá trị nằm giữa điểm k và k + 1, -1 cho NaN.
+
+    Khoảng đóng [điểm i, điểm j] của slider là đúng các mã 2i..2j.
+    """
+    steps = (values - origin) / step
+    nearest = np.rint(steps)
+    on_grid = np.abs(steps - nearest) < GRID_TOLERANCE
+    codes = np.where(on_grid, 2 * nearest, 2 * np.floor(steps) + 1)
+    return np.where(np.isnan(values), -1, codes).astype(np.int64)
+
+
+def grid_edges(origin: float, step: float, high: float) -> np.ndarray:
+    """Các điểm lưới gốc + k * bước từ gốc tới điểm đầu tiên >= high."""
+    n_bins = max(int(np.ceil((high - origin) / step - GRID_TOLERANCE)), 1)
+    # Làm tròn để điểm lưới trùng đúng với giá trị thập phân của dữ liệu
+    # (0.0542 + 3 * 0.005 phải bằng 0.0692), như bin_codes
+    return np.round(origin + step * np.arange(n_bins + 1, dtype=np.float64), 12)
+
+
+def bin_bounds(grid: Tuple[float, float, float, float], low: float,
+               high: float) -> Optional[Tuple[Optional[int], Optional[int]]]:
+    """
+    Khoảng mã bin [lo, hi] ứng với low <= x <= high trên lưới (gốc, bước,
+    min, max); đầu nào phủ hết dữ liệu là None. Trả None nếu một đầu cắt
+    vào giữa dữ liệu mà không nằm trên lưới (không cắt đúng theo ô được).
+    """
+    origin, step, vmin, vmax = grid
+    bounds = []
+    for value, unbounded in ((low, low <= vmin), (high, high >= vmax)):
+        if unbounded:
+            bounds.append(None)
+            continue
+        steps = (value - origin) / step
+        if abs(steps - round(steps)) >= GRID_TOLERANCE:
+            return None
+        bounds.append(2 * int(round(steps)))
+    return bounds[0], bounds[1]
+
+
+def bin_mask(codes: np.ndarray, bounds: Tuple[Optional[int], Optional[int]]) -> np.ndarray:
+    """Mask các mã bin nằm trong bounds (của bin_bounds); NaN (-1) bị loại khi có đầu chặn."""
+    lo, hi = bounds
+    mask = np.ones(len(codes), dtype=bool)
+    if lo is not None or hi is not None:
+        mask &= codes >= (lo if lo is not None else 0)
+    if hi is not None:
+        mask &= codes <= hi
+    return mask
+
+
+class AggregationCube:
+    """
+    Cube thưa (dạng long) theo grade × region × status × purpose × state.
+
+    Mỗi ô lưu số dòng và sum/count không-null của từng measure (cùng max của
+    loan_amount), nên mọi trung bình đều tính lại được chính xác sau khi
+    cắt hoặc gộp ô. Các biểu đồ dashboard chỉ cần `rollup` trên cube này
+    thay vì quét lại toàn bộ dòng dữ liệu.
+    """
+
+    def __init__(self, cells: pd.DataFrame, dimensions: List[str], measures: List[str],
+                 bins: Optional[Dict[str, Tuple[float, float, float, float]]] = None):
+        self.cells = cells
+        self.dimensions = dimensions
+        self.measures = measures
+        # cột khoảng -> (gốc, bước, min, max); chiều '<cột>_bin' chứa bin_codes
+        self.bins = bins or {}
+        self._layout: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame,
+                   bins: Optional[Dict[str, Tuple[float, float]]] = None) -> 'AggregationCube':
+        """
+        Dựng cube trong một lần groupby duy nhất.
+
+        Args:
+            bins: cột khoảng -> (gốc, bước) của slider; mỗi cột thêm một
+                chiều '<cột>_bin' để cube cắt được theo slider (xem slice)
+        """
+        columns = {}
+        for dim in CUBE_DIMENSIONS:
+            if dim in df.columns:
+                columns[dim] = df[dim].array
+            elif dim == 'purpose' and any(col.startswith('purpose_') for col in df.columns):
+                columns[dim] = decode_one_hot(df, 'purpose_')
+        dimensions = list(columns)
+        bin_info = {}
+        for column, (origin, step) in (bins or {}).items():
+            if column in df.columns:
+                values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+                columns[f'{column}_bin'] = bin_codes(values, origin, step)
+                bin_info[column] = (origin, step, float(np.nanmin(values, initial=np.inf)),
+                                    float(np.nanmax(values, initial=-np.inf)))
+        keys = list(columns)
+        measures = [m for m in CUBE_MEASURES if m in df.columns]
+        for m in measures:
+            columns[m] = df[m].to_numpy()
+        frame = pd.DataFrame(columns)
+
+        if not dimensions:
+            frame['_all'] = 0
+            keys = ['_all'] + keys
+
+        grouped = frame.groupby(keys, observed=True, dropna=False, sort=False)
+        aggregations = {}
+        for m in measures:
+            aggregations[f'{m}_sum'] = (m, 'sum')
+            aggregations[f'{m}_count'] = (m, 'count')
+        if 'loan_amount' in measures:
+            aggregations['loan_amount_max'] = ('loan_amount', 'max')
+
+        cells = grouped.agg(**aggregations) if aggregations else pd.DataFrame(index=grouped.size().index)
+        cells['count'] = grouped.size()
+        cells = cells.reset_index()
+        return cls(cells, dimensions, measures, bin_info)
+
+    def merge(self, other: 'AggregationCube') -> 'AggregationCube':
+        """
+        Cube của hợp hai tập dòng (vd. dataset cũ + các dòng mới append).
+
+        Ô trùng khoá được cộng dồn sum/count và lấy max của loan_amount_max.
+        """
+        if other.dimensions != self.dimensions or other.measures != self.measures:
+            raise ValueError("Cannot merge cubes with different dimensions or measures")
+        if {c: b[:2] for c, b in self.bins.items()} != {c: b[:2] for c, b in other.bins.items()}:
+            raise ValueError("Cannot merge cubes binned on different grids")
+
+        cells = pd.concat([self.cells, other.cells], ignore_index=True)
+        for dim in self.dimensions:
+            left, right = self.cells[dim], other.cells[dim]
+            if isinstance(left.dtype, pd.CategoricalDtype):
+                cells[dim] = pd.api.types.union_categoricals(
+                    [left.array, right.astype('category').array], ignore_order=True
+                )
+        keys = (self.dimensions or ['_all']) + [f'{column}_bin' for column in self.bins]
+        if not self.dimensions:
+            cells['_all'] = 0
+
+        grouped = cells.groupby(keys, observed=True, dropna=False, sort=False)
+        sum_cols = [c for c in cells.columns if c.endswith(('_sum', '_count')) or c == 'count']
+        merged = grouped[sum_cols].sum()
+        if 'loan_amount_max' in cells.columns:
+            merged['loan_amount_max'] = grouped['loan_amount_max'].max()
+        merged = merged.reset_index()
+        if not self.dimensions:
+            merged = merged.drop(columns='_all')
+        bins = {
+            column: (origin, step, min(low, other.bins[column][2]), max(high, other.bins[column][3]))
+            for column, (origin, step, low, high) in self.bins.items()
+        }
+        return AggregationCube(merged, self.dimensions, self.measures, bins)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.cells.memory_usage(index=True, deep=True).sum())
+
+    @property
+    def total_count(self) -> int:
+        return int(self.cells['count'].sum())
+
+    def _bin_bounds(self, column: str, low: float, high: float) -> Optional[Tuple[int, int]]:
+        return bin_bounds(self.bins[column], low, high)
+
+    def _category_mask(self, cells: pd.DataFrame, filters: Dict[str, Any]) -> np.ndarray:
+        mask = np.ones(len(cells), dtype=bool)
+        for key, column in CATEGORY_FILTERS.items():
+            values = filters.get(key)
+            if values and column in self.dimensions:
+                mask &= cells[column].isin(list(values)).to_numpy()
+        return mask
+
+    def _sum_columns(self) -> List[str]:
+        return [c for c in self.cells.columns if c.endswith(('_sum', '_count')) or c == 'count']
+
+    def _binned_layout(self) -> Dict[str, Any]:
+        """
+        Các ô (dims, bin) sắp theo ô của cube không bin (tính một lần): bảng
+        chiều của ô gốc, vị trí bắt đầu mỗi ô gốc, mã bin và các cột số
+        dạng ma trận (cột x ô) để gộp bằng một lần reduceat.
+        """
+        if self._layout is None:
+            dimensions = self.dimensions or ['_all']
+            cells = self.cells if self.dimensions else self.cells.assign(_all=0)
+            grouped = cells.groupby(dimensions, observed=True, dropna=False, sort=False)
+            ids = grouped.ngroup().to_numpy()
+            order = np.argsort(ids, kind='stable')
+            sum_cols = self._sum_columns()
+            self._layout = {
+                'base': grouped.size().index.to_frame(index=False),
+                'ids': ids[order],
+                'starts': np.flatnonzero(np.r_[True, np.diff(ids[order]) != 0]),
+                'sum_cols': sum_cols,
+                'sums': self.cells[sum_cols].to_numpy(dtype=np.float64)[order].T.copy(),
+                'maxima': (self.cells['loan_amount_max'].to_numpy(dtype=np.float64)[order]
+                           if 'loan_amount_max' in self.cells.columns else None),
+                'codes': {c: self.cells[f'{c}_bin'].to_numpy(dtype=np.int32)[order] for c in self.bins},
+            }
+        return self._layout
+
+    def _binned_mask(self, filters: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Mask các ô của _binned_layout khớp filters; None nếu khoảng không nằm trên lưới."""
+        layout = self._binned_layout()
+        mask = self._category_mask(layout['base'], filters)[layout['ids']]
+        for key, column in RANGE_FILTERS.items():
+            if column not in self.bins:
+                continue
+            bounds = self._bin_bounds(column, *filters.get(key, RANGE_DEFAULTS[key]))
+            if bounds is None:
+                return None
+            mask &= bin_mask(layout['codes'][column], bounds)
+        return mask
+
+    def slice(self, filters: Dict[str, Any]) -> Optional['AggregationCube']:
+        """
+        Giữ các ô khớp filter category (grades, states, regions).
+
+        Với cube có chiều bin, filter khoảng của slider cũng được áp dụng và
+        kết quả được gộp về các chiều gốc trên các ô (không quét dòng dữ
+        liệu); trả None nếu một đầu khoảng không nằm trên lưới. Cube không
+        bin bỏ qua filter khoảng (người gọi so số dòng với tập lọc).
+        """
+        if not self.bins:
+            mask = self._category_mask(self.cells, filters)
+            return AggregationCube(self.cells[mask], self.dimensions, self.measures)
+
+        layout = self._binned_layout()
+        mask = self._binned_mask(filters)
+        if mask is None:
+            return None
+
+        cells = layout['base'].copy()
+        if len(mask):
+            sums = np.add.reduceat(layout['sums'] * mask, layout['starts'], axis=1)
+            for column, values in zip(layout['sum_cols'], sums):
+                cells[column] = values.astype(np.int64) if column.endswith('_count') or column == 'count' else values
+            if layout['maxima'] is not None:
+                cells['loan_amount_max'] = np.maximum.reduceat(
+                    np.where(mask, layout['maxima'], -np.inf), layout['starts']
+                )
+        else:
+            cells['count'] = np.zeros(0, dtype=np.int64)
+        cells = cells[cells['count'] > 0].reset_index(drop=True)
+        if not self.dimensions:
+            cells = cells.drop(columns='_all')
+        return AggregationCube(cells, self.dimensions, self.measures)
+
+    def histogram(self, column: str, filters: Dict[str, Any],
+                  by: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Histogram của cột khoảng `column` trên các ô khớp filters, mỗi bước
+        lưới slider là một bin, tách theo chiều `by`.
+
+        Cùng quy ước với density.histogram (bin cuối đóng hai đầu), số đếm
+        lấy từ ô của cube nên không quét dòng dữ liệu.
+
+        Returns:
+            Dict gồm 'edges', 'groups', 'counts' (groups x bins) và 'rows' (số
+            dòng khớp filters), hoặc None nếu cube không có chiều bin của
+            `column` hay một đầu khoảng không nằm trên lưới
+        """
+        if column not in self.bins:
+            return None
+        mask = self._binned_mask(filters)
+        if mask is None:
+            return None
+
+        layout = self._binned_layout()
+        origin, step, _, high = self.bins[column]
+        edges = grid_edges(origin, step, high)
+        n_bins = len(edges) - 1
+        if by is not None and by in self.dimensions:
+            codes, groups = pd.factorize(layout['base'][by], sort=True)
+            codes, groups = codes[layout['ids']], list(groups)
+        else:
+            codes, groups = np.zeros(len(mask), dtype=np.intp), [None]
+
+        counts = layout['sums'][layout['sum_cols'].index('count')]
+        bins = layout['codes'][column]
+        valid = mask & (bins >= 0) & (codes >= 0)
+        index = np.minimum(bins[valid] // 2, n_bins - 1)
+        hist = np.bincount(codes[valid] * n_bins + index, weights=counts[valid], minlength=len(groups) * n_bins)
+        return {
+            'edges': edges, 'groups': groups,
+            'counts': hist.astype(np.int64).reshape(len(groups), n_bins),
+            'rows': int(counts[mask].sum()),
+        }
+
+    def rollup(self, by: str) -> pd.DataFrame:
+        """
+        Gộp cube theo một chiều.
+
+        Returns:
+            DataFrame index theo `by` với cột count, <measure>_sum,
+            <measure>_count, <measure>_mean (và loan_amount_max)
+        """
+        sum_cols = [c for c in self.cells.columns if c.endswith(('_sum', '_count')) or c == 'count']
+        grouped = self.cells.groupby(by, observed=True, sort=True)
+        result = grouped[sum_cols].sum()
+        for m in self.measures:
+            result[f'{m}_mean'] = result[f'{m}_sum'] / result[f'{m}_count']
+        if 'loan_amount_max' in self.cells.columns:
+            result['loan_amount_max'] = grouped['loan_amount_max'].max()
+        return result
+
+
+@st.cache_resource(max_entries=4)
+def _build_cube(fingerprint: str, _df: pd.DataFrame, bins: Tuple = ()) -> AggregationCube:
+    """
+    Dựng và cache cube theo fingerprint dataset (và lưới bin, nếu có).
+
+    Dataset tạo bằng append: gộp cube của dataset trước với cube của
+    riêng các dòng mới (khi lưới bin của hai dataset trùng nhau).
+    """
+    parent = parent_frame(_df)
+    if parent is not None and (not bins or bin_grid(parent) == bins):
+        base = _build_cube(dataset_fingerprint(parent), parent, bins)
+        return base.merge(AggregationCube.from_frame(_df.iloc[len(parent):], dict(bins)))
+    return AggregationCube.from_frame(_df, dict(bins))
+
+
+def bin_grid(df: pd.DataFrame) -> Tuple:
+    """Lưới slider của df dạng hashable (khoá cache)."""
+    return tuple(sorted(range_grid(get_filter_options(df)).items()))
+
+
+def get_cube(df: pd.DataFrame) -> AggregationCube:
+    """Cube của toàn bộ dataset (dựng một lần cho mỗi dataset)."""
+    return _build_cube(dataset_fingerprint(df), df)
+
+
+def get_binned_cube(df: pd.DataFrame) -> AggregationCube:
+    """
+    Cube của dataset có thêm chiều bin loan_amount/int_rate theo lưới slider.
+
+    Nhiều ô hơn cube thường nên chỉ dùng khi slider khoảng loại bớt dòng.
+    """
+    return _build_cube(dataset_fingerprint(df), df, bin_grid(df))
+
+
+@profiled()
+def get_view_cube(df: pd.DataFrame, filtered_df: pd.DataFrame) -> AggregationCube:
+    """
+    Cube cho tập đã lọc.
+
+    Nếu chỉ filter category loại dòng, cắt cube gốc là đủ. Nếu slider khoảng
+    (loan_amount, int_rate) cũng loại dòng, cắt cube có chiều bin theo lưới
+    slider. Chỉ khi cả hai không khớp đúng số dòng của tập lọc (vd. khoảng
+    không nằm trên lưới) mới dựng cube từ các dòng đã lọc và lưu trong
+    cache kết quả lọc theo view fingerprint.
+    """
+    filters: Optional[Dict[str, Any]] = filtered_df.attrs.get('filters')
+    if filters is not None:
+        sliced = get_cube(df).slice(filters)
+        if sliced.total_count == len(filtered_df):
+            return sliced
+        sliced = get_binned_cube(df).slice(filters)
+        if sliced is not None and sliced.total_count == len(filtered_df):
+            return sliced
+
+    key = f"{dataset_fingerprint(filtered_df)}:cube"
+    return get_filter_cache().get_or_compute(key, lambda: AggregationCube.from_frame(filtered_df))
+
+
+def get_view_histogram(df: pd.DataFrame, filtered_df: pd.DataFrame, column: str = 'int_rate',
+                       by: Optional[str] = 'grade', source=None) -> Dict[str, Any]:
+    """
+    Histogram của `column` trên tập đã lọc, bin theo lưới slider của df.
+
+    Lấy từ cube có chiều bin khi lát cắt khớp đúng số dòng của tập lọc;
+    nếu không thì đếm trên các dòng đã lọc (density.get_histogram). Với
+    data source SQL (filtered_df chỉ là mẫu dòng), số đếm được tính bằng
+    GROUP BY trên toàn bộ tập lọc và memo theo view fingerprint.
+    """
+    source_filters: Optional[Dict[str, Any]] = filtered_df.attrs.get('source_filters')
+    if source is not None and source_filters is not None:
+        key = f"{dataset_fingerprint(filtered_df)}:histogram:{column}:{by}"
+        hist = get_filter_cache().get_or_compute(key, lambda: source.histogram(source_filters, column, by))
+        if hist is not None:
+            return hist
+
+    filters: Optional[Dict[str, Any]] = filtered_df.attrs.get('filters')
+    if filters is not None:
+        hist = get_binned_cube(df).histogram(column, filters, by)
+        if hist is not None and hist['rows'] == len(filtered_df):
+            return hist
+
+    origin, step = range_grid(get_filter_options(df))[column]
+    edges = grid_edges(origin, step, float(df[column].max()))
+    return get_histogram(filtered_df, column, edges, by)
@@ -2,34 +2,509 @@
 Data loading functions.
 """
 
+import io
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Any, Optional, Tuple
+
 import streamlit as st
 import pandas as pd
+import numpy as np
+
+from config.settings import (
+    CATEGORY_COLUMNS, ONE_HOT_PREFIXES, CATEGORY_MAX_UNIQUE_RATIO, DATA_RELOAD_CHECK_SECONDS
+)
+from utils.helpers import create_loan_status_column
+from utils.profiling import profiled
+
+
+DATE_COLUMNS = ['issue_date', 'last_credit_pull_date', 'last_payment_date', 'next_payment_date']
+
+# Tăng khi thay đổi cách parse/typing để các file cache cũ tự bị bỏ qua
+CACHE_VERSION = 4
+CACHE_METADATA_KEY = b'loan_data_cache'
+
+# Số byte cuối của phần đã load, dùng để nhận ra file chỉ được ghi thêm
+TAIL_HASH_BYTES = 64 * 1024
+
+
+def get_cache_path(file_path: str) -> str:
+    """Đường dẫn file cache Arrow nằm cạnh file CSV."""
+    return os.path.splitext(file_path)[0] + '.arrow'
+
+
+def hash_file(file_path: str, chunk_size: int = 1 << 20, start: int = 0,
+              stop: Optional[int] = None) -> str:
+    """Hash nội dung file (hoặc khoảng byte [start, stop)) theo từng block."""
+    digest = hashlib.blake2b(digest_size=16)
+    position = start
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        while stop is None or position < stop:
+            block = f.read(chunk_size if stop is None else min(chunk_size, stop - position))
+            if not block:
+                break
+            digest.update(block)
+            position += len(block)
+    return digest.hexdigest()
+
+
+def _tail_hash(file_path: str, size: int) -> str:
+    """Hash TAIL_HASH_BYTES byte cuối của `size` byte đầu file."""
+    return hash_file(file_path, start=max(0, size - TAIL_HASH_BYTES), stop=size)
+
+
+def file_fingerprint(file_path: str, with_hash: bool = True,
+                     size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Fingerprint của file CSV: size, mtime và (tuỳ chọn) hash nội dung
+    cùng hash phần đuôi.
+
+    Args:
+        size: Chỉ tính `size` byte đầu (phần đã được load) thay vì cả file
+    """
+    stat = os.stat(file_path)
+    fingerprint = {
+        'version': CACHE_VERSION,
+        'size': stat.st_size if size is None else size,
+        'mtime_ns': stat.st_mtime_ns,
+    }
+    if with_hash:
+        fingerprint['hash'] = hash_file(file_path, stop=fingerprint['size'])
+        fingerprint['tail_hash'] = _tail_hash(file_path, fingerprint['size'])
+    return fingerprint
+
+
+def memory_footprint(df: pd.DataFrame) -> int:
+    """Bộ nhớ thực của DataFrame (byte, tính cả nội dung chuỗi)."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _is_text(series: pd.Series) -> bool:
+    return series.dtype == object or isinstance(series.dtype, pd.StringDtype)
+
+
+def _float32_safe(values: np.ndarray) -> bool:
+    """float32 giữ nguyên chính xác mọi giá trị (kể cả NaN)?"""
+    with np.errstate(over='ignore'):
+        return np.array_equal(values.astype(np.float32).astype(np.float64), values, equal_nan=True)
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Nén dtype theo schema trong config.settings.
+
+    - Cột trong CATEGORY_COLUMNS và cột chuỗi ít giá trị phân biệt -> category
+    - Cột one-hot (ONE_HOT_PREFIXES) chỉ chứa 0/1 -> uint8
+    - Cột số nguyên -> kiểu nguyên nhỏ nhất chứa được
+    - Cột float -> float32 nếu không làm thay đổi giá trị nào
+
+    Returns:
+        DataFrame mới với dtype đã nén
+    """
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if _is_text(series):
+            n_unique = series.nunique(dropna=True)
+            if col in CATEGORY_COLUMNS or n_unique <= CATEGORY_MAX_UNIQUE_RATIO * len(series):
+                series = series.astype('category')
+        elif pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+            pass
+        elif col.startswith(ONE_HOT_PREFIXES) and series.notna().all() and series.isin([0, 1]).all():
+            series = series.astype(np.uint8)
+        elif pd.api.types.is_integer_dtype(series):
+            downcast = 'unsigned' if len(series) and series.min() >= 0 else 'integer'
+            series = pd.to_numeric(series, downcast=downcast)
+        elif pd.api.types.is_float_dtype(series) and series.dtype != np.float32:
+            if _float32_safe(series.to_numpy(dtype=np.float64)):
+                series = series.astype(np.float32)
+        columns[col] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _parse_csv(source) -> pd.DataFrame:
+    """
+    Đọc CSV, chuyển đổi các cột date, nén dtype và tạo cột loan_status.
+
+    Args:
+        source: Đường dẫn hoặc file object chứa nội dung CSV (có header)
+    """
+    df = pd.read_csv(source)
+
+    # Chuyển đổi các cột date nếu có
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    before = memory_footprint(df)
+    df = compact_dtypes(df)
+    df.attrs['memory'] = {'before': before, 'after': memory_footprint(df)}
+
+    # Cột dẫn xuất được tính một lần ở đây và lưu luôn trong file cache
+    return create_loan_status_column(df)
+
+
+def _read_cache_metadata(cache_path: str) -> Optional[Dict[str, Any]]:
+    """Đọc fingerprint lưu trong schema của file cache (chỉ đọc footer)."""
+    import pyarrow as pa
+
+    try:
+        with pa.memory_map(cache_path, 'r') as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+        raw = metadata.get(CACHE_METADATA_KEY)
+        return json.loads(raw) if raw else None
+    except (OSError, pa.ArrowInvalid, ValueError):
+        return None
+
+
+def _is_cache_valid(cached: Optional[Dict[str, Any]], file_path: str) -> bool:
+    """
+    Kiểm tra cache còn khớp với CSV hay không.
+
+    Size + mtime khớp thì tin luôn; nếu chỉ mtime thay đổi (copy, touch...)
+    thì so sánh hash nội dung trước khi bỏ cache (cache ghi sau append mang
+    hash nối tiếp nên trường hợp này sẽ parse lại).
+    """
+    if not cached or cached.get('version') != CACHE_VERSION:
+        return False
+
+    current = file_fingerprint(file_path, with_hash=False)
+    if cached.get('size') != current['size']:
+        return False
+    if cached.get('mtime_ns') == current['mtime_ns']:
+        return True
+    return cached.get('hash') == hash_file(file_path)
+
+
+def read_cache(file_path: str) -> Optional[pd.DataFrame]:
+    """
+    Memory-map file cache Arrow nếu còn hợp lệ.
 
+    Dùng split_blocks nên các cột số không null trỏ thẳng vào vùng nhớ
+    map từ file (read-only, không copy): mọi session và mọi worker process
+    trên cùng máy dùng chung các trang trong page cache của OS.
 
-@st.cache_data(ttl=3600)
+    Returns:
+        DataFrame từ cache hoặc None nếu cache không tồn tại / đã cũ
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+
+    cache_path = get_cache_path(file_path)
+    if not os.path.exists(cache_path):
+        return None
+    if not _is_cache_valid(_read_cache_metadata(cache_path), file_path):
+        return None
+
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(cache_path, 'r'))
+        df = reader.read_all().to_pandas(split_blocks=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+    cached = json.loads(reader.schema.metadata[CACHE_METADATA_KEY])
+    df.attrs['fingerprint'] = cached['hash']
+    df.attrs['source'] = cached
+    if 'memory' in cached:
+        df.attrs['memory'] = cached['memory']
+    return df
+
+
+def write_cache(df: pd.DataFrame, file_path: str, fingerprint: Dict[str, Any]) -> bool:
+    """
+    Ghi DataFrame đã parse ra file Arrow IPC cạnh CSV.
+
+    File được ghi ra file tạm rồi os.replace để các worker process khác
+    không bao giờ đọc phải file ghi dở.
+
+    Returns:
+        True nếu ghi thành công
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return False
+
+    cache_path = get_cache_path(file_path)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[CACHE_METADATA_KEY] = json.dumps(fingerprint).encode()
+        table = table.replace_schema_metadata(metadata)
+
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, cache_path)
+        return True
+    except (OSError, pa.ArrowException):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def load_data_uncached(file_path: str = "financial_loan_clean.csv") -> pd.DataFrame:
+    """
+    Load dữ liệu, ưu tiên file cache Arrow; parse CSV và ghi cache nếu cần.
+
+    Raises:
+        FileNotFoundError: nếu không có file CSV
+    """
+    df = read_cache(file_path)
+    if df is not None:
+        return df
+
+    # Lấy fingerprint trước khi parse để không gắn nhầm cache cho file
+    # bị ghi đè trong lúc đang đọc
+    fingerprint = file_fingerprint(file_path)
+    df = _parse_csv(file_path)
+    fingerprint['memory'] = df.attrs['memory']
+    if write_cache(df, file_path, fingerprint):
+        # Đọc lại qua memory-map để process này cũng dùng chung trang nhớ
+        cached = read_cache(file_path)
+        if cached is not None:
+            return cached
+    df.attrs['fingerprint'] = fingerprint['hash']
+    df.attrs['source'] = fingerprint
+    return df
+
+
+def append_rows(base: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """
+    Nối các dòng mới vào cuối base, giữ dtype đã nén của base.
+
+    Cột category được gộp categories (thứ tự của base giữ nguyên, giá trị
+    mới thêm vào cuối); cột số được ép về dtype của base khi không làm
+    thay đổi giá trị.
+
+    Raises:
+        ValueError: nếu hai DataFrame không cùng tập cột
+    """
+    if list(new.columns) != list(base.columns):
+        raise ValueError("Appended rows do not have the same columns")
+
+    columns = {}
+    for col in base.columns:
+        old, added = base[col], new[col]
+        if isinstance(old.dtype, pd.CategoricalDtype):
+            combined = pd.api.types.union_categoricals(
+                [old.array, added.astype('category').array], ignore_order=True
+            )
+            columns[col] = pd.Series(combined)
+            continue
+        if (pd.api.types.is_numeric_dtype(old) and pd.api.types.is_numeric_dtype(added)
+                and added.dtype != old.dtype and added.notna().all()):
+            cast = added.astype(old.dtype)
+            if (cast.astype(np.float64) == added.astype(np.float64)).all():
+                added = cast
+        columns[col] = pd.concat([old, added], ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def read_appended_rows(file_path: str, start: int, stop: int) -> Tuple[Optional[pd.DataFrame], int]:
+    """
+    Parse các dòng được ghi thêm trong khoảng byte [start, stop).
+
+    Chỉ lấy tới dòng hoàn chỉnh cuối cùng, nên dòng đang ghi dở sẽ được
+    đọc ở lần kiểm tra sau.
+
+    Returns:
+        Tuple (DataFrame các dòng mới hoặc None, offset đã đọc tới)
+    """
+    with open(file_path, 'rb') as f:
+        header = f.readline()
+        f.seek(start)
+        data = f.read(stop - start)
+    end = data.rfind(b'\n') + 1
+    if end == 0:
+        return None, start
+    return _parse_csv(io.BytesIO(header + data[:end])), start + end
+
+
+def _is_append(file_path: str, source: Dict[str, Any], size: int) -> bool:
+    """File chỉ được ghi thêm sau phần đã load? (so hash phần đuôi)"""
+    loaded = source.get('size', 0)
+    if size <= loaded or not source.get('tail_hash') or loaded == 0:
+        return False
+    with open(file_path, 'rb') as f:
+        f.seek(loaded - 1)
+        if f.read(1) != b'\n':
+            return False
+    return _tail_hash(file_path, loaded) == source['tail_hash']
+
+
+def refresh_data(file_path: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cập nhật dataset theo thay đổi của file CSV.
+
+    - Không đổi (size + mtime): trả lại df
+    - Chỉ đổi mtime (touch, copy...) mà cùng hash: shallow copy của df với
+      mtime mới trong `attrs['source']`, để lần kiểm tra sau không phải hash
+      lại cả file
+    - Chỉ ghi thêm: parse riêng phần byte mới rồi nối vào df; kết quả ghi
+      `attrs['parent']` để cube/chỉ mục của df được mở rộng thay vì dựng lại
+    - Thay đổi khác: load lại toàn bộ
+
+    Returns:
+        DataFrame hiện hành (có thể chính là df)
+    """
+    source = df.attrs.get('source') or {}
+    stat = os.stat(file_path)
+    if stat.st_size == source.get('size') and stat.st_mtime_ns == source.get('mtime_ns'):
+        return df
+
+    if _is_append(file_path, source, stat.st_size):
+        try:
+            added, end = read_appended_rows(file_path, source['size'], stat.st_size)
+            if added is None:
+                return df
+            return _append_to(file_path, df, added, end)
+        except (ValueError, pd.errors.ParserError):
+            pass
+    elif stat.st_size == source.get('size') and hash_file(file_path) == source.get('hash'):
+        touched = df.copy(deep=False)
+        touched.attrs = {**df.attrs, 'source': {**source, 'mtime_ns': stat.st_mtime_ns}}
+        return touched
+
+    return load_data_uncached(file_path)
+
+
+def _chain_hash(previous: str, file_path: str, start: int, stop: int) -> str:
+    """Hash của dataset sau append: hash cũ nối với hash các byte mới."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(previous.encode())
+    digest.update(hash_file(file_path, start=start, stop=stop).encode())
+    return digest.hexdigest()
+
+
+def _append_to(file_path: str, df: pd.DataFrame, added: pd.DataFrame, end: int) -> pd.DataFrame:
+    """
+    Nối dòng mới, ghi lại cache Arrow và gắn lineage cho DataFrame mới.
+
+    Chỉ đọc và hash các byte mới: phần cũ được coi là không đổi nhờ size
+    và hash phần đuôi (_is_append), fingerprint mới là hash nối tiếp của
+    fingerprint cũ. Việc nối vẫn copy toàn bộ cột (O(số dòng)) và cache
+    Arrow được ghi lại toàn bộ để các process khác dùng chung.
+    """
+    source = df.attrs['source']
+    combined = append_rows(df, added)
+    fingerprint = file_fingerprint(file_path, with_hash=False, size=end)
+    fingerprint['hash'] = _chain_hash(source['hash'], file_path, source['size'], end)
+    fingerprint['tail_hash'] = _tail_hash(file_path, end)
+    memory = df.attrs.get('memory') or {'before': 0, 'after': 0}
+    fingerprint['memory'] = {
+        'before': memory['before'] + added.attrs['memory']['before'],
+        'after': memory['after'] + added.attrs['memory']['after'],
+    }
+
+    cached = read_cache(file_path) if write_cache(combined, file_path, fingerprint) else None
+    if cached is not None:
+        combined = cached
+    else:
+        combined.attrs['fingerprint'] = fingerprint['hash']
+        combined.attrs['source'] = fingerprint
+        combined.attrs['memory'] = fingerprint['memory']
+    combined.attrs['parent'] = {'fingerprint': dataset_fingerprint(df), 'rows': len(df)}
+    return combined
+
+
+def parent_frame(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Phần đầu của df ứng với dataset trước lần append gần nhất (view).
+
+    Returns:
+        DataFrame mang fingerprint của dataset cũ, hoặc None nếu df không
+        được tạo bằng append
+    """
+    parent = df.attrs.get('parent')
+    if not parent:
+        return None
+    view = df.iloc[:parent['rows']]
+    view.attrs = {'fingerprint': parent['fingerprint']}
+    return view
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Fingerprint nội dung của DataFrame, dùng làm khoá cho các cache.
+
+    Dùng hash file nguồn lưu trong `df.attrs` nếu có (đặt bởi load_data),
+    nếu không thì hash toàn bộ nội dung một lần và ghi lại vào attrs.
+    """
+    fingerprint = df.attrs.get('fingerprint')
+    if fingerprint is None:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(','.join(map(str, df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        fingerprint = digest.hexdigest()
+        df.attrs['fingerprint'] = fingerprint
+    return fingerprint
+
+
+class LiveDataset:
+    """
+    Dataset đang phục vụ của một file CSV, tự cập nhật khi file thay đổi.
+
+    Mỗi lần được truy cập (tối đa một lần mỗi DATA_RELOAD_CHECK_SECONDS)
+    stat file; phần ghi thêm được nối vào, thay đổi khác thì load lại.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.df = load_data_uncached(file_path)
+        self._checked_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def current(self) -> pd.DataFrame:
+        """DataFrame mới nhất (kiểm tra file nếu đã tới hạn)."""
+        if time.monotonic() - self._checked_at < DATA_RELOAD_CHECK_SECONDS:
+            return self.df
+        with self._lock:
+            if time.monotonic() - self._checked_at >= DATA_RELOAD_CHECK_SECONDS:
+                try:
+                    self.df = refresh_data(self.file_path, self.df)
+                except OSError:
+                    # File đang bị thay thế hoặc tạm thời không đọc được
+                    pass
+                self._checked_at = time.monotonic()
+        return self.df
+
+
+@st.cache_resource
+def _get_live_dataset(file_path: str) -> LiveDataset:
+    return LiveDataset(file_path)
+
+
+@profiled()
 def load_data(file_path: str = "financial_loan_clean.csv") -> pd.DataFrame:
     """
     Load và cache dữ liệu từ file CSV.
-    
+
+    Lần đầu parse CSV và ghi cache Arrow cạnh file; các lần sau (kể cả từ
+    process khác) memory-map file cache thay vì đọc lại CSV. Mọi session
+    nhận cùng một DataFrame (không pickle/copy mỗi lần gọi), đã có sẵn cột
+    loan_status; DataFrame này là read-only, chỉ tạo view hoặc shallow copy.
+    Dòng được ghi thêm vào CSV xuất hiện sau tối đa
+    DATA_RELOAD_CHECK_SECONDS mà không phải parse lại cả file.
+
     Args:
         file_path: Đường dẫn đến file CSV
-        
+
     Returns:
         DataFrame chứa dữ liệu khoản vay
     """
     try:
-        df = pd.read_csv(file_path)
-        
-        # Chuyển đổi các cột date nếu có
-        date_columns = ['issue_date', 'last_credit_pull_date', 'last_payment_date', 'next_payment_date']
-        for col in date_columns:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors='coerce')
-        
-        return df
+        return _get_live_dataset(file_path).current()
     except FileNotFoundError:
         st.error(f"❌ Không tìm thấy file: {file_path}")
         return pd.DataFrame()
     except Exception as e:
         st.error(f"❌ Lỗi khi đọc file: {str(e)}")
-        return pd.DataFrame()
\ No newline at end of file
+        return pd.DataFrame()
@@ -0,0 +1,605 @@
+"""
+Data source: file CSV (load toàn bộ vào bộ nhớ) hoặc database nhúng
+(SQLite / DuckDB) với filter đẩy xuống WHERE và aggregation bằng GROUP BY.
+
+Usage:
+    python -m utils.data_source import financial_loan_clean.csv loans.db
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+from config.settings import DATA_SOURCE, DATA_SOURCE_TABLE, LOAN_STATUS_ORDER, SQL_SAMPLE_ROWS
+from utils.cube import CUBE_DIMENSIONS, CUBE_MEASURES, GRID_TOLERANCE, AggregationCube, grid_edges
+from utils.data_loader import DATE_COLUMNS, load_data
+from utils.filter_engine import (
+    CATEGORY_FILTERS, RANGE_FILTERS, RANGE_DEFAULTS, get_filter_cache,
+    normalize_filters, range_grid, view_fingerprint
+)
+from utils.projection import OUTSTANDING_STATUS, RESOLVED_STATUSES
+from utils.summary import SUMMARY_STATS, SUMMARY_QUANTILES
+
+
+SQL_BACKENDS = {
+    '.db': 'sqlite', '.sqlite': 'sqlite', '.sqlite3': 'sqlite', '.duckdb': 'duckdb'
+}
+
+
+def _quote(name: str) -> str:
+    """Quote tên cột/bảng cho SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+class DataSource:
+    """
+    Nguồn dữ liệu của dashboard.
+
+    `in_memory` cho biết app làm việc trên DataFrame đầy đủ (`load`) hay
+    chỉ trên kết quả truy vấn (aggregate, trang dữ liệu, mẫu dòng).
+    """
+
+    in_memory = True
+
+    def __init__(self, url: str):
+        self.url = url
+
+
+class CSVDataSource(DataSource):
+    """File CSV, load một lần vào bộ nhớ dùng chung (hành vi mặc định)."""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.path = path
+
+    def load(self) -> pd.DataFrame:
+        return load_data(self.path)
+
+
+class SQLDataSource(DataSource):
+    """
+    Bảng khoản vay trong SQLite (stdlib) hoặc DuckDB (tuỳ chọn).
+
+    Filter của sidebar thành mệnh đề WHERE, cube của dashboard là một truy
+    vấn GROUP BY, Data Explorer đọc từng trang bằng LIMIT/OFFSET; chỉ
+    aggregate, trang đang xem và một mẫu dòng giới hạn (SQL_SAMPLE_ROWS)
+    đi vào bộ nhớ Python. loan_status và purpose được giải mã từ các cột
+    one-hot ngay trong SQL nếu bảng không có sẵn.
+    """
+
+    in_memory = False
+
+    def __init__(self, url: str, backend: str, path: str, table: str = DATA_SOURCE_TABLE):
+        super().__init__(url)
+        if backend == 'duckdb':
+            try:
+                import duckdb  # noqa: F401
+            except ImportError:
+                raise ImportError("DuckDB backend cần duckdb: pip install duckdb")
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.backend = backend
+        self.path = path
+        self.table = table
+        with self._cursor() as cursor:
+            cursor.execute(f"SELECT * FROM {_quote(table)} LIMIT 0")
+            self.columns = [d[0] for d in cursor.description]
+        self._options: Optional[Tuple[str, Dict[str, Any]]] = None
+
+    @contextmanager
+    def _cursor(self):
+        if self.backend == 'duckdb':
+            import duckdb
+            connection = duckdb.connect(self.path, read_only=True)
+        else:
+            connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        try:
+            yield connection.cursor()
+        finally:
+            connection.close()
+
+    def _query(self, sql: str, params: Optional[list] = None) -> pd.DataFrame:
+        with self._cursor() as cursor:
+            cursor.execute(sql, params or [])
+            names = [d[0] for d in cursor.description]
+            return pd.DataFrame.from_records(cursor.fetchall(), columns=names)
+
+    @property
+    def fingerprint(self) -> str:
+        """Fingerprint theo file database (size + mtime) và tên bảng."""
+        stat = os.stat(self.path)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{self.url}|{self.table}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
+
+    # ------------------------------------------------------------------
+    # Biểu thức cột
+    # ------------------------------------------------------------------
+    def _decoded(self, prefix: str, categories: List[str]) -> Optional[str]:
+        present = [c for c in categories if prefix + c in self.columns]
+        if not present:
+            return None
+        cases = ' '.join(f"WHEN {_quote(prefix + c)} = 1 THEN '{c.replace(chr(39), chr(39) * 2)}'"
+                         for c in present)
+        return f"CASE {cases} ELSE 'Unknown' END"
+
+    def _purpose_categories(self) -> List[str]:
+        return [c[len('purpose_'):] for c in self.columns if c.startswith('purpose_')]
+
+    def expr(self, column: str) -> Optional[str]:
+        """Biểu thức SQL của một cột (kể cả cột giải mã từ one-hot)."""
+        if column in self.columns:
+            return _quote(column)
+        if column == 'loan_status':
+            return self._decoded('loan_status_', LOAN_STATUS_ORDER)
+        if column == 'purpose':
+            return self._decoded('purpose_', self._purpose_categories())
+        return None
+
+    @property
+    def output_columns(self) -> List[str]:
+        """Các cột của một dòng dữ liệu (giống DataFrame của nguồn CSV)."""
+        extra = [c for c in ('loan_status',) if c not in self.columns and self.expr(c)]
+        return self.columns + extra
+
+    def _select_list(self, columns: List[str]) -> str:
+        return ', '.join(f"{self.expr(c)} AS {_quote(c)}" for c in columns)
+
+    # ------------------------------------------------------------------
+    # Filter -> WHERE
+    # ------------------------------------------------------------------
+    def where(self, filters: Dict[str, Any]) -> Tuple[str, list]:
+        """
+        Dịch filters (đã chuẩn hoá) thành mệnh đề WHERE + tham số.
+
+        Khoảng chỉ được thêm khi khác giá trị mặc định, giống FilterEngine.
+        """
+        clauses, params = [], []
+        for key, column in CATEGORY_FILTERS.items():
+            values = filters.get(key)
+            if values and column in self.columns:
+                clauses.append(f"{_quote(column)} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        for key, column in RANGE_FILTERS.items():
+            bounds = filters.get(key)
+            if bounds and column in self.columns and tuple(bounds) != RANGE_DEFAULTS[key]:
+                clauses.append(f"{_quote(column)} BETWEEN ? AND ?")
+                params.extend(float(b) for b in bounds)
+        return ('WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def _search(self, columns: List[str], query: str) -> Tuple[str, list]:
+        query = query.strip().lower()
+        if not query:
+            return '', []
+        pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        parts = [f"LOWER(CAST({self.expr(c)} AS VARCHAR)) LIKE ? ESCAPE '\\'" for c in columns]
+        return '(' + ' OR '.join(parts) + ')', [pattern] * len(parts)
+
+    def _where_search(self, filters: Dict[str, Any], columns: List[str], query: str) -> Tuple[str, list]:
+        where, params = self.where(filters)
+        search, search_params = self._search(columns, query)
+        if search:
+            where = f"{where} AND {search}" if where else f"WHERE {search}"
+        return where, params + search_params
+
+    # ------------------------------------------------------------------
+    # Truy vấn
+    # ------------------------------------------------------------------
+    def filter_options(self) -> Dict[str, Any]:
+        """Lựa chọn filter của sidebar (memo theo fingerprint database)."""
+        fingerprint = self.fingerprint
+        if self._options is not None and self._options[0] == fingerprint:
+            return self._options[1]
+
+        table = _quote(self.table)
+        options: Dict[str, Any] = {'memory': None}
+        options['rows'] = int(self._query(f"SELECT COUNT(*) AS n FROM {table}")['n'].iloc[0])
+        for key, column in CATEGORY_FILTERS.items():
+            if column in self.columns:
+                values = self._query(
+                    f"SELECT DISTINCT {_quote(column)} AS v FROM {table} WHERE {_quote(column)} IS NOT NULL"
+                )['v']
+                options[key] = sorted(values.tolist())
+            else:
+                options[key] = None
+        for key, column in RANGE_FILTERS.items():
+            if column in self.columns:
+                bounds = self._query(
+                    f"SELECT MIN({_quote(column)}) AS lo, MAX({_quote(column)}) AS hi FROM {table}"
+                ).iloc[0]
+                options[key] = (float(bounds['lo']), float(bounds['hi']))
+            else:
+                options[key] = None
+        self._options = (fingerprint, options)
+        return options
+
+    def count(self, filters: Dict[str, Any], columns: Optional[List[str]] = None, query: str = '') -> int:
+        """Số dòng khớp filters (và chuỗi tìm kiếm trên `columns`)."""
+        where, params = self._where_search(filters, columns or [], query)
+        sql = f"SELECT COUNT(*) AS n FROM {_quote(self.table)} {where}"
+        return int(self._query(sql, params)['n'].iloc[0])
+
+    def cube(self, filters: Dict[str, Any]) -> AggregationCube:
+        """AggregationCube của tập lọc, tính bằng một truy vấn GROUP BY."""
+        dimensions = [d for d in CUBE_DIMENSIONS if self.expr(d) is not None]
+        measures = [m for m in CUBE_MEASURES if m in self.columns]
+
+        select = [f"{self.expr(d)} AS {_quote(d)}" for d in dimensions]
+        for m in measures:
+            select.append(f"SUM({_quote(m)}) AS {_quote(m + '_sum')}")
+            select.append(f"COUNT({_quote(m)}) AS {_quote(m + '_count')}")
+        if 'loan_amount' in measures:
+            select.append(f"MAX({_quote('loan_amount')}) AS {_quote('loan_amount_max')}")
+        select.append('COUNT(*) AS "count"')
+
+        where, params = self.where(filters)
+        group = f"GROUP BY {', '.join(str(i + 1) for i in range(len(dimensions)))}" if dimensions else ''
+        cells = self._query(f"SELECT {', '.join(select)} FROM {_quote(self.table)} {where} {group}", params)
+
+        # Cùng thứ tự categories với cube dựng từ DataFrame
+        ordered = {
+            'loan_status': LOAN_STATUS_ORDER + ['Unknown'],
+            'purpose': self._purpose_categories() + ['Unknown'],
+        }
+        for dim in dimensions:
+            if dim in ordered and dim not in self.columns:
+                cells[dim] = pd.Categorical(cells[dim], categories=ordered[dim])
+            else:
+                cells[dim] = cells[dim].astype('category')
+        for m in measures:
+            cells[f'{m}_sum'] = cells[f'{m}_sum'].astype(np.float64)
+        if not dimensions:
+            cells['_all'] = 0
+        return AggregationCube(cells, dimensions, measures)
+
+    def cached_cube(self, filters: Dict[str, Any]) -> AggregationCube:
+        """cube() của tập lọc, memo trong cache kết quả lọc theo view fingerprint."""
+        normalized = normalize_filters(filters)
+        key = view_fingerprint(self.fingerprint, normalized)
+        return get_filter_cache().get_or_compute(f"{key}:cube", lambda: self.cube(normalized))
+
+    def histogram(self, filters: Dict[str, Any], column: str,
+                  by: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Histogram của cột khoảng `column` trên tập lọc, mỗi bước lưới slider
+        (tính từ min/max của toàn bảng) là một bin, tách theo `by`; đếm bằng
+        một truy vấn GROUP BY (nhóm, bin).
+
+        Cùng dạng và quy ước với AggregationCube.histogram (giá trị trên
+        điểm lưới thuộc bin bắt đầu tại điểm đó, bin cuối đóng hai đầu).
+
+        Returns:
+            Dict 'edges', 'groups', 'counts' (groups x bins) và 'rows' (số
+            dòng của tập lọc), hoặc None nếu `column` không có slider
+        """
+        options = self.filter_options()
+        keys = [key for key, col in RANGE_FILTERS.items() if col == column and options.get(key) is not None]
+        if not keys:
+            return None
+        origin, step = range_grid(options)[column]
+        edges = grid_edges(origin, step, options[keys[0]][1])
+        n_bins = len(edges) - 1
+
+        steps = f"({_quote(column)} - {origin!r}) / {step!r} + {GRID_TOLERANCE!r}"
+        # Giá trị >= gốc (min của bảng) nên CAST cắt phần thập phân như floor
+        index = f"CAST(FLOOR({steps}) AS BIGINT)" if self.backend == 'duckdb' else f"CAST({steps} AS INTEGER)"
+        group = self.expr(by) if by is not None else None
+        where, params = self.where(filters)
+        counts = self._query(
+            f"SELECT {group or 'NULL'} AS g, {index} AS b, COUNT(*) AS n FROM {_quote(self.table)} "
+            f"{where} GROUP BY 1, 2", params
+        )
+
+        rows = int(counts['n'].sum())
+        valid = counts['b'].notna() & (counts['g'].notna() if group else True)
+        counts = counts[valid]
+        if group:
+            codes, groups = pd.factorize(counts['g'], sort=True)
+            groups = list(groups)
+        else:
+            codes, groups = np.zeros(len(counts), dtype=np.intp), [None]
+        index = np.clip(counts['b'].to_numpy(dtype=np.int64), 0, n_bins - 1)
+        hist = np.bincount(codes * n_bins + index, weights=counts['n'].to_numpy(dtype=np.float64),
+                           minlength=len(groups) * n_bins)
+        return {
+            'edges': edges, 'groups': groups,
+            'counts': hist.astype(np.int64).reshape(len(groups), n_bins), 'rows': rows,
+        }
+
+    def latest_date(self, column: str = 'issue_date') -> Optional[pd.Timestamp]:
+        """Giá trị lớn nhất của một cột ngày trên toàn bảng (None nếu không có)."""
+        if column not in self.columns:
+            return None
+
+        def compute() -> Optional[pd.Timestamp]:
+            value = self._query(f"SELECT MAX({_quote(column)}) AS v FROM {_quote(self.table)}")['v'].iloc[0]
+            value = pd.to_datetime(value, errors='coerce')
+            return None if pd.isna(value) else value
+
+        return get_filter_cache().get_or_compute(f"{self.fingerprint}:latest:{column}", compute)
+
+    def _month_index(self, column: str) -> str:
+        """Biểu thức năm * 12 + tháng của một cột ngày."""
+        col = _quote(column)
+        if self.backend == 'duckdb':
+            return f"(year(CAST({col} AS DATE)) * 12 + month(CAST({col} AS DATE)))"
+        return f"(CAST(strftime('%Y', {col}) AS INTEGER) * 12 + CAST(strftime('%m', {col}) AS INTEGER))"
+
+    def projection_aggregates(self, filters: Dict[str, Any],
+                              as_of: Optional[pd.Timestamp]) -> Dict[str, pd.DataFrame]:
+        """
+        Đầu vào của dự phóng danh mục (utils.projection) cho toàn bộ tập
+        lọc, tính bằng GROUP BY thay vì trên mẫu dòng.
+
+        Returns:
+            Dict 'outstanding' (khoản Current theo grade, term_months,
+            int_rate, months_on_book: số khoản vay 'loans' và tổng gốc
+            'loan_amount') và 'realised' (khoản đã kết thúc theo trạng thái:
+            loans, principal, collected)
+        """
+        table = _quote(self.table)
+        where, params = self.where(filters)
+        status = self.expr('loan_status')
+
+        def with_status(values: List[str]) -> Tuple[str, list]:
+            if status is None:
+                return where, params
+            clause = f"{status} IN ({', '.join('?' * len(values))})"
+            return (f"{where} AND {clause}" if where else f"WHERE {clause}"), params + values
+
+        keys = [f"{_quote(c)} AS {_quote(c)}" for c in ('grade', 'term_months', 'int_rate') if c in self.columns]
+        if as_of is not None and 'issue_date' in self.columns:
+            keys.append(f"{as_of.year * 12 + as_of.month} - {self._month_index('issue_date')} AS months_on_book")
+        else:
+            keys.append("0 AS months_on_book")
+        outstanding_where, outstanding_params = with_status([OUTSTANDING_STATUS])
+        outstanding = self._query(
+            f"SELECT {', '.join(keys)}, COUNT(*) AS loans, SUM({_quote('loan_amount')}) AS loan_amount "
+            f"FROM {table} {outstanding_where} GROUP BY {', '.join(str(i + 1) for i in range(len(keys)))}",
+            outstanding_params
+        )
+        # Cùng quy ước với months_on_book: thiếu ngày -> 0, không âm
+        outstanding['months_on_book'] = outstanding['months_on_book'].astype(np.float64).fillna(0).clip(lower=0)
+
+        columns = ['loans', 'principal', 'collected']
+        if status is None:
+            realised = pd.DataFrame(columns=columns, dtype=np.float64)
+        else:
+            collected = f"SUM({_quote('total_payment')})" if 'total_payment' in self.columns else 'NULL'
+            realised_where, realised_params = with_status(RESOLVED_STATUSES)
+            realised = self._query(
+                f"SELECT {status} AS loan_status, COUNT(*) AS loans, SUM({_quote('loan_amount')}) AS principal, "
+                f"{collected} AS collected FROM {table} {realised_where} GROUP BY 1 ORDER BY 1",
+                realised_params
+            ).set_index('loan_status')[columns].astype(np.float64)
+        return {'outstanding': outstanding, 'realised': realised}
+
+    def sample(self, filters: Dict[str, Any], n: int = SQL_SAMPLE_ROWS) -> pd.DataFrame:
+        """Mẫu ngẫu nhiên tối đa n dòng của tập lọc."""
+        where, params = self.where(filters)
+        sql = (f"SELECT {self._select_list(self.output_columns)} FROM {_quote(self.table)} "
+               f"{where} ORDER BY RANDOM() LIMIT {int(n)}")
+        return self._with_dates(self._query(sql, params))
+
+    def page(self, filters: Dict[str, Any], columns: List[str], page: int, page_size: int,
+             sort_by: Optional[str] = None, ascending: bool = True, query: str = '') -> pd.DataFrame:
+        """Một trang dữ liệu (chỉ các cột `columns`), sort/tìm kiếm trong SQL."""
+        where, params = self._where_search(filters, columns, query)
+        order = ''
+        if sort_by is not None:
+            column = self.expr(sort_by)
+            # NULL luôn ở cuối như sort của pandas; rowid giữ thứ tự ổn định giữa các trang
+            order = f"ORDER BY ({column} IS NULL), {column} {'ASC' if ascending else 'DESC'}, rowid"
+        offset = max(page - 1, 0) * page_size
+        sql = (f"SELECT {self._select_list(columns)} FROM {_quote(self.table)} {where} {order} "
+               f"LIMIT {int(page_size)} OFFSET {int(offset)}")
+        return self._with_dates(self._query(sql, params))
+
+    def iter_chunks(self, filters: Dict[str, Any], chunk_rows: int = 50_000) -> Iterator[pd.DataFrame]:
+        """Duyệt toàn bộ tập lọc theo từng chunk (cursor fetchmany)."""
+        where, params = self.where(filters)
+        columns = self.output_columns
+        sql = f"SELECT {self._select_list(columns)} FROM {_quote(self.table)} {where}"
+        with self._cursor() as cursor:
+            cursor.execute(sql, params)
+            yielded = False
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                yielded = True
+                yield self._with_dates(pd.DataFrame.from_records(rows, columns=columns))
+            if not yielded:
+                yield pd.DataFrame(columns=columns)
+
+    def describe(self, filters: Dict[str, Any], columns: List[str],
+                 sample: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Thống kê kiểu describe().T: count/mean/std/min/max chính xác từ SQL,
+        quantile ước lượng trên mẫu dòng (nếu có).
+        """
+        table = _quote(self.table)
+        where, params = self.where(filters)
+        select, spread = [], []
+        for i, c in enumerate(columns):
+            col = _quote(c)
+            select += [f"COUNT({col}) AS n{i}", f"AVG({col}) AS mean{i}",
+                       f"MIN({col}) AS lo{i}", f"MAX({col}) AS hi{i}"]
+            if self.backend == 'duckdb':
+                select.append(f"VAR_SAMP({col}) AS var{i}")
+            else:
+                spread.append(f"SUM(({col} - mean{i}) * ({col} - mean{i})) / (n{i} - 1) AS var{i}")
+        sql = f"SELECT {', '.join(select)} FROM {table} {where}"
+        if spread:
+            # SQLite không có hàm variance: lượt thứ hai tính tổng bình phương
+            # độ lệch quanh mean (ổn định số học hơn AVG(x*x) - AVG(x)^2)
+            sql = (f"WITH m AS ({sql}) SELECT * FROM m, "
+                   f"(SELECT {', '.join(spread)} FROM {table}, m {where}) AS d")
+            params = params + params
+        row = self._query(sql, params).iloc[0]
+
+        stats = {}
+        for i, c in enumerate(columns):
+            n = int(row[f'n{i}'])
+            mean = float(row[f'mean{i}']) if n else np.nan
+            variance = float(row[f'var{i}']) if n > 1 else np.nan
+            values = sample[c].dropna().to_numpy(dtype=np.float64) if sample is not None and c in sample else []
+            quantiles = np.quantile(values, SUMMARY_QUANTILES) if len(values) else [np.nan] * 3
+            stats[c] = {
+                'count': n, 'mean': mean, 'std': np.sqrt(max(variance, 0)) if n > 1 else np.nan,
+                'min': row[f'lo{i}'], 'max': row[f'hi{i}'],
+                **{f'{q:.0%}': v for q, v in zip(SUMMARY_QUANTILES, quantiles)}
+            }
+        return pd.DataFrame.from_dict(stats, orient='index', columns=SUMMARY_STATS)
+
+    def view(self, filters: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Mẫu dòng của tập lọc, dùng thay cho filtered_df.
+
+        KPI và cube của tập lọc được tính bằng SQL và đặt sẵn vào cache
+        kết quả lọc dưới view fingerprint (đặt vào attrs của mẫu), nên
+        get_view_kpis / get_view_cube trả về số liệu của toàn bộ tập lọc
+        chứ không phải của mẫu.
+        """
+        normalized = normalize_filters(filters)
+        key = view_fingerprint(self.fingerprint, normalized)
+        cache = get_filter_cache()
+
+        cube = self.cached_cube(normalized)
+
+        def compute() -> Dict[str, Any]:
+            return {
+                'positions': None, 'filters': normalized, 'kpis': kpis_from_cube(cube),
+                'sample': self.sample(normalized)
+            }
+
+        entry = cache.get_or_compute(key, compute)
+        view = entry['sample'].copy(deep=False)
+        view.attrs['fingerprint'] = key
+        view.attrs['rows'] = entry['kpis']['count']
+        view.attrs['source_filters'] = normalized
+        return view
+
+    def _with_dates(self, df: pd.DataFrame) -> pd.DataFrame:
+        for col in DATE_COLUMNS:
+            if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = pd.to_datetime(df[col], errors='coerce')
+        return df
+
+
+def kpis_from_cube(cube: AggregationCube) -> Dict[str, Any]:
+    """KPI (cùng dạng compute_kpis) tính từ các ô của cube."""
+    cells = cube.cells
+    count = cube.total_count
+
+    def mean(measure: str) -> Optional[float]:
+        if measure not in cube.measures:
+            return None
+        n = cells[f'{measure}_count'].sum()
+        return float(cells[f'{measure}_sum'].sum() / n) if n else float('nan')
+
+    has_amount = 'loan_amount' in cube.measures
+    has_status = 'loan_status' in cube.dimensions
+    risk_count = int(cells.loc[cells['loan_status'] == 'Charged Off', 'count'].sum()) if has_status else None
+    return {
+        'count': count,
+        'total_volume': float(cells['loan_amount_sum'].sum()) if has_amount else None,
+        'avg_loan': mean('loan_amount'),
+        'max_loan': float(cells['loan_amount_max'].max()) if has_amount and len(cells) else None,
+        'avg_int_rate': mean('int_rate'),
+        'avg_dti': mean('dti'),
+        'risk_count': risk_count,
+        'risk_rate': (risk_count / count) * 100 if has_status and count > 0 else None
+    }
+
+
+def open_data_source(url: str) -> DataSource:
+    """
+    Mở data source theo URL.
+
+    - 'sqlite:///loans.db', 'duckdb:///loans.duckdb' (bốn gạch chéo cho
+      đường dẫn tuyệt đối)
+    - đường dẫn có đuôi .db / .sqlite / .sqlite3 / .duckdb
+    - còn lại: file CSV
+    """
+    if '://' in url:
+        scheme, rest = url.split('://', 1)
+        path = rest[1:] if rest.startswith('/') else rest
+        if scheme not in ('sqlite', 'duckdb'):
+            raise ValueError(f"Unsupported data source: {url}")
+        return SQLDataSource(url, scheme, path)
+
+    backend = SQL_BACKENDS.get(os.path.splitext(url)[1].lower())
+    if backend is not None:
+        return SQLDataSource(url, backend, url)
+    return CSVDataSource(url)
+
+
+@st.cache_resource
+def get_data_source(url: str = DATA_SOURCE) -> DataSource:
+    """Data source dùng chung cho mọi session (theo config DATA_SOURCE)."""
+    return open_data_source(url)
+
+
+def import_csv(csv_path: str, db_path: str, table: str = DATA_SOURCE_TABLE,
+               chunk_size: int = 100_000) -> int:
+    """
+    Nạp file CSV vào bảng SQLite/DuckDB (thay bảng cũ) và tạo index cho
+    các cột filter.
+
+    Returns:
+        Số dòng đã nạp
+    """
+    backend = SQL_BACKENDS.get(os.path.splitext(db_path)[1].lower(), 'sqlite')
+    if backend == 'duckdb':
+        import duckdb
+        with duckdb.connect(db_path) as connection:
+            connection.execute(
+                f"CREATE OR REPLACE TABLE {_quote(table)} AS SELECT * FROM read_csv_auto(?)", [csv_path]
+            )
+            return int(connection.execute(f"SELECT COUNT(*) FROM {_quote(table)}").fetchone()[0])
+
+    total = 0
+    with sqlite3.connect(db_path) as connection:
+        for i, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunk_size)):
+            chunk.to_sql(table, connection, if_exists='replace' if i == 0 else 'append', index=False)
+            total += len(chunk)
+        columns = {row[1] for row in connection.execute(f"PRAGMA table_info({_quote(table)})")}
+        for column in list(CATEGORY_FILTERS.values()) + list(RANGE_FILTERS.values()):
+            if column in columns:
+                connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_quote(f'idx_{table}_{column}')} "
+                    f"ON {_quote(table)} ({_quote(column)})"
+                )
+    return total
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Entry point CLI."""
+    parser = argparse.ArgumentParser(description="Loan data source tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    load = subparsers.add_parser('import', help="Load a CSV file into SQLite/DuckDB")
+    load.add_argument('csv', help="Source CSV file")
+    load.add_argument('database', help="Target database (.db/.sqlite for SQLite, .duckdb for DuckDB)")
+    load.add_argument('--table', default=DATA_SOURCE_TABLE)
+    load.add_argument('--chunk-size', type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    total = import_csv(args.csv, args.database, args.table, args.chunk_size)
+    elapsed = time.perf_counter() - started
+    print(f"Imported {total:,} rows in {elapsed:.2f}s -> {args.database} (table {args.table})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Đếm theo bin (histogram 1D, lưới mật độ 2D) tách theo nhóm, tính trên server
+để biểu đồ chỉ nhận số đếm thay vì từng dòng dữ liệu.
+"""
+
+from typing import Dict, Any, Optional
+
+import pandas as pd
+import numpy as np
+
+from utils.data_loader import dataset_fingerprint
+from utils.filter_engine import get_filter_cache
+
+
+def _group_codes(df: pd.DataFrame, by: Optional[str]):
+    """Mã nhóm (-1 nếu thiếu) và danh sách nhãn nhóm đã sort."""
+    if by is not None and by in df.columns:
+        codes, groups = pd.factorize(df[by], sort=True)
+        return codes, list(groups)
+    return np.zeros(len(df), dtype=np.intp), [None]
+
+
+def histogram(df: pd.DataFrame, column: str, edges: np.ndarray,
+              by: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Histogram của `column` trên các biên cố định `edges`, tách theo nhóm `by`.
+
+    Cùng quy ước với np.histogram (bin cuối đóng hai đầu, giá trị ngoài
+    khoảng bị bỏ) nhưng đếm mọi nhóm trong một lần bincount.
+
+    Returns:
+        Dict gồm 'edges', 'groups' (nhãn nhóm) và 'counts' (mảng groups x bins)
+    """
+    edges = np.asarray(edges, dtype=np.float64)
+    n_bins = len(edges) - 1
+    values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    codes, groups = _group_codes(df, by)
+
+    valid = (values >= edges[0]) & (values <= edges[-1]) & (codes >= 0)
+    index = np.searchsorted(edges, values[valid], side='right') - 1
+    index = np.minimum(index, n_bins - 1)
+    counts = np.bincount(codes[valid] * n_bins + index, minlength=len(groups) * n_bins)
+    return {'edges': edges, 'groups': groups, 'counts': counts.reshape(len(groups), n_bins)}
+
+
+def get_histogram(df: pd.DataFrame, column: str, edges: np.ndarray,
+                  by: Optional[str] = None) -> Dict[str, Any]:
+    """histogram của df, memo trong cache kết quả lọc theo fingerprint (view)."""
+    key = f"{dataset_fingerprint(df)}:histogram:{column}:{by}:{edges[0]}:{edges[-1]}:{len(edges)}"
+    return get_filter_cache().get_or_compute(key, lambda: histogram(df, column, edges, by))
+
+
+def density_grid(df: pd.DataFrame, x: str, y: str, by: Optional[str] = None,
+                 bins: int = 60) -> Dict[str, Any]:
+    """
+    Đếm số dòng theo lưới bins x bins của (x, y), tách theo nhóm `by`.
+
+    Toàn bộ là phép toán NumPy trên cả cột: tính chỉ số ô rồi một lần
+    bincount trên khoá (nhóm, ô x, ô y). Dòng thiếu x hoặc y bị bỏ qua.
+
+    Returns:
+        Dict gồm 'x_edges', 'y_edges' (bins + 1 biên), 'groups' (nhãn nhóm)
+        và 'counts' (mảng groups x bins x bins)
+    """
+    xs = df[x].to_numpy(dtype=np.float64, na_value=np.nan)
+    ys = df[y].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    codes, groups = _group_codes(df, by)
+
+    valid = ~np.isnan(xs) & ~np.isnan(ys) & (codes >= 0)
+    xs, ys, codes = xs[valid], ys[valid], codes[valid]
+
+    def edges_and_index(values: np.ndarray):
+        low, high = (float(values.min()), float(values.max())) if len(values) else (0.0, 1.0)
+        if high <= low:
+            high = low + 1.0
+        edges = np.linspace(low, high, bins + 1)
+        index = ((values - low) * (bins / (high - low))).astype(np.intp)
+        return edges, np.clip(index, 0, bins - 1)
+
+    x_edges, ix = edges_and_index(xs)
+    y_edges, iy = edges_and_index(ys)
+    flat = (codes * bins + ix) * bins + iy
+    counts = np.bincount(flat, minlength=len(groups) * bins * bins).reshape(len(groups), bins, bins)
+    return {'x_edges': x_edges, 'y_edges': y_edges, 'groups': groups, 'counts': counts}
+
+
+def get_density_grid(df: pd.DataFrame, x: str, y: str, by: Optional[str] = None,
+                     bins: int = 60) -> Dict[str, Any]:
+    """density_grid của df, memo trong cache kết quả lọc theo fingerprint (view)."""
+    key = f"{dataset_fingerprint(df)}:density:{x}:{y}:{by}:{bins}"
+    return get_filter_cache().get_or_compute(key, lambda: density_grid(df, x, y, by, bins))
@@ -0,0 +1,202 @@
+"""
+Export dữ liệu theo từng chunk (CSV, CSV gzip, Parquet).
+
+Usage:
+    python -m utils.export -o loans.parquet --grades A B --amount-min 5000
+"""
+
+import argparse
+import gzip
+import io
+import sys
+import time
+from typing import BinaryIO, Dict, Any, Iterable, Iterator, Optional
+
+import pandas as pd
+
+from utils.profiling import profiled
+
+
+EXPORT_FORMATS = {
+    'csv': {'label': 'CSV', 'extension': '.csv', 'mime': 'text/csv'},
+    'csv.gz': {'label': 'CSV (gzip)', 'extension': '.csv.gz', 'mime': 'application/gzip'},
+    'parquet': {'label': 'Parquet', 'extension': '.parquet', 'mime': 'application/vnd.apache.parquet'},
+}
+
+# Số dòng mỗi chunk khi ghi; bộ nhớ tạm chỉ phụ thuộc giá trị này
+EXPORT_CHUNK_ROWS = 50_000
+
+
+def iter_frames(df: pd.DataFrame, chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Chia df thành các chunk dòng liên tiếp (view, không copy)."""
+    if len(df) == 0:
+        yield df
+        return
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def iter_csv_chunks(frames: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """
+    Sinh nội dung CSV (UTF-8) cho từng chunk, header ở chunk đầu.
+    """
+    for i, chunk in enumerate(frames):
+        yield chunk.to_csv(index=False, header=(i == 0)).encode('utf-8')
+
+
+def _write_parquet(frames: Iterable[pd.DataFrame], output: BinaryIO) -> None:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export cần pyarrow: pip install pyarrow")
+
+    writer = None
+    try:
+        for chunk in frames:
+            if writer is None:
+                schema = pa.Schema.from_pandas(chunk.iloc[:0], preserve_index=False)
+                writer = pq.ParquetWriter(output, schema, compression='snappy')
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_frames(frames: Iterable[pd.DataFrame], output: BinaryIO, fmt: str = 'csv') -> int:
+    """
+    Ghi lần lượt các chunk DataFrame (cùng schema) ra file nhị phân đã mở.
+
+    Args:
+        frames: Các chunk dòng, chỉ cần duyệt một lần
+        output: File object mở ở chế độ nhị phân
+        fmt: Một key của EXPORT_FORMATS
+
+    Returns:
+        Số dòng đã ghi
+
+    Raises:
+        ValueError: nếu định dạng không được hỗ trợ
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    total = 0
+
+    def counted() -> Iterator[pd.DataFrame]:
+        nonlocal total
+        for chunk in frames:
+            total += len(chunk)
+            yield chunk
+
+    if fmt == 'parquet':
+        _write_parquet(counted(), output)
+    elif fmt == 'csv.gz':
+        # mtime=0 để cùng dữ liệu luôn cho ra cùng file
+        with gzip.GzipFile(fileobj=output, mode='wb', mtime=0) as compressed:
+            for data in iter_csv_chunks(counted()):
+                compressed.write(data)
+    else:
+        for data in iter_csv_chunks(counted()):
+            output.write(data)
+    return total
+
+
+def write_export(df: pd.DataFrame, output: BinaryIO, fmt: str = 'csv',
+                 chunk_rows: int = EXPORT_CHUNK_ROWS) -> int:
+    """
+    Ghi df ra file nhị phân đã mở theo định dạng `fmt`, từng chunk một.
+
+    Returns:
+        Số dòng đã ghi
+    """
+    return write_frames(iter_frames(df, chunk_rows), output, fmt)
+
+
+@profiled()
+def export_to_bytes(data, fmt: str = 'csv', chunk_rows: int = EXPORT_CHUNK_ROWS) -> bytes:
+    """
+    Export ra bytes theo định dạng `fmt`.
+
+    Args:
+        data: DataFrame, hoặc iterable các chunk DataFrame (vd. từ data source SQL)
+
+    Dùng làm `data` của st.download_button qua một callable để file chỉ
+    được tạo khi người dùng bấm tải về. Streamlit giữ toàn bộ file trong
+    RAM để phục vụ tải về, nên kết quả là bytes; chỉ CLI mới ghi thẳng ra
+    file từng chunk.
+    """
+    frames = iter_frames(data, chunk_rows) if isinstance(data, pd.DataFrame) else data
+    output = io.BytesIO()
+    write_frames(frames, output, fmt)
+    return output.getvalue()
+
+
+def format_from_path(path: str) -> str:
+    """Suy ra định dạng export từ đuôi file (mặc định csv)."""
+    for fmt in sorted(EXPORT_FORMATS, key=lambda f: -len(EXPORT_FORMATS[f]['extension'])):
+        if path.endswith(EXPORT_FORMATS[fmt]['extension']):
+            return fmt
+    return 'csv'
+
+
+def _filters_from_args(args: argparse.Namespace) -> Dict[str, Any]:
+    from utils.filter_engine import RANGE_DEFAULTS
+
+    amount_low, amount_high = RANGE_DEFAULTS['amount_range']
+    rate_low, rate_high = RANGE_DEFAULTS['rate_range']
+    return {
+        'grades': args.grades,
+        'states': args.states,
+        'regions': args.regions,
+        'amount_range': (
+            args.amount_min if args.amount_min is not None else amount_low,
+            args.amount_max if args.amount_max is not None else amount_high
+        ),
+        # Trên CLI lãi suất nhập theo %, giống slider của sidebar
+        'rate_range': (
+            args.rate_min / 100 if args.rate_min is not None else rate_low,
+            args.rate_max / 100 if args.rate_max is not None else rate_high
+        ),
+    }
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Entry point CLI."""
+    parser = argparse.ArgumentParser(description="Export (filtered) loan data")
+    parser.add_argument('-i', '--input', default='financial_loan_clean.csv', help="Source CSV file")
+    parser.add_argument('-o', '--output', required=True, help="Output file (.csv, .csv.gz, .parquet)")
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS), help="Default: inferred from output")
+    parser.add_argument('--grades', nargs='+', help="Keep only these grades")
+    parser.add_argument('--states', nargs='+', help="Keep only these states")
+    parser.add_argument('--regions', nargs='+', help="Keep only these regions")
+    parser.add_argument('--amount-min', type=float)
+    parser.add_argument('--amount-max', type=float)
+    parser.add_argument('--rate-min', type=float, help="Minimum interest rate (%%)")
+    parser.add_argument('--rate-max', type=float, help="Maximum interest rate (%%)")
+    parser.add_argument('--chunk-rows', type=int, default=EXPORT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    from utils.data_loader import load_data_uncached
+    from utils.filter_engine import FilterEngine, normalize_filters
+
+    started = time.perf_counter()
+    df = load_data_uncached(args.input)
+    positions = FilterEngine(df).select(normalize_filters(_filters_from_args(args)))
+    if positions is not None:
+        df = df.iloc[positions]
+
+    fmt = args.format or format_from_path(args.output)
+    try:
+        with open(args.output, 'wb') as output:
+            total = write_export(df, output, fmt, args.chunk_rows)
+    except ImportError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"Exported {total:,} rows ({fmt}) in {elapsed:.2f}s -> {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Compiled inference: StandardScaler + XGBoost booster dưới dạng mảng NumPy phẳng.
+
+Usage:
+    python -m utils.fast_inference compile -o xgb_compiled.npz
+"""
+
+import argparse
+import json
+import sys
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+
+# Các objective có output = margin (không qua hàm link)
+IDENTITY_OBJECTIVES = {
+    'reg:squarederror', 'reg:absoluteerror', 'reg:pseudohubererror', 'reg:quantileerror'
+}
+
+# Số dòng mỗi lần duyệt cây, giữ ma trận (rows × trees) trong cache CPU
+TRAVERSAL_CHUNK_ROWS = 1024
+
+# Trên ngưỡng này predict native (C++, đa luồng) của XGBoost nhanh hơn
+COMPILED_MAX_BATCH_ROWS = 512
+
+
+class CompiledPredictor:
+    """
+    Predictor chỉ phụ thuộc NumPy, tương đương scaler.transform + model.predict.
+
+    Scaler được gộp vào bước chuẩn bị input: (x - mean) / scale tính bằng
+    float64 rồi ép về float32 giống hệt đường cũ (sklearn -> DMatrix), nên
+    mọi phép so sánh với threshold cho kết quả y hệt XGBoost. Gộp vào
+    threshold thì rẻ hơn một phép trừ/chia nhưng làm lệch làm tròn float32
+    ở sát biên split.
+
+    Tất cả cây được nối thành các mảng phẳng (feature, threshold, left,
+    right, default_left, value); node được đánh số lại sao cho
+    right = left + 1, nên mỗi tầng của việc duyệt chỉ là
+    `node = left[node] + (x >= threshold[node])` trên ma trận
+    (rows × trees). Leaf trỏ về chính nó với threshold = +inf.
+    """
+
+    def __init__(self, mean, scale, feature, threshold, left, right,
+                 default_left, value, roots, base_score: float, depth: int):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float32)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float32)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.base_score = float(base_score)
+        self.depth = int(depth)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @classmethod
+    def from_artifacts(cls, model, scaler) -> 'CompiledPredictor':
+        """
+        Compile từ XGBRegressor (hoặc Booster) và StandardScaler đã fit.
+
+        Raises:
+            ValueError: nếu model dùng tính năng chưa hỗ trợ
+                (objective có hàm link, split categorical, multi-output)
+        """
+        booster = model.get_booster() if hasattr(model, 'get_booster') else model
+        learner = json.loads(booster.save_raw('json'))['learner']
+
+        objective = learner['objective']['name']
+        if objective not in IDENTITY_OBJECTIVES:
+            raise ValueError(f"Unsupported objective: {objective}")
+        params = learner['learner_model_param']
+        if int(params.get('num_target', 1)) > 1 or int(params.get('num_class', 0)) > 0:
+            raise ValueError("Multi-output models are not supported")
+        if learner['gradient_booster']['name'] != 'gbtree':
+            raise ValueError(f"Unsupported booster: {learner['gradient_booster']['name']}")
+
+        trees = learner['gradient_booster']['model']['trees']
+        best_iteration = booster.attributes().get('best_iteration')
+        if best_iteration is not None:
+            per_round = int(learner['gradient_booster']['model']['gbtree_model_param']['num_parallel_tree'])
+            trees = trees[:(int(best_iteration) + 1) * per_round]
+
+        feature, threshold, left, right, default_left, value, roots = [], [], [], [], [], [], []
+        depth = 0
+        offset = 0
+        for tree in trees:
+            if any(tree['split_type']):
+                raise ValueError("Categorical splits are not supported")
+            order = _sibling_order(tree['left_children'], tree['right_children'])
+            # new_id[old] = vị trí mới của node old
+            new_id = np.empty(len(order), dtype=np.intp)
+            new_id[order] = np.arange(len(order))
+
+            lefts = np.asarray(tree['left_children'])[order]
+            rights = np.asarray(tree['right_children'])[order]
+            conditions = np.asarray(tree['split_conditions'], dtype=np.float64)[order]
+            is_leaf = lefts == -1
+            self_index = np.arange(len(order)) + offset
+
+            roots.append(offset)
+            feature.append(np.where(is_leaf, 0, np.asarray(tree['split_indices'])[order]))
+            # Leaf: threshold +inf và default_left để luôn đứng yên tại leaf
+            threshold.append(np.where(is_leaf, np.inf, conditions))
+            left.append(np.where(is_leaf, self_index, new_id[lefts] + offset))
+            right.append(np.where(is_leaf, self_index, new_id[rights] + offset))
+            default_left.append(is_leaf | np.asarray(tree['default_left'], dtype=bool)[order])
+            # Với leaf, split_conditions chứa giá trị leaf
+            value.append(np.where(is_leaf, conditions, 0.0))
+            depth = max(depth, _tree_depth(tree['left_children'], tree['right_children']))
+            offset += len(order)
+
+        mean = scaler.mean_ if getattr(scaler, 'with_mean', True) else np.zeros(scaler.n_features_in_)
+        scale = scaler.scale_ if getattr(scaler, 'with_std', True) else np.ones(scaler.n_features_in_)
+        base_score = float(params['base_score'].strip('[]'))
+
+        return cls(
+            mean, scale, np.concatenate(feature), np.concatenate(threshold),
+            np.concatenate(left), np.concatenate(right), np.concatenate(default_left),
+            np.concatenate(value), roots, base_score, depth
+        )
+
+    def predict(self, X) -> np.ndarray:
+        """Dự đoán cho ma trận feature chưa scale (n_rows × n_features)."""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        Z = ((X - self.mean) / self.scale).astype(np.float32)
+
+        output = np.empty(len(Z), dtype=np.float32)
+        for start in range(0, len(Z), TRAVERSAL_CHUNK_ROWS):
+            output[start:start + TRAVERSAL_CHUNK_ROWS] = self._predict_scaled(
+                Z[start:start + TRAVERSAL_CHUNK_ROWS]
+            )
+        return output
+
+    def _predict_scaled(self, Z: np.ndarray) -> np.ndarray:
+        n_features = Z.shape[1]
+        flat = Z.ravel()
+        row_offsets = (np.arange(len(Z), dtype=np.intp) * n_features)[:, None]
+        has_missing = bool(np.isnan(flat).any())
+
+        node = np.broadcast_to(self.roots, (len(Z), self.n_trees))
+        for _ in range(self.depth):
+            x = flat[row_offsets + self.feature[node]]
+            go_right = x >= self.threshold[node]
+            if has_missing:
+                go_right = np.where(np.isnan(x), ~self.default_left[node], go_right)
+            node = self.left[node] + go_right
+        margin = self.value[node].sum(axis=1, dtype=np.float64) + self.base_score
+        return margin.astype(np.float32)
+
+    def save(self, path: str) -> None:
+        """Lưu predictor ra file .npz (load lại không cần xgboost/sklearn)."""
+        np.savez(
+            path, mean=self.mean, scale=self.scale, feature=self.feature,
+            threshold=self.threshold, left=self.left, right=self.right,
+            default_left=self.default_left, value=self.value, roots=self.roots,
+            base_score=self.base_score, depth=self.depth
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'CompiledPredictor':
+        """Load predictor từ file .npz."""
+        with np.load(path) as data:
+            arrays = {key: data[key] for key in data.files}
+        arrays['base_score'] = float(arrays['base_score'])
+        arrays['depth'] = int(arrays['depth'])
+        return cls(**arrays)
+
+
+def _sibling_order(left_children, right_children) -> np.ndarray:
+    """
+    Thứ tự BFS của các node, trong đó hai con của mỗi node luôn đứng liền
+    nhau (trái trước, phải sau).
+    """
+    order = [0]
+    for node in order:
+        if left_children[node] != -1:
+            order.append(left_children[node])
+            order.append(right_children[node])
+    return np.asarray(order, dtype=np.intp)
+
+
+def _tree_depth(left_children, right_children) -> int:
+    """Độ sâu tối đa (số cạnh từ root tới leaf xa nhất)."""
+    depth = 0
+    frontier = [(0, 0)]
+    while frontier:
+        node, level = frontier.pop()
+        if left_children[node] == -1:
+            depth = max(depth, level)
+        else:
+            frontier.append((left_children[node], level + 1))
+            frontier.append((right_children[node], level + 1))
+    return depth
+
+
+@lru_cache(maxsize=4)
+def _compile_cached(model, scaler) -> Optional[CompiledPredictor]:
+    try:
+        return CompiledPredictor.from_artifacts(model, scaler)
+    except (ValueError, AttributeError, KeyError):
+        return None
+
+
+def get_compiled_predictor(model, scaler) -> Optional[CompiledPredictor]:
+    """
+    CompiledPredictor cho cặp model/scaler (compile một lần).
+
+    Returns:
+        Predictor hoặc None nếu model không compile được (khi đó dùng
+        đường sklearn + xgboost như cũ)
+    """
+    return _compile_cached(model, scaler)
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Entry point CLI: compile model + scaler ra file .npz."""
+    parser = argparse.ArgumentParser(description="Compile scaler + XGBoost model to NumPy arrays")
+    parser.add_argument('command', choices=['compile'])
+    parser.add_argument('--model', default='xgb.joblib')
+    parser.add_argument('--scaler', default='scaler.pkl')
+    parser.add_argument('-o', '--output', default='xgb_compiled.npz')
+    args = parser.parse_args(argv)
+
+    import joblib
+    predictor = CompiledPredictor.from_artifacts(joblib.load(args.model), joblib.load(args.scaler))
+    predictor.save(args.output)
+    print(f"Compiled {predictor.n_trees} trees (depth {predictor.depth}) -> {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+Filter engine: chỉ mục dựng sẵn một lần cho mỗi dataset để lọc nhanh.
+"""
+
+import hashlib
+from typing import Dict, Any, Optional, Tuple
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+from config.settings import FILTER_CACHE_MAX_MB, AMOUNT_SLIDER_STEP, RATE_SLIDER_STEP
+from utils.cache import BoundedLRUCache
+from utils.data_loader import dataset_fingerprint, parent_frame
+from utils.helpers import compute_kpis
+
+
+# filter key -> cột dữ liệu
+CATEGORY_FILTERS = {
+    'grades': 'grade',
+    'states': 'address_state',
+    'regions': 'region'
+}
+RANGE_FILTERS = {
+    'amount_range': 'loan_amount',
+    'rate_range': 'int_rate'
+}
+# Bước slider theo đơn vị của cột (lãi suất lưu dạng thập phân)
+RANGE_STEPS = {
+    'amount_range': AMOUNT_SLIDER_STEP,
+    'rate_range': RATE_SLIDER_STEP / 100
+}
+RANGE_DEFAULTS = {
+    'amount_range': (0, float('inf')),
+    'rate_range': (0, 1)
+}
+
+# Dùng danh sách row của khoảng hẹp nhất làm ứng viên khi nó nhỏ hơn
+# tỉ lệ này; nếu không thì tính mask trên toàn bộ dòng sẽ rẻ hơn
+CANDIDATE_RATIO = 0.25
+
+
+class FilterEngine:
+    """
+    Chỉ mục cho các filter của sidebar.
+
+    - Cột category (grade, address_state, region): mảng code số nguyên;
+      mỗi lần lọc dựng bitmap theo category rồi tra ngược `bitmap[codes]`.
+    - Cột khoảng (loan_amount, int_rate): mảng giá trị đã sort + thứ tự sort,
+      dùng `searchsorted` để lấy ngay các dòng thuộc khoảng.
+
+    `select` gộp tất cả điều kiện thành một mảng vị trí dòng duy nhất,
+    không tạo DataFrame trung gian.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.n_rows = len(df)
+        self._codes: Dict[str, Tuple[np.ndarray, pd.Index]] = {}
+        self._ranges: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+        for column in CATEGORY_FILTERS.values():
+            if column in df.columns:
+                codes, uniques = pd.factorize(df[column])
+                # Dịch code lên 1 để NaN (-1) rơi vào ô 0, luôn bị loại
+                self._codes[column] = ((codes + 1).astype(np.int32), pd.Index(uniques))
+
+        for column in RANGE_FILTERS.values():
+            if column in df.columns:
+                values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+                order = np.argsort(values, kind='stable')
+                self._ranges[column] = (values, order, values[order])
+
+    def extended(self, new_rows: pd.DataFrame) -> 'FilterEngine':
+        """
+        Engine mới cho dataset = các dòng hiện tại + `new_rows` (nối vào cuối).
+
+        Chỉ các dòng mới được encode; mảng sort của cột khoảng được trộn
+        (merge hai dãy đã sort) thay vì sort lại. Engine hiện tại không đổi.
+        """
+        engine = FilterEngine.__new__(FilterEngine)
+        engine.n_rows = self.n_rows + len(new_rows)
+        engine._codes = {}
+        engine._ranges = {}
+
+        for column, (codes, uniques) in self._codes.items():
+            values = pd.Index(new_rows[column])
+            unseen = values[(uniques.get_indexer(values) < 0) & values.notna()].unique()
+            if len(unseen):
+                uniques = uniques.append(unseen)
+            new_codes = (uniques.get_indexer(values) + 1).astype(np.int32)
+            engine._codes[column] = (np.concatenate([codes, new_codes]), uniques)
+
+        for column, (values, order, sorted_values) in self._ranges.items():
+            added = new_rows[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            added_order = np.argsort(added, kind='stable')
+            merged_values = np.concatenate([sorted_values, added[added_order]])
+            # Stable sort trên hai dãy đã sort = một lần merge tuyến tính
+            merge = np.argsort(merged_values, kind='stable')
+            merged_order = np.concatenate([order, added_order + self.n_rows])[merge]
+            engine._ranges[column] = (
+                np.concatenate([values, added]), merged_order, merged_values[merge]
+            )
+        return engine
+
+    @property
+    def nbytes(self) -> int:
+        """Bộ nhớ chiếm bởi các mảng chỉ mục."""
+        total = sum(codes.nbytes for codes, _ in self._codes.values())
+        total += sum(sum(a.nbytes for a in arrays) for arrays in self._ranges.values())
+        return total
+
+    def category_mask(self, column: str, selected, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Mask các dòng (hoặc chỉ `rows`) có giá trị `column` nằm trong `selected`."""
+        codes, uniques = self._codes[column]
+        bitmap = np.zeros(len(uniques) + 1, dtype=bool)
+        positions = uniques.get_indexer(pd.Index(list(selected)))
+        bitmap[positions[positions >= 0] + 1] = True
+        return bitmap[codes if rows is None else codes[rows]]
+
+    def range_bounds(self, column: str, low: float, high: float) -> Tuple[int, int]:
+        """Vị trí [start, stop) trong mảng đã sort ứng với low <= x <= high."""
+        sorted_values = self._ranges[column][2]
+        start = int(np.searchsorted(sorted_values, low, side='left'))
+        stop = int(np.searchsorted(sorted_values, high, side='right'))
+        return start, max(start, stop)
+
+    def select(self, filters: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        Tính vị trí các dòng thoả mãn filters.
+
+        Returns:
+            Mảng vị trí dòng tăng dần, hoặc None nếu mọi dòng đều thoả
+        """
+        category_preds = [
+            (column, filters[key]) for key, column in CATEGORY_FILTERS.items()
+            if filters.get(key) and column in self._codes
+        ]
+
+        range_preds = []
+        for key, column in RANGE_FILTERS.items():
+            if column not in self._ranges:
+                continue
+            low, high = filters.get(key, RANGE_DEFAULTS[key])
+            start, stop = self.range_bounds(column, low, high)
+            if stop - start < self.n_rows:
+                range_preds.append((stop - start, column, low, high, start, stop))
+
+        if not category_preds and not range_preds:
+            return None
+
+        range_preds.sort(key=lambda pred: pred[0])
+        if range_preds and range_preds[0][0] <= CANDIDATE_RATIO * self.n_rows:
+            # Khoảng hẹp: lấy thẳng các dòng ứng viên từ mảng sort rồi kiểm
+            # tra các điều kiện còn lại chỉ trên những dòng đó
+            _, column, _, _, start, stop = range_preds[0]
+            rows = np.sort(self._ranges[column][1][start:stop])
+            keep = np.ones(len(rows), dtype=bool)
+            for _, other, low, high, _, _ in range_preds[1:]:
+                values = self._ranges[other][0][rows]
+                keep &= (values >= low) & (values <= high)
+            for column, selected in category_preds:
+                keep &= self.category_mask(column, selected, rows)
+            return rows[keep]
+
+        mask = np.ones(self.n_rows, dtype=bool)
+        for column, selected in category_preds:
+            mask &= self.category_mask(column, selected)
+        for _, column, low, high, _, _ in range_preds:
+            values = self._ranges[column][0]
+            mask &= (values >= low) & (values <= high)
+        return np.flatnonzero(mask)
+
+
+@st.cache_resource(max_entries=4)
+def _build_filter_engine(fingerprint: str, _df: pd.DataFrame) -> FilterEngine:
+    """
+    Dựng và cache FilterEngine theo fingerprint dataset.
+
+    Nếu dataset được tạo bằng cách append vào dataset trước, engine của
+    dataset trước được mở rộng với các dòng mới.
+    """
+    parent = parent_frame(_df)
+    if parent is not None:
+        base = _build_filter_engine(dataset_fingerprint(parent), parent)
+        return base.extended(_df.iloc[len(parent):])
+    return FilterEngine(_df)
+
+
+def get_filter_engine(df: pd.DataFrame) -> FilterEngine:
+    """Lấy FilterEngine dùng chung cho dataset (dựng một lần)."""
+    return _build_filter_engine(dataset_fingerprint(df), df)
+
+
+def filter_options(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Các lựa chọn cho filter của sidebar lấy từ dữ liệu.
+
+    Returns:
+        Dict gồm 'grades', 'states', 'regions' (danh sách đã sort hoặc None
+        nếu thiếu cột), 'amount_range', 'rate_range' ((min, max) hoặc None),
+        'rows' và 'memory'
+    """
+    options: Dict[str, Any] = {'rows': len(df), 'memory': df.attrs.get('memory')}
+    for key, column in CATEGORY_FILTERS.items():
+        options[key] = sorted(df[column].dropna().unique().tolist()) if column in df.columns else None
+    for key, column in RANGE_FILTERS.items():
+        options[key] = (float(df[column].min()), float(df[column].max())) if column in df.columns else None
+    return options
+
+
+def range_grid(options: Dict[str, Any]) -> Dict[str, Tuple[float, float]]:
+    """
+    Lưới giá trị của các slider khoảng: cột -> (gốc, bước).
+
+    Slider nhận giá trị gốc + k * bước, với gốc là min của dữ liệu (số tiền
+    vay làm tròn xuống số nguyên như sidebar).
+    """
+    grid = {}
+    for key, column in RANGE_FILTERS.items():
+        if options.get(key) is not None:
+            low = options[key][0]
+            grid[column] = (float(int(low)) if key == 'amount_range' else float(low), float(RANGE_STEPS[key]))
+    return grid
+
+
+def normalize_filters(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Chuẩn hoá filters thành dạng ổn định để làm khoá cache.
+
+    Danh sách được sort (rỗng -> None), khoảng được làm tròn; kết quả lọc
+    luôn được tính từ dạng chuẩn hoá nên khoá và kết quả luôn khớp nhau.
+    """
+    normalized = {}
+    for key in CATEGORY_FILTERS:
+        values = filters.get(key)
+        normalized[key] = tuple(sorted(map(str, values))) if values else None
+    for key, digits in (('amount_range', 2), ('rate_range', 6)):
+        low, high = filters.get(key, RANGE_DEFAULTS[key])
+        normalized[key] = (round(float(low), digits), round(float(high), digits))
+    return normalized
+
+
+def view_fingerprint(fingerprint: str, normalized: Dict[str, Any]) -> str:
+    """Fingerprint của tập con = dataset fingerprint + filters chuẩn hoá."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(fingerprint.encode())
+    digest.update(repr(sorted(normalized.items())).encode())
+    return digest.hexdigest()
+
+
+@st.cache_resource
+def get_filter_cache() -> BoundedLRUCache:
+    """LRU cache kết quả lọc dùng chung cho mọi session."""
+    return BoundedLRUCache(max_bytes=FILTER_CACHE_MAX_MB * 1024 * 1024)
+
+
+def select_view(df: pd.DataFrame, filters: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Lấy (có memo) kết quả lọc của `df` theo `filters`.
+
+    Returns:
+        Tuple (view fingerprint, entry) với entry gồm 'positions' (None nếu
+        lấy mọi dòng), 'filters' đã chuẩn hoá và 'kpis' của tập con
+    """
+    normalized = normalize_filters(filters)
+    key = view_fingerprint(dataset_fingerprint(df), normalized)
+
+    def compute() -> Dict[str, Any]:
+        positions = get_filter_engine(df).select(normalized)
+        subset = df if positions is None else df.iloc[positions]
+        return {'positions': positions, 'filters': normalized, 'kpis': compute_kpis(subset)}
+
+    return key, get_filter_cache().get_or_compute(key, compute)
+
+
+def get_filter_options(df: pd.DataFrame) -> Dict[str, Any]:
+    """filter_options của dataset, memo theo fingerprint."""
+    key = f"{dataset_fingerprint(df)}:options"
+    return get_filter_cache().get_or_compute(key, lambda: filter_options(df))
+
+
+def get_view_kpis(df: pd.DataFrame) -> Dict[str, Any]:
+    """KPI của một tập con đã lọc, lấy từ cache nếu có."""
+    key = df.attrs.get('fingerprint')
+    entry = get_filter_cache().peek(key) if key is not None else None
+    return entry['kpis'] if entry is not None else compute_kpis(df)
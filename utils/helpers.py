@@ -4,7 +4,11 @@ Helper functions cho ứng dụng.
 
 import pandas as pd
 import numpy as np
-from typing import Tuple
+from typing import Tuple, List, Optional, Dict, Any
+
+from config.settings import LOAN_STATUS_ORDER, MODEL_FEATURES
+from utils.amortization import installments
+from utils.profiling import profiled
 
 
 def get_loan_status_from_columns(row: pd.Series) -> str:
@@ -20,34 +24,97 @@ def get_loan_status_from_columns(row: pd.Series) -> str:
     return 'Unknown'
 
 
+def decode_one_hot(
+    df: pd.DataFrame,
+    prefix: str,
+    categories: Optional[List[str]] = None,
+    default: str = 'Unknown'
+) -> pd.Categorical:
+    """
+    Gộp nhóm cột one-hot `prefix_*` thành một cột categorical (vectorized).
+
+    Khi một dòng có nhiều cột bằng 1, giá trị đứng trước trong `categories`
+    được ưu tiên; dòng không có cột nào bằng 1 nhận giá trị `default`.
+
+    Args:
+        df: DataFrame chứa các cột one-hot
+        prefix: Tiền tố của nhóm cột, ví dụ 'loan_status_'
+        categories: Thứ tự ưu tiên các giá trị; mặc định theo thứ tự cột
+        default: Giá trị khi không có cột nào bằng 1
+
+    Returns:
+        pd.Categorical với categories = các giá trị + default
+    """
+    if categories is None:
+        categories = [col[len(prefix):] for col in df.columns if col.startswith(prefix)]
+    categories = [c for c in categories if c != default]
+    all_categories = categories + [default]
+
+    present = [(code, prefix + value) for code, value in enumerate(categories)
+               if prefix + value in df.columns]
+    if present:
+        # np.select lấy điều kiện đúng đầu tiên -> giữ đúng thứ tự ưu tiên
+        codes = np.select(
+            [df[col].to_numpy() == 1 for _, col in present],
+            [code for code, _ in present],
+            default=len(categories)
+        )
+    else:
+        codes = np.full(len(df), len(categories))
+
+    return pd.Categorical.from_codes(codes.astype(np.int32), categories=all_categories)
+
+
+@profiled()
 def create_loan_status_column(df: pd.DataFrame) -> pd.DataFrame:
     """
     Tạo cột loan_status từ các cột one-hot encoding.
+
+    Trả về shallow copy có thêm cột; các cột sẵn có không bị copy và
+    DataFrame đầu vào không bị sửa.
     """
-    df = df.copy()
+    df = df.copy(deep=False)
     
-    status_cols = ['loan_status_Charged Off', 'loan_status_Current', 'loan_status_Fully Paid']
+    status_cols = ['loan_status_' + status for status in LOAN_STATUS_ORDER]
     existing_cols = [col for col in status_cols if col in df.columns]
     
     if existing_cols:
-        df['loan_status'] = df.apply(get_loan_status_from_columns, axis=1)
+        df['loan_status'] = decode_one_hot(df, 'loan_status_', categories=LOAN_STATUS_ORDER)
     elif 'loan_status' not in df.columns:
         df['loan_status'] = 'Unknown'
     
     return df
 
 
+def compute_kpis(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Tính các chỉ số KPI cho một tập khoản vay.
+
+    Giá trị là None khi thiếu cột tương ứng.
+    """
+    count = len(df)
+    has_amount = 'loan_amount' in df.columns
+    has_status = 'loan_status' in df.columns
+    risk_count = int((df['loan_status'] == 'Charged Off').sum()) if has_status else None
+
+    return {
+        'count': count,
+        'total_volume': float(df['loan_amount'].sum()) if has_amount else None,
+        'avg_loan': float(df['loan_amount'].mean()) if has_amount else None,
+        'max_loan': float(df['loan_amount'].max()) if has_amount else None,
+        'avg_int_rate': float(df['int_rate'].mean()) if 'int_rate' in df.columns else None,
+        'avg_dti': float(df['dti'].mean()) if 'dti' in df.columns else None,
+        'risk_count': risk_count,
+        'risk_rate': (risk_count / count) * 100 if has_status and count > 0 else None
+    }
+
+
 def calculate_installment(loan_amount: float, int_rate: float, term_months: int) -> float:
     """
     Tính installment (khoản trả hàng tháng) dựa trên công thức PMT.
+    Lãi suất 0 thì trả đều gốc; bản vector hoá: utils.amortization.installments.
     """
-    monthly_rate = int_rate / 12
-    if monthly_rate > 0:
-        installment = loan_amount * (monthly_rate * (1 + monthly_rate) ** term_months) / \
-                     ((1 + monthly_rate) ** term_months - 1)
-    else:
-        installment = loan_amount / term_months
-    return installment
+    return float(installments(loan_amount, int_rate, term_months))
 
 
 def calculate_grade_encoded(grade: str, sub_grade: str) -> int:
@@ -100,12 +167,6 @@ def process_prediction_input(
     Returns:
         DataFrame with features for prediction
     """
-    # Feature names in exact order model expects
-    feature_names = [
-        'dti', 'loan_amount', 'term_months', 'grade_encoded',
-        'verification_status_Verified', 'verification_status_Not Verified', 'purpose_debt'
-    ]
-    
     # Calculate grade_encoded
     grade_encoded = calculate_grade_encoded(grade, sub_grade)
     
@@ -132,7 +193,7 @@ def process_prediction_input(
         data['purpose_debt'] = [1]
     
     df = pd.DataFrame(data)
-    return df[feature_names]
+    return df[MODEL_FEATURES]
 
 
 def get_rate_category(rate: float) -> Tuple[str, str, str]:
@@ -2,53 +2,117 @@
 Model loading functions.
 """
 
+import threading
+from typing import Any, Dict, Optional, Tuple
+
 import streamlit as st
 
 
+def _load_artifact(path: str, kind: str) -> Tuple[Any, Optional[str]]:
+    """
+    Load một artifact joblib mà không gọi Streamlit (an toàn trên thread nền).
+
+    Returns:
+        Tuple (artifact hoặc None, thông báo lỗi hoặc None)
+    """
+    try:
+        import joblib
+        return joblib.load(path), None
+    except FileNotFoundError:
+        return None, f"⚠️ Không tìm thấy file {kind}: {path}"
+    except ImportError:
+        return None, "⚠️ Cần cài đặt thư viện: pip install joblib xgboost"
+    except Exception as e:
+        return None, f"⚠️ Lỗi khi load {kind}: {str(e)}"
+
+
 @st.cache_resource
 def load_model(model_path: str = "xgb.joblib"):
     """
     Load và cache model từ file joblib.
-    
+
     Args:
         model_path: Đường dẫn đến file model
-        
+
     Returns:
         Model đã được train hoặc None nếu lỗi
     """
-    try:
-        import joblib
-        model = joblib.load(model_path)
-        return model
-    except FileNotFoundError:
-        st.warning(f"⚠️ Không tìm thấy file model: {model_path}")
-        return None
-    except ImportError:
-        st.warning("⚠️ Cần cài đặt thư viện: pip install joblib xgboost")
-        return None
-    except Exception as e:
-        st.warning(f"⚠️ Lỗi khi load model: {str(e)}")
-        return None
+    model, error = _load_artifact(model_path, "model")
+    if error:
+        st.warning(error)
+    return model
 
 
 @st.cache_resource
 def load_scaler(scaler_path: str = "scaler.pkl"):
     """
     Load và cache scaler từ file pickle.
-    
+
     Args:
         scaler_path: Đường dẫn đến file scaler
-        
+
     Returns:
         Scaler đã được fit hoặc None nếu lỗi
     """
-    try:
-        import joblib
-        scaler = joblib.load(scaler_path)
-        return scaler
-    except FileNotFoundError:
-        st.warning(f"⚠️ Không tìm thấy file scaler: {scaler_path}")
-        return None
-    except Exception as e:
-        st.warning(f"⚠️ Lỗi khi load scaler: {str(e)}")
-        return None
\ No newline at end of file
+    scaler, error = _load_artifact(scaler_path, "scaler")
+    if error:
+        st.warning(error)
+    return scaler
+
+
+class ModelResources:
+    """
+    Model + scaler được load trên background thread ngay khi app khởi động.
+
+    Thread import joblib/xgboost/sklearn, deserialize hai artifact và compile
+    predictor, nên không lần render nào bị chặn bởi việc import thư viện ML.
+    `status` là 'pending' cho tới khi xong, sau đó là 'ready'.
+    """
+
+    def __init__(self, model_path: str, scaler_path: str):
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.model = None
+        self.scaler = None
+        self.errors: Dict[str, str] = {}
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._load, name="model-warmup", daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        try:
+            self.model, model_error = _load_artifact(self.model_path, "model")
+            self.scaler, scaler_error = _load_artifact(self.scaler_path, "scaler")
+            if model_error:
+                self.errors['model'] = model_error
+            if scaler_error:
+                self.errors['scaler'] = scaler_error
+
+            if self.model is not None and self.scaler is not None:
+                from utils.fast_inference import get_compiled_predictor
+                get_compiled_predictor(self.model, self.scaler)
+        finally:
+            self._done.set()
+
+    @property
+    def status(self) -> str:
+        return 'ready' if self._done.is_set() else 'pending'
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Chờ load xong; trả False nếu hết timeout mà vẫn đang load."""
+        return self._done.wait(timeout)
+
+
+@st.cache_resource
+def start_model_warmup(model_path: str = "xgb.joblib", scaler_path: str = "scaler.pkl") -> ModelResources:
+    """
+    Bắt đầu load model + scaler trên background thread (một lần mỗi process).
+
+    Returns:
+        ModelResources dùng chung cho mọi session
+    """
+    return ModelResources(model_path, scaler_path)
@@ -0,0 +1,113 @@
+"""
+Phân trang phía server cho bảng dữ liệu: sort, tìm kiếm và cắt trang.
+"""
+
+from typing import List, Optional, Tuple
+
+import pandas as pd
+import numpy as np
+
+from utils.data_loader import dataset_fingerprint
+from utils.filter_engine import get_filter_cache
+from utils.profiling import profiled
+
+
+def _sort_order(series: pd.Series) -> Tuple[np.ndarray, int, np.ndarray]:
+    """
+    Thứ tự sort tăng dần (stable, NaN cuối) của một cột.
+
+    Returns:
+        Tuple (vị trí dòng theo thứ tự, số giá trị không-null, vị trí bắt đầu
+        của từng nhóm giá trị bằng nhau trong phần không-null)
+    """
+    values = series.reset_index(drop=True)
+    ordered = values.sort_values(kind='stable', na_position='last')
+    n_valid = int(values.notna().sum())
+    valid = ordered.iloc[:n_valid]
+    starts = np.flatnonzero(valid.ne(valid.shift()).to_numpy(dtype=bool))
+    return ordered.index.to_numpy(dtype=np.intp), n_valid, starts
+
+
+def _descending(order: np.ndarray, n_valid: int, starts: np.ndarray) -> np.ndarray:
+    """
+    Thứ tự giảm dần stable từ thứ tự tăng dần: đảo thứ tự các nhóm giá trị
+    bằng nhau nhưng giữ thứ tự gốc trong từng nhóm; NaN vẫn ở cuối.
+    """
+    ends = np.append(starts[1:], n_valid)
+    group = np.repeat(np.arange(len(starts)), ends - starts)
+    position = np.arange(n_valid)
+    result = order.copy()
+    result[n_valid - ends[group] + position - starts[group]] = order[:n_valid]
+    return result
+
+
+def sort_permutation(df: pd.DataFrame, column: str, ascending: bool = True) -> np.ndarray:
+    """
+    Hoán vị dòng của df khi sort theo `column` (stable, NaN luôn ở cuối).
+
+    Chỉ thứ tự tăng dần được tính và cache (theo fingerprint của df + cột);
+    thứ tự giảm dần suy ra từ nó trong O(n).
+    """
+    key = f"{dataset_fingerprint(df)}:sort:{column}"
+    order, n_valid, starts = get_filter_cache().get_or_compute(key, lambda: _sort_order(df[column]))
+    if ascending:
+        return order
+    return _descending(order, n_valid, starts)
+
+
+def _contains(series: pd.Series, query: str) -> np.ndarray:
+    """Mask các dòng mà giá trị (dạng chuỗi) chứa query, không phân biệt hoa thường."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # So khớp trên categories rồi tra ngược theo code
+        categories = series.cat.categories.astype(str)
+        hits = np.append(categories.str.contains(query, case=False, regex=False), False)
+        return hits[series.cat.codes.to_numpy()]
+    return series.astype(str).str.contains(query, case=False, regex=False).to_numpy(dtype=bool)
+
+
+def search_mask(df: pd.DataFrame, columns: List[str], query: str) -> np.ndarray:
+    """
+    Mask các dòng có ít nhất một cột trong `columns` chứa `query`.
+
+    Kết quả được cache theo fingerprint của df, cột và query.
+    """
+    query = query.strip()
+    key = f"{dataset_fingerprint(df)}:search:{query.lower()}:{','.join(sorted(columns))}"
+
+    def compute() -> np.ndarray:
+        mask = np.zeros(len(df), dtype=bool)
+        for column in columns:
+            mask |= _contains(df[column], query)
+        return mask
+
+    return get_filter_cache().get_or_compute(key, compute)
+
+
+@profiled()
+def select_rows(df: pd.DataFrame, columns: List[str], sort_by: Optional[str] = None,
+                ascending: bool = True, query: str = '') -> Optional[np.ndarray]:
+    """
+    Vị trí các dòng khớp `query` trên `columns`, theo thứ tự sort.
+
+    Returns:
+        Mảng vị trí dòng, hoặc None nếu giữ nguyên mọi dòng theo thứ tự gốc
+    """
+    rows: Optional[np.ndarray] = None
+    if sort_by is not None:
+        rows = sort_permutation(df, sort_by, ascending)
+
+    if query.strip():
+        mask = search_mask(df, columns, query)
+        rows = np.flatnonzero(mask) if rows is None else rows[mask[rows]]
+    return rows
+
+
+@profiled()
+def slice_page(df: pd.DataFrame, rows: Optional[np.ndarray], columns: List[str],
+               page: int, page_size: int) -> pd.DataFrame:
+    """Cắt trang `page` (bắt đầu từ 1) của các dòng `rows`, chỉ lấy `columns`."""
+    start = max(page - 1, 0) * page_size
+    if rows is None:
+        return df.iloc[start:start + page_size][columns]
+    return df.take(rows[start:start + page_size])[columns]
+
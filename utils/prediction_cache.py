@@ -0,0 +1,139 @@
+"""
+Cache kết quả dự đoán lãi suất, dùng chung giữa các session.
+"""
+
+import hashlib
+import pickle
+from typing import Optional, Tuple
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+from config.settings import MODEL_FEATURES, PREDICTION_INPUT_GRID, PREWARM_PREDICTION_GRID
+from utils.cache import BoundedLRUCache
+from utils.batch_scoring import score_features, to_rate_percent
+from utils.fast_inference import get_compiled_predictor
+
+
+PREDICTION_MEMO_MAX_BYTES = 16 * 1024 * 1024
+
+# Các giá trị rời rạc của những feature còn lại trên form dự đoán
+_GRID_TERMS = (36, 60)
+_GRID_GRADE_ENCODED = tuple(range(1, 36))
+_GRID_VERIFICATION = ((0, 0), (1, 0), (0, 1))  # (Verified, Not Verified)
+_GRID_PURPOSE_DEBT = (0, 1)
+
+
+def artifact_fingerprint(model, scaler) -> str:
+    """Fingerprint nội dung của model + scaler."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pickle.dumps(model))
+    digest.update(pickle.dumps(scaler))
+    return digest.hexdigest()
+
+
+def _axis(start: float, stop: float, step: float) -> np.ndarray:
+    return np.round(np.arange(start, stop + step / 2, step), 6)
+
+
+def _axis_position(axis: np.ndarray, value: float) -> int:
+    """Vị trí của value trên trục; ValueError nếu không nằm đúng điểm lưới."""
+    position = int(np.searchsorted(axis, value))
+    if position >= len(axis) or not np.isclose(axis[position], value, rtol=0, atol=1e-9):
+        raise ValueError(value)
+    return position
+
+
+class PredictionCache:
+    """
+    Memo dự đoán theo vector feature đã encode.
+
+    Tuỳ chọn dựng sẵn bảng tra trên toàn bộ lưới input rời rạc của form
+    (DTI bước 0.5, loan amount bước 1000, term, grade_encoded,
+    verification, purpose_debt); khi đó đa số dự đoán chỉ là tra mảng.
+    """
+
+    def __init__(self, model, scaler):
+        self.model = model
+        self.scaler = scaler
+        self.fingerprint = artifact_fingerprint(model, scaler)
+        self.predictor = get_compiled_predictor(model, scaler)
+        self.memo = BoundedLRUCache(max_bytes=PREDICTION_MEMO_MAX_BYTES)
+        self.grid: Optional[np.ndarray] = None
+        self._dti_axis = _axis(*PREDICTION_INPUT_GRID['dti'])
+        self._amount_axis = _axis(*PREDICTION_INPUT_GRID['loan_amount'])
+
+    def _grid_index(self, x: np.ndarray) -> Optional[Tuple[int, ...]]:
+        """Vị trí của vector feature trong bảng tra, None nếu nằm ngoài lưới."""
+        dti, amount, term, grade_encoded, verified, not_verified, purpose_debt = x
+        try:
+            return (
+                _axis_position(self._dti_axis, dti),
+                _axis_position(self._amount_axis, amount),
+                _GRID_TERMS.index(term),
+                _GRID_GRADE_ENCODED.index(grade_encoded),
+                _GRID_VERIFICATION.index((verified, not_verified)),
+                _GRID_PURPOSE_DEBT.index(purpose_debt),
+            )
+        except ValueError:
+            return None
+
+    def warm_grid(self) -> int:
+        """
+        Dựng bảng tra cho toàn bộ lưới input.
+
+        Returns:
+            Số điểm trên lưới
+        """
+        axes = [
+            self._dti_axis, self._amount_axis, np.array(_GRID_TERMS),
+            np.array(_GRID_GRADE_ENCODED), np.arange(len(_GRID_VERIFICATION)),
+            np.array(_GRID_PURPOSE_DEBT)
+        ]
+        mesh = np.meshgrid(*axes, indexing='ij')
+        verification = np.array(_GRID_VERIFICATION)[mesh[4].ravel()]
+        X = np.column_stack([
+            mesh[0].ravel(), mesh[1].ravel(), mesh[2].ravel(), mesh[3].ravel(),
+            verification[:, 0], verification[:, 1], mesh[5].ravel()
+        ]).astype(np.float64)
+
+        rates = score_features(X, self.model, self.scaler)
+        self.grid = rates.astype(np.float32).reshape(mesh[0].shape)
+        return self.grid.size
+
+    def predict(self, features: pd.DataFrame) -> float:
+        """
+        Lãi suất dự đoán (%) cho một hồ sơ (DataFrame 1 dòng theo MODEL_FEATURES).
+        """
+        x = features[MODEL_FEATURES].to_numpy(dtype=np.float64)[0]
+
+        if self.grid is not None:
+            index = self._grid_index(x)
+            if index is not None:
+                return float(self.grid[index])
+
+        key = (self.fingerprint, tuple(np.round(x, 6).tolist()))
+
+        def compute() -> float:
+            if self.predictor is not None:
+                prediction = self.predictor.predict(x[np.newaxis, :])
+            else:
+                prediction = self.model.predict(self.scaler.transform(features))
+            return float(to_rate_percent(prediction)[0])
+
+        return self.memo.get_or_compute(key, compute)
+
+
+@st.cache_resource(max_entries=2)
+def _build_prediction_cache(model_id: int, scaler_id: int, _model, _scaler) -> PredictionCache:
+    """Dựng (và tuỳ chọn pre-warm) PredictionCache cho cặp model/scaler."""
+    cache = PredictionCache(_model, _scaler)
+    if PREWARM_PREDICTION_GRID:
+        cache.warm_grid()
+    return cache
+
+
+def get_prediction_cache(model, scaler) -> PredictionCache:
+    """PredictionCache dùng chung cho cặp model/scaler đang được cache."""
+    return _build_prediction_cache(id(model), id(scaler), model, scaler)
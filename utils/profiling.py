@@ -0,0 +1,183 @@
+"""
+Profiling theo từng lần rerun: thời gian, số dòng vào/ra và bộ nhớ cấp phát
+của các stage trên đường nóng (load, filter, chart, export...).
+
+Bật bằng biến môi trường LOAN_PROFILE=1 (xem config.settings). Khi tắt,
+decorator chỉ gọi thẳng hàm gốc.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+import streamlit as st
+import pandas as pd
+
+from config.settings import PROFILE_ENABLED, PROFILE_LOG_PATH, PROFILE_TRACK_MEMORY
+
+
+class Stage:
+    """Một stage đang/đã chạy trong lần rerun."""
+
+    __slots__ = ('name', 'depth', 'ms', 'rows_in', 'rows_out', 'alloc_bytes')
+
+    def __init__(self, name: str, depth: int, rows_in: Optional[int] = None):
+        self.name = name
+        self.depth = depth
+        self.ms: Optional[float] = None
+        self.rows_in = rows_in
+        self.rows_out: Optional[int] = None
+        self.alloc_bytes: Optional[int] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class RunProfile:
+    """Các stage của một lần rerun, theo thứ tự bắt đầu."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stages: List[Stage] = []
+        self.depth = 0
+        self.started = time.time()
+        self.total_ms: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'run': self.name, 'started': self.started, 'total_ms': self.total_ms,
+            'stages': [stage.as_dict() for stage in self.stages]
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        """Bảng stage (tên thụt lề theo độ sâu lồng nhau)."""
+        rows = [stage.as_dict() for stage in self.stages]
+        frame = pd.DataFrame(rows, columns=list(Stage.__slots__))
+        frame['stage'] = ['  ' * stage.depth + stage.name for stage in self.stages]
+        return frame.drop(columns=['name', 'depth']).set_index('stage')
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar('profile_run', default=None)
+_log_lock = threading.Lock()
+
+
+def _rows(value: Any) -> Optional[int]:
+    return len(value) if isinstance(value, (pd.DataFrame, pd.Series)) else None
+
+
+def _write_log(profile: RunProfile, path: str) -> None:
+    line = json.dumps(profile.as_dict(), default=str)
+    with _log_lock:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+@contextmanager
+def profile_run(name: str = 'rerun', enabled: bool = PROFILE_ENABLED,
+                log_path: Optional[str] = PROFILE_LOG_PATH):
+    """
+    Gom các stage chạy bên trong thành một RunProfile.
+
+    Yields:
+        RunProfile, hoặc None khi profiling tắt
+    """
+    if not enabled:
+        yield None
+        return
+    if PROFILE_TRACK_MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    profile = RunProfile(name)
+    token = _current.set(profile)
+    started = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.total_ms = (time.perf_counter() - started) * 1000
+        _current.reset(token)
+        if log_path:
+            try:
+                _write_log(profile, log_path)
+            except OSError:
+                pass
+
+
+def current_profile() -> Optional[RunProfile]:
+    """RunProfile của lần rerun đang chạy trên thread hiện tại (nếu có)."""
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str, rows_in: Optional[int] = None):
+    """
+    Đo một stage; gán `rows_out` cho đối tượng yield ra nếu biết.
+
+    Ngoài một profile_run đang chạy thì không làm gì (yield None).
+    """
+    profile = _current.get()
+    if profile is None:
+        yield None
+        return
+
+    record = Stage(name, profile.depth, rows_in)
+    profile.stages.append(record)
+    profile.depth += 1
+    tracing = tracemalloc.is_tracing()
+    memory_before = tracemalloc.get_traced_memory()[0] if tracing else 0
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.ms = (time.perf_counter() - started) * 1000
+        if tracing:
+            record.alloc_bytes = tracemalloc.get_traced_memory()[0] - memory_before
+        profile.depth -= 1
+
+
+def profiled(name: Optional[str] = None) -> Callable:
+    """
+    Decorator đo hàm như một stage.
+
+    rows_in là số dòng của DataFrame đầu tiên trong tham số, rows_out là
+    số dòng của kết quả nếu kết quả là DataFrame/Series.
+    """
+    def decorator(func: Callable) -> Callable:
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            rows_in = next((n for n in map(_rows, list(args) + list(kwargs.values())) if n is not None), None)
+            with stage(stage_name, rows_in) as record:
+                result = func(*args, **kwargs)
+                record.rows_out = _rows(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def _elapsed(profile: RunProfile) -> float:
+    return (time.time() - profile.started) * 1000
+
+
+def render_profile_overlay(profile: Optional[RunProfile]) -> None:
+    """Bảng thời gian theo stage của lần rerun hiện tại, ở cuối sidebar."""
+    if profile is None:
+        return
+
+    with st.sidebar.expander(f"⏱ Rerun profile ({_elapsed(profile):.0f} ms so far)"):
+        frame = profile.to_frame()
+        if PROFILE_TRACK_MEMORY:
+            frame['alloc_mb'] = frame.pop('alloc_bytes') / 1024 / 1024
+        else:
+            frame = frame.drop(columns='alloc_bytes')
+        st.dataframe(frame.round(2), use_container_width=True)
+        if PROFILE_LOG_PATH:
+            st.caption(f"Logging to {os.path.abspath(PROFILE_LOG_PATH)}")
@@ -0,0 +1,219 @@
+"""
+Dự phóng dòng tiền và tổn thất kỳ vọng của các khoản vay còn dư nợ trong
+danh mục đã lọc, dựa trên lịch trả nợ (utils.amortization) và tỉ lệ
+charge-off theo grade; khoản vay đã kết thúc chỉ được tổng hợp số liệu thực tế.
+"""
+
+from typing import Dict, Any, Optional, Tuple
+
+import pandas as pd
+import numpy as np
+
+from config.settings import AMORTIZATION_CHUNK_ROWS
+from utils.amortization import balances, expected_cash_flows
+from utils.cube import AggregationCube
+from utils.data_loader import dataset_fingerprint
+from utils.filter_engine import get_filter_cache
+from utils.profiling import profiled
+
+
+OUTSTANDING_STATUS = 'Current'
+RESOLVED_STATUSES = ['Fully Paid', 'Charged Off']
+
+
+def grade_charge_off_rates(cube: AggregationCube) -> pd.DataFrame:
+    """
+    Tỉ lệ charge-off theo grade trên các khoản vay đã kết thúc.
+
+    Khoản 'Current' chưa biết kết cục nên không tính vào mẫu số:
+    rate = Charged Off / (Charged Off + Fully Paid).
+
+    Returns:
+        DataFrame index grade, cột 'charged_off', 'resolved', 'charge_off_rate';
+        attrs['overall'] là tỉ lệ chung (dùng cho grade không có mẫu)
+    """
+    columns = ['charged_off', 'resolved', 'charge_off_rate']
+    if 'loan_status' not in cube.dimensions:
+        rates = pd.DataFrame(columns=columns, dtype=np.float64)
+        rates.attrs['overall'] = 0.0
+        return rates
+
+    cells = cube.cells
+    resolved = cells[cells['loan_status'].isin(['Charged Off', 'Fully Paid'])]
+    charged = resolved['count'].where(resolved['loan_status'] == 'Charged Off', 0)
+    by = resolved['grade'] if 'grade' in cube.dimensions else pd.Series('All', index=resolved.index)
+    rates = pd.DataFrame({
+        'charged_off': charged.groupby(by, observed=True).sum(),
+        'resolved': resolved['count'].groupby(by, observed=True).sum(),
+    }).astype(np.float64)
+
+    total = rates['resolved'].sum()
+    overall = float(rates['charged_off'].sum() / total) if total > 0 else 0.0
+    rates['charge_off_rate'] = (rates['charged_off'] / rates['resolved']).fillna(overall)
+    rates.attrs['overall'] = overall
+    return rates[columns]
+
+
+def projection_as_of(df: pd.DataFrame) -> Optional[pd.Timestamp]:
+    """Ngày chốt số liệu của dataset: issue_date mới nhất (None nếu không có)."""
+    if 'issue_date' not in df.columns:
+        return None
+    as_of = pd.to_datetime(df['issue_date'], errors='coerce').max()
+    return None if pd.isna(as_of) else as_of
+
+
+def months_on_book(df: pd.DataFrame, as_of: Optional[pd.Timestamp]) -> np.ndarray:
+    """Số tháng lịch từ issue_date tới as_of của từng khoản vay (0 nếu thiếu ngày)."""
+    if as_of is None or 'issue_date' not in df.columns:
+        return np.zeros(len(df))
+    issued = pd.to_datetime(df['issue_date'], errors='coerce')
+    months = (as_of.year - issued.dt.year) * 12 + (as_of.month - issued.dt.month)
+    return np.clip(months.to_numpy(dtype=np.float64, na_value=0.0), 0, None)
+
+
+def _realised(df: pd.DataFrame) -> pd.DataFrame:
+    """Số liệu thực tế của các khoản đã kết thúc, theo trạng thái."""
+    columns = ['loans', 'principal', 'collected']
+    if 'loan_status' not in df.columns:
+        return pd.DataFrame(columns=columns, dtype=np.float64)
+    resolved = df[df['loan_status'].isin(RESOLVED_STATUSES)]
+    grouped = resolved.groupby(resolved['loan_status'].astype(str), sort=True)
+    realised = pd.DataFrame({
+        'loans': grouped.size(),
+        'principal': grouped['loan_amount'].sum(),
+        'collected': grouped['total_payment'].sum() if 'total_payment' in df.columns else np.nan,
+    }).astype(np.float64)
+    return realised.rename_axis('loan_status')[columns]
+
+
+def project_outstanding(loans: pd.DataFrame, rates: pd.DataFrame, recovery_rate: float,
+                        chunk_rows: int = AMORTIZATION_CHUNK_ROWS) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Dòng tiền và tổn thất kỳ vọng của các khoản vay còn dư nợ, cho từng
+    khoản hoặc từng nhóm khoản vay cùng (grade, term_months, int_rate,
+    months_on_book).
+
+    Dư nợ và dòng tiền tỉ lệ thuận với gốc nên một nhóm được dự phóng như
+    một khoản vay có gốc bằng tổng gốc của nhóm (kết quả như dự phóng
+    từng khoản); vì vậy nguồn SQL chỉ cần trả về các nhóm đã GROUP BY.
+
+    Args:
+        loans: Cột 'loans' (số khoản vay), 'loan_amount' (tổng gốc),
+            'int_rate', 'term_months', 'months_on_book' và 'grade' (tuỳ chọn)
+
+    Returns:
+        Tuple (monthly, by_grade), xem portfolio_projection
+    """
+    if 'grade' in loans.columns:
+        codes, grades = pd.factorize(loans['grade'], sort=True)
+        grades = list(grades)
+    else:
+        codes, grades = np.zeros(len(loans), dtype=np.intp), []
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(grades), codes)
+        grades.append('Unknown')
+    if not grades:
+        grades = ['All']
+
+    count = loans['loans'].to_numpy(dtype=np.float64)
+    principal = loans['loan_amount'].to_numpy(dtype=np.float64, na_value=np.nan)
+    annual_rate = loans['int_rate'].to_numpy(dtype=np.float64, na_value=np.nan)
+    term = loans['term_months'].to_numpy(dtype=np.float64, na_value=np.nan)
+    # Khoản quá hạn cuối mà vẫn Current: giữ kỳ cuối cùng
+    age = np.minimum(loans['months_on_book'].to_numpy(dtype=np.float64), np.maximum(term - 1, 0))
+    balance = balances(principal, annual_rate, term, age)
+    remaining = term - age
+    default_rates = rates['charge_off_rate'].reindex(grades).fillna(rates.attrs.get('overall', 0.0))
+
+    monthly = None
+    summary = []
+    for code, grade in enumerate(grades):
+        rows = np.flatnonzero(codes == code)
+        lifetime = min(float(default_rates[grade]), 1.0)
+        remaining_default = 1 - np.power(1 - lifetime, remaining[rows] / term[rows])
+        flows = expected_cash_flows(balance[rows], annual_rate[rows], remaining[rows],
+                                    remaining_default, recovery_rate, chunk_rows)
+        monthly = flows if monthly is None else monthly.add(flows, fill_value=0.0)
+        summary.append({
+            'grade': grade,
+            'loans': count[rows].sum(),
+            'balance': np.nansum(balance[rows]),
+            'charge_off_rate': default_rates[grade],
+            'projected_interest': flows['interest'].sum(),
+            'projected_loss': flows['loss'].sum(),
+        })
+
+    by_grade = pd.DataFrame(summary).set_index('grade')
+    by_grade = by_grade[by_grade['loans'] > 0]
+    by_grade['loss_pct'] = (by_grade['projected_loss'] / by_grade['balance']).fillna(0.0) * 100
+    return monthly, by_grade
+
+
+@profiled()
+def portfolio_projection(df: pd.DataFrame, rates: pd.DataFrame, recovery_rate: float,
+                         as_of: Optional[pd.Timestamp] = None,
+                         chunk_rows: int = AMORTIZATION_CHUNK_ROWS) -> Dict[str, Any]:
+    """
+    Dòng tiền và tổn thất kỳ vọng theo tháng, sau ngày `as_of`, của các
+    khoản vay còn dư nợ (Current) trong df.
+
+    Khoản vay đã trả m tháng (issue_date tới as_of) được giả định trả đúng
+    lịch: dư nợ hiện tại là B_m và phần còn lại của lịch là annuity của B_m
+    trên n - m tháng. Xác suất vỡ nợ trong phần kỳ hạn còn lại là
+    1 - (1 - p)^((n - m) / n), với p là tỉ lệ charge-off của grade (grade
+    lạ dùng tỉ lệ chung), tức cùng hazard tháng như một khoản vay mới.
+    Khoản Fully Paid / Charged Off không được dự phóng mà chỉ tổng hợp
+    riêng; df không có cột loan_status thì mọi khoản vay được dự phóng.
+
+    Args:
+        as_of: Ngày chốt số liệu (mặc định: projection_as_of(df))
+
+    Returns:
+        Dict 'monthly' (DataFrame theo tháng sau as_of, xem
+        expected_cash_flows), 'by_grade' (số khoản vay, dư nợ, tỉ lệ
+        charge-off, lãi và tổn thất dự phóng trên kỳ hạn còn lại),
+        'realised' (theo trạng thái: số khoản vay, gốc, đã thu) và 'as_of'
+    """
+    if as_of is None:
+        as_of = projection_as_of(df)
+    outstanding = df
+    if 'loan_status' in df.columns:
+        outstanding = df[(df['loan_status'] == OUTSTANDING_STATUS).to_numpy()]
+
+    loans = pd.DataFrame({
+        'loans': np.ones(len(outstanding)),
+        'loan_amount': outstanding['loan_amount'].to_numpy(),
+        'int_rate': outstanding['int_rate'].to_numpy(),
+        'term_months': outstanding['term_months'].to_numpy(),
+        'months_on_book': months_on_book(outstanding, as_of),
+    })
+    if 'grade' in outstanding.columns:
+        loans['grade'] = outstanding['grade'].to_numpy()
+    monthly, by_grade = project_outstanding(loans, rates, recovery_rate, chunk_rows)
+    return {'monthly': monthly, 'by_grade': by_grade, 'realised': _realised(df), 'as_of': as_of}
+
+
+def get_portfolio_projection(filtered_df: pd.DataFrame, rates: pd.DataFrame, recovery_rate: float,
+                             as_of: Optional[pd.Timestamp] = None, source=None) -> Dict[str, Any]:
+    """
+    portfolio_projection của tập lọc, memo trong cache kết quả lọc theo view
+    fingerprint (cùng recovery rate và ngày chốt).
+
+    Với data source SQL, filtered_df chỉ là mẫu dòng: dự phóng được tính
+    từ các nhóm (grade, term, rate, months on book) và số liệu thực tế mà
+    `source` tổng hợp bằng GROUP BY trên toàn bộ tập lọc, nên khớp với
+    nguồn CSV và không đổi theo mẫu.
+    """
+    key = f"{dataset_fingerprint(filtered_df)}:projection:{recovery_rate:.4f}:{as_of}"
+    filters = filtered_df.attrs.get('source_filters')
+    if source is None or filters is None:
+        return get_filter_cache().get_or_compute(
+            key, lambda: portfolio_projection(filtered_df, rates, recovery_rate, as_of)
+        )
+
+    def compute() -> Dict[str, Any]:
+        aggregates = source.projection_aggregates(filters, as_of)
+        monthly, by_grade = project_outstanding(aggregates['outstanding'], rates, recovery_rate)
+        return {'monthly': monthly, 'by_grade': by_grade, 'realised': aggregates['realised'], 'as_of': as_of}
+
+    return get_filter_cache().get_or_compute(key, compute)
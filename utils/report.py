@@ -0,0 +1,226 @@
+"""
+Report tĩnh của dashboard không lọc: KPI + các biểu đồ, tính một lần cho
+mỗi dataset rồi ghi ra bundle JSON (app đọc lại) và HTML (chỉ từ CLI).
+
+Usage:
+    python -m utils.report -i financial_loan_clean.csv -o reports
+"""
+
+import argparse
+import html
+import json
+import os
+import sys
+import time
+from typing import Dict, Any, Optional
+
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from config.settings import REPORT_DIR
+from utils.data_loader import dataset_fingerprint
+from utils.helpers import compute_kpis
+
+
+REPORT_JSON = 'report.json'
+REPORT_HTML = 'report.html'
+
+# Tăng khi đổi nội dung/định dạng report để bundle cũ trên đĩa bị bỏ qua
+REPORT_VERSION = 2
+
+
+def build_report(df: pd.DataFrame, view: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+    """
+    Tính KPI và mọi biểu đồ của Dashboard cho toàn bộ df (không filter).
+
+    Args:
+        view: Kết quả apply_filters không loại dòng nào (trong app); khi có,
+            KPI lấy từ cache kết quả lọc và biểu đồ được dựng qua
+            cached_figure theo view fingerprint như Dashboard, nên figure đã
+            có trong FigureCache không phải dựng lại
+
+    Returns:
+        Dict gồm 'version', 'fingerprint', 'generated_at', 'rows', 'kpis' và
+        'figures' (tên biểu đồ như trong Dashboard -> go.Figure)
+    """
+    from charts import (
+        create_grade_distribution_chart, create_status_pie_chart, create_purpose_chart,
+        create_region_map, create_interest_rate_histogram, create_scatter_plot
+    )
+    from charts.figure_cache import cached_figure
+    from utils.cube import get_cube, get_view_histogram
+    from utils.filter_engine import get_filter_options, get_view_kpis
+
+    source = df if view is None else view
+    cube = None
+
+    def report_cube():
+        nonlocal cube
+        if cube is None:
+            cube = get_cube(df)
+        return cube
+
+    rate_range = get_filter_options(df)['rate_range']
+    builders = {
+        'grade_distribution': lambda: create_grade_distribution_chart(source, report_cube()),
+        'status_pie': lambda: create_status_pie_chart(source, report_cube()),
+        'purpose': lambda: create_purpose_chart(source, report_cube()),
+        'region': lambda: create_region_map(source, report_cube()),
+        'interest_rate_histogram': lambda: create_interest_rate_histogram(
+            source, rate_range, get_view_histogram(df, source)
+        ),
+        'scatter': lambda: create_scatter_plot(source),
+    }
+    if view is None:
+        figures = {name: build() for name, build in builders.items()}
+    else:
+        key = dataset_fingerprint(view)
+        figures = {name: cached_figure(name, key, build) for name, build in builders.items()}
+    return {
+        'version': REPORT_VERSION,
+        'fingerprint': dataset_fingerprint(df),
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'rows': len(df),
+        'kpis': compute_kpis(df) if view is None else get_view_kpis(view),
+        'figures': figures,
+    }
+
+
+def is_current(report: Optional[Dict[str, Any]], fingerprint: str) -> bool:
+    """Bundle đã đọc có khớp dataset và phiên bản report hiện tại không."""
+    return (report is not None and report.get('version') == REPORT_VERSION
+            and report.get('fingerprint') == fingerprint)
+
+
+def _kpi_cards(kpis: Dict[str, Any]) -> str:
+    def value(key: str, fmt: str, scale: float = 1) -> str:
+        return fmt.format(kpis[key] * scale) if kpis.get(key) is not None else 'N/A'
+
+    cards = [
+        ("Total Loan Volume", value('total_volume', "${:.1f}M", 1e-6), f"{kpis['count']:,} loans"),
+        ("Avg Interest Rate", value('avg_int_rate', "{:.2f}%", 100), "DTI: " + value('avg_dti', "{:.2f}")),
+        ("Risk Rate", value('risk_rate', "{:.2f}%"), value('risk_count', "{:,} charged off")),
+        ("Avg Loan Amount", value('avg_loan', "${:,.0f}"), "Max: " + value('max_loan', "${:,.0f}")),
+    ]
+    return ''.join(
+        f'<div class="kpi"><p>{html.escape(label)}</p><h2>{html.escape(v)}</h2><p>{html.escape(d)}</p></div>'
+        for label, v, d in cards
+    )
+
+
+def write_report_json(report: Dict[str, Any], out_dir: str = REPORT_DIR) -> None:
+    """
+    Ghi report.json (KPI + figure JSON), mỗi figure chỉ serialize một lần.
+
+    Ghi ra file tạm rồi os.replace để process khác không đọc phải file ghi dở.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    payload = json.dumps({key: value for key, value in report.items() if key != 'figures'})
+    figures = ', '.join(f'{json.dumps(name)}: {fig.to_json()}' for name, fig in report['figures'].items())
+
+    json_path = os.path.join(out_dir, REPORT_JSON)
+    tmp_path = f"{json_path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(f'{payload[:-1]}, "figures": {{{figures}}}}}')
+    os.replace(tmp_path, json_path)
+
+
+def write_report_html(report: Dict[str, Any], out_dir: str = REPORT_DIR, offline: bool = False) -> None:
+    """
+    Ghi report.html độc lập (chỉ CLI dùng; app chỉ đọc report.json).
+
+    Args:
+        offline: Nhúng plotly.js vào HTML thay vì tải từ CDN
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    charts = []
+    for i, fig in enumerate(report['figures'].values()):
+        include = ('cdn' if not offline else True) if i == 0 else False
+        charts.append(f'<div class="chart">{pio.to_html(fig, full_html=False, include_plotlyjs=include)}</div>')
+    page = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Financial Analytics Dashboard</title>
+<style>
+body {{ font-family: sans-serif; margin: 24px; }}
+.kpis {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 16px; }}
+.kpi {{ background: #f8f9fa; border-radius: 10px; padding: 12px 16px; }}
+.kpi h2 {{ margin: 4px 0; }}
+.charts {{ display: grid; grid-template-columns: repeat(2, 1fr); gap: 16px; margin-top: 24px; }}
+</style></head><body>
+<h1>Financial Analytics Dashboard</h1>
+<p>{report['rows']:,} loans · generated {html.escape(report['generated_at'])} · dataset {report['fingerprint'][:12]}</p>
+<div class="kpis">{_kpi_cards(report['kpis'])}</div>
+<div class="charts">{''.join(charts)}</div>
+</body></html>
+"""
+    with open(os.path.join(out_dir, REPORT_HTML), 'w', encoding='utf-8') as f:
+        f.write(page)
+
+
+def read_report(out_dir: str = REPORT_DIR) -> Optional[Dict[str, Any]]:
+    """Đọc bundle đã ghi (figure được dựng lại thành go.Figure), None nếu chưa có hoặc lỗi."""
+    try:
+        with open(os.path.join(out_dir, REPORT_JSON), encoding='utf-8') as f:
+            report = json.load(f)
+        report['figures'] = {name: go.Figure(fig) for name, fig in report['figures'].items()}
+        return report
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+@st.cache_resource(max_entries=2)
+def _load_report(fingerprint: str, _df: pd.DataFrame, _view: pd.DataFrame, out_dir: str) -> Dict[str, Any]:
+    """
+    Bundle của dataset: đọc từ đĩa nếu khớp fingerprint và phiên bản; nếu
+    không thì dựng (qua FigureCache) và ghi lại report.json.
+    """
+    report = read_report(out_dir)
+    if is_current(report, fingerprint):
+        return report
+    report = build_report(_df, _view)
+    try:
+        write_report_json(report, out_dir)
+    except OSError:
+        pass
+    return report
+
+
+def get_report(df: pd.DataFrame, view: pd.DataFrame, out_dir: str = REPORT_DIR) -> Dict[str, Any]:
+    """
+    Report của dataset chưa lọc, dùng chung cho mọi session.
+
+    `view` là kết quả apply_filters không loại dòng nào. Chỉ được dựng lại
+    khi fingerprint dataset thay đổi (kể cả giữa các process, nhờ bundle
+    trên đĩa).
+    """
+    return _load_report(dataset_fingerprint(df), df, view, out_dir)
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Entry point CLI."""
+    parser = argparse.ArgumentParser(description="Render the unfiltered dashboard to a static HTML/JSON bundle")
+    parser.add_argument('-i', '--input', default='financial_loan_clean.csv', help="Source CSV file")
+    parser.add_argument('-o', '--output', default=REPORT_DIR, help="Bundle directory")
+    parser.add_argument('--offline', action='store_true', help="Embed plotly.js in the HTML")
+    parser.add_argument('--force', action='store_true', help="Rebuild even if the bundle is up to date")
+    args = parser.parse_args(argv)
+
+    from utils.data_loader import load_data_uncached
+
+    started = time.perf_counter()
+    df = load_data_uncached(args.input)
+    if not args.force and is_current(read_report(args.output), dataset_fingerprint(df)):
+        print(f"Report is up to date ({args.output})")
+        return 0
+
+    report = build_report(df)
+    write_report_json(report, args.output)
+    write_report_html(report, args.output, args.offline)
+    elapsed = time.perf_counter() - started
+    print(f"Rendered report for {len(df):,} loans in {elapsed:.2f}s -> {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
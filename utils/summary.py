@@ -0,0 +1,321 @@
+"""
+Summary engine: thống kê kiểu describe() từ các sketch gộp được theo ô.
+"""
+
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+from utils.cube import bin_bounds, bin_codes, bin_grid, bin_mask
+from utils.data_loader import dataset_fingerprint, parent_frame
+from utils.filter_engine import CATEGORY_FILTERS, RANGE_DEFAULTS, RANGE_FILTERS, get_filter_cache
+from utils.profiling import profiled
+
+
+# Số bin tối đa của sketch quantile mỗi cột
+SKETCH_BINS = 512
+
+SUMMARY_STATS = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+SUMMARY_QUANTILES = (0.25, 0.5, 0.75)
+
+
+class ColumnSketch:
+    """
+    Sketch gộp được của một cột số cho từng ô (cell).
+
+    Mỗi ô lưu count, sum, M2 (tổng bình phương độ lệch so với mean của ô),
+    min, max và số dòng rơi vào từng bin của một bộ biên chung cho cả cột
+    (dạng thưa: chỉ các cặp ô × bin có dòng, nên bộ nhớ không vượt số
+    dòng dù có nhiều ô). Gộp nhiều ô chỉ là cộng mảng (M2 gộp theo công
+    thức Chan), nên mean/std/min/max luôn chính xác.
+
+    Biên bin là các quantile của toàn cột; nếu cột có không quá
+    SKETCH_BINS giá trị phân biệt thì mỗi giá trị là một bin và quantile
+    cũng chính xác. Ngược lại quantile được nội suy trong bin, sai số
+    không vượt quá độ rộng một bin.
+    """
+
+    def __init__(self, values: np.ndarray, cell_ids: np.ndarray, n_cells: int,
+                 edges: Optional[np.ndarray] = None, exact: Optional[bool] = None):
+        valid = ~np.isnan(values)
+        x, cells = values[valid], cell_ids[valid]
+
+        self.count = np.bincount(cells, minlength=n_cells).astype(np.int64)
+        self.sum = np.bincount(cells, weights=x, minlength=n_cells)
+        cell_mean = np.divide(self.sum, self.count, out=np.zeros(n_cells), where=self.count > 0)
+        self.m2 = np.bincount(cells, weights=(x - cell_mean[cells]) ** 2, minlength=n_cells)
+        self.min = np.full(n_cells, np.inf)
+        self.max = np.full(n_cells, -np.inf)
+        np.minimum.at(self.min, cells, x)
+        np.maximum.at(self.max, cells, x)
+
+        if edges is not None:
+            # Dùng lại biên của một sketch khác để hai sketch gộp được
+            self.edges, self.exact = edges, exact
+        else:
+            uniques = np.unique(x)
+            self.exact = len(uniques) <= SKETCH_BINS
+            if self.exact:
+                self.edges = uniques
+            else:
+                self.edges = np.unique(np.quantile(x, np.linspace(0, 1, SKETCH_BINS + 1)))
+        self.n_bins = max(len(self.edges) - (0 if self.exact else 1), 1)
+        bins = np.clip(np.searchsorted(self.edges, x, side='right') - 1, 0, self.n_bins - 1)
+        self._set_bins(*np.unique(cells.astype(np.int64) * self.n_bins + bins, return_counts=True))
+
+    def _set_bins(self, keys: np.ndarray, counts: np.ndarray) -> None:
+        """Lưu số đếm thưa theo khoá ô * n_bins + bin."""
+        self.bin_cells = (keys // self.n_bins).astype(np.int32)
+        self.bin_index = (keys % self.n_bins).astype(np.int16)
+        self.bin_counts = counts.astype(np.int32)
+
+    def extended(self, values: np.ndarray, cell_ids: np.ndarray, n_cells: int) -> Optional['ColumnSketch']:
+        """
+        Sketch mới sau khi thêm các dòng `values` (với ô tương ứng).
+
+        Returns:
+            Sketch đã gộp, hoặc None nếu sketch chính xác gặp giá trị mới
+            chưa có trong biên (khi đó cần dựng lại từ đầu)
+        """
+        if self.exact and not np.isin(values[~np.isnan(values)], self.edges).all():
+            return None
+        added = ColumnSketch(values, cell_ids, n_cells, self.edges, self.exact)
+
+        pad = n_cells - len(self.count)
+        count = np.pad(self.count, (0, pad))
+        total = np.pad(self.sum, (0, pad))
+        m2 = np.pad(self.m2, (0, pad))
+
+        # Gộp M2 theo Chan: M2 = M2_a + M2_b + delta^2 * n_a * n_b / n
+        merged_count = count + added.count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = np.where(added.count > 0, added.sum / added.count, 0) - \
+                np.where(count > 0, total / count, 0)
+            correction = np.where(merged_count > 0, delta ** 2 * count * added.count / merged_count, 0)
+        added.m2 = m2 + added.m2 + np.where((count > 0) & (added.count > 0), correction, 0)
+        added.count = merged_count
+        added.sum = total + added.sum
+        added.min = np.minimum(np.pad(self.min, (0, pad), constant_values=np.inf), added.min)
+        added.max = np.maximum(np.pad(self.max, (0, pad), constant_values=-np.inf), added.max)
+        keys = np.concatenate([self.bin_cells.astype(np.int64) * self.n_bins + self.bin_index,
+                               added.bin_cells.astype(np.int64) * self.n_bins + added.bin_index])
+        keys, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate([self.bin_counts, added.bin_counts]))
+        added._set_bins(keys, counts)
+        return added
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.count, self.sum, self.m2, self.min, self.max, self.edges,
+                  self.bin_cells, self.bin_index, self.bin_counts)
+        return sum(a.nbytes for a in arrays)
+
+    def _value_at_rank(self, cumulative: np.ndarray, counts: np.ndarray, rank: int,
+                       low: float, high: float) -> float:
+        b = int(np.searchsorted(cumulative, rank, side='right'))
+        if self.exact:
+            return float(self.edges[b])
+        before = cumulative[b - 1] if b > 0 else 0
+        left, right = self.edges[b], self.edges[b + 1]
+        value = left + (right - left) * (rank - before + 0.5) / counts[b]
+        return float(min(max(value, low), high))
+
+    def describe(self, cells: np.ndarray) -> Dict[str, float]:
+        """Thống kê kiểu describe() sau khi gộp các ô được chọn (mask)."""
+        count = self.count[cells]
+        n = int(count.sum())
+        if n == 0:
+            return {stat: (0 if stat == 'count' else np.nan) for stat in SUMMARY_STATS}
+
+        total = self.sum[cells].sum()
+        mean = total / n
+        cell_means = np.divide(self.sum[cells], count, out=np.zeros(len(count)), where=count > 0)
+        m2 = self.m2[cells].sum() + (count * (cell_means - mean) ** 2).sum()
+        low, high = float(self.min[cells].min()), float(self.max[cells].max())
+
+        selected = cells[self.bin_cells]
+        counts = np.bincount(self.bin_index[selected], weights=self.bin_counts[selected],
+                             minlength=self.n_bins).astype(np.int64)
+        cumulative = np.cumsum(counts)
+        result = {
+            'count': n, 'mean': mean, 'std': np.sqrt(m2 / (n - 1)) if n > 1 else np.nan,
+            'min': low, 'max': high
+        }
+        # Nội suy tuyến tính giữa hai rank lân cận, như pandas
+        for q in SUMMARY_QUANTILES:
+            position = q * (n - 1)
+            lower = self._value_at_rank(cumulative, counts, int(np.floor(position)), low, high)
+            upper = self._value_at_rank(cumulative, counts, int(np.ceil(position)), low, high)
+            result[f'{q:.0%}'] = lower + (upper - lower) * (position - np.floor(position))
+        return result
+
+
+class SummaryEngine:
+    """
+    Sketch theo ô của các chiều filter category (grade × state × region),
+    cùng chiều bin loan_amount/int_rate theo lưới slider nếu có `bins`.
+
+    Sketch của mỗi cột được dựng lần đầu cột đó được yêu cầu rồi giữ lại;
+    describe cho một tổ hợp filter (category và khoảng nằm trên lưới) chỉ
+    là gộp sketch của các ô khớp filter.
+    """
+
+    def __init__(self, df: pd.DataFrame, bins: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Args:
+            bins: cột khoảng -> (gốc, bước) của slider; mỗi cột thêm một
+                chiều '<cột>_bin' (mã bin_codes) vào ô
+        """
+        self._df = df
+        self.dimensions = [col for col in CATEGORY_FILTERS.values() if col in df.columns]
+        self.bins = {}
+        columns = {dim: df[dim].array for dim in self.dimensions}
+        for column, (origin, step) in (bins or {}).items():
+            if column in df.columns:
+                values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+                columns[f'{column}_bin'] = bin_codes(values, origin, step)
+                self.bins[column] = (origin, step, float(np.nanmin(values, initial=np.inf)),
+                                     float(np.nanmax(values, initial=-np.inf)))
+        self.keys = list(columns)
+        if self.keys:
+            grouped = pd.DataFrame(columns).groupby(self.keys, observed=True, dropna=False, sort=False)
+            self.cell_ids = grouped.ngroup().to_numpy(dtype=np.intp)
+            self.cells = grouped.size().rename('rows').reset_index()
+        else:
+            self.cell_ids = np.zeros(len(df), dtype=np.intp)
+            self.cells = pd.DataFrame({'rows': [len(df)]})
+        self._sketches: Dict[str, ColumnSketch] = {}
+        self._lock = threading.Lock()
+
+    def _cell_keys(self, df: pd.DataFrame) -> pd.MultiIndex:
+        """Khoá ô (chiều category và mã bin) của các dòng df."""
+        columns = {dim: df[dim].astype(object) for dim in self.dimensions}
+        for column, (origin, step, _, _) in self.bins.items():
+            columns[f'{column}_bin'] = bin_codes(df[column].to_numpy(dtype=np.float64, na_value=np.nan),
+                                                 origin, step)
+        return pd.MultiIndex.from_frame(pd.DataFrame(columns, index=df.index))
+
+    def extended(self, df: pd.DataFrame) -> 'SummaryEngine':
+        """
+        Engine cho `df` = dataset hiện tại + các dòng append ở cuối.
+
+        Ô mới được thêm vào sau các ô cũ; các sketch đã dựng được mở rộng
+        bằng các dòng mới, sketch chưa dựng sẽ được dựng lại khi cần. Lưới
+        bin giữ nguyên (người gọi chỉ mở rộng khi lưới của df không đổi).
+        """
+        n_old = len(self.cell_ids)
+        added = df.iloc[n_old:]
+        engine = SummaryEngine.__new__(SummaryEngine)
+        engine._df = df
+        engine.dimensions = self.dimensions
+        engine.keys = self.keys
+        engine._sketches = {}
+        engine._lock = threading.Lock()
+        engine.bins = {}
+        for column, (origin, step, low, high) in self.bins.items():
+            values = added[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            engine.bins[column] = (origin, step, min(low, float(np.nanmin(values, initial=np.inf))),
+                                   max(high, float(np.nanmax(values, initial=-np.inf))))
+
+        if self.keys:
+            keys = pd.MultiIndex.from_frame(self.cells[self.keys].astype(object))
+            added_keys = self._cell_keys(added)
+            unseen = added_keys[keys.get_indexer(added_keys) < 0].unique()
+            if len(unseen):
+                keys = keys.append(unseen)
+            added_ids = keys.get_indexer(added_keys).astype(np.intp)
+            cells = keys.to_frame(index=False)
+        else:
+            added_ids = np.zeros(len(added), dtype=np.intp)
+            cells = pd.DataFrame(index=range(1))
+        cells['rows'] = np.bincount(added_ids, minlength=len(cells)) + \
+            np.pad(self.cells['rows'].to_numpy(), (0, len(cells) - len(self.cells)))
+        engine.cells = cells
+        engine.cell_ids = np.concatenate([self.cell_ids, added_ids])
+
+        with self._lock:
+            sketches = dict(self._sketches)
+        for column, sketch in sketches.items():
+            values = added[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            merged = sketch.extended(values, added_ids, len(cells))
+            if merged is not None:
+                engine._sketches[column] = merged
+        return engine
+
+    def sketch(self, column: str) -> ColumnSketch:
+        """Sketch của một cột số (dựng một lần)."""
+        with self._lock:
+            if column not in self._sketches:
+                values = self._df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+                self._sketches[column] = ColumnSketch(values, self.cell_ids, len(self.cells))
+            return self._sketches[column]
+
+    def cell_mask(self, filters: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        Mask các ô khớp filter category (grades, states, regions) và, với
+        engine có chiều bin, filter khoảng của slider.
+
+        Returns:
+            Mask theo ô, hoặc None nếu một đầu khoảng không nằm trên lưới.
+            Engine không bin bỏ qua filter khoảng (người gọi so số dòng)
+        """
+        mask = np.ones(len(self.cells), dtype=bool)
+        for key, column in CATEGORY_FILTERS.items():
+            values = filters.get(key)
+            if values and column in self.dimensions:
+                mask &= self.cells[column].isin(list(values)).to_numpy()
+        for key, column in RANGE_FILTERS.items():
+            if column not in self.bins:
+                continue
+            bounds = bin_bounds(self.bins[column], *filters.get(key, RANGE_DEFAULTS[key]))
+            if bounds is None:
+                return None
+            mask &= bin_mask(self.cells[f'{column}_bin'].to_numpy(), bounds)
+        return mask
+
+    def describe(self, columns: List[str], cells: np.ndarray) -> pd.DataFrame:
+        """Bảng describe().T cho các cột, trên các ô được chọn."""
+        rows = {column: self.sketch(column).describe(cells) for column in columns}
+        return pd.DataFrame.from_dict(rows, orient='index', columns=SUMMARY_STATS)
+
+
+@st.cache_resource(max_entries=4)
+def _build_summary_engine(fingerprint: str, _df: pd.DataFrame, bins: Tuple = ()) -> SummaryEngine:
+    """
+    Dựng và cache SummaryEngine theo fingerprint dataset và lưới bin (mở
+    rộng engine của dataset trước khi append nếu lưới không đổi).
+    """
+    parent = parent_frame(_df)
+    if parent is not None and bin_grid(parent) == bins:
+        return _build_summary_engine(dataset_fingerprint(parent), parent, bins).extended(_df)
+    return SummaryEngine(_df, dict(bins))
+
+
+def get_summary_engine(df: pd.DataFrame) -> SummaryEngine:
+    """SummaryEngine của toàn bộ dataset, có chiều bin theo lưới slider (dựng một lần)."""
+    return _build_summary_engine(dataset_fingerprint(df), df, bin_grid(df))
+
+
+@profiled()
+def describe_view(df: pd.DataFrame, filtered_df: pd.DataFrame, columns: List[str],
+                  exact: bool = False) -> pd.DataFrame:
+    """
+    Thống kê kiểu describe().T của tập đã lọc.
+
+    Mặc định gộp từ sketch của các ô khớp filter (category và slider
+    khoảng trên lưới). Chỉ khi `exact`, hoặc lát cắt ô không khớp đúng số
+    dòng của tập lọc (khoảng lệch lưới, tập lọc không có filters), mới dùng
+    describe() trên các dòng đã lọc và memo theo view fingerprint.
+    """
+    filters: Optional[Dict[str, Any]] = filtered_df.attrs.get('filters')
+    if not exact and filters is not None:
+        engine = get_summary_engine(df)
+        cells = engine.cell_mask(filters)
+        if cells is not None and int(engine.cells['rows'].to_numpy()[cells].sum()) == len(filtered_df):
+            return engine.describe(columns, cells)
+
+    key = f"{dataset_fingerprint(filtered_df)}:describe:{','.join(columns)}"
+    return get_filter_cache().get_or_compute(key, lambda: filtered_df[columns].describe().T)
@@ -0,0 +1,173 @@
+"""
+Đọc file CSV upload từ sidebar: parse theo chunk, ép dtype theo schema của
+dataset chính, giới hạn kích thước và cache kết quả theo nội dung file.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+import streamlit as st
+import pandas as pd
+
+from config.settings import (
+    UPLOAD_MAX_MB, UPLOAD_MAX_ROWS, UPLOAD_MAX_MEMORY_MB, UPLOAD_CHUNK_ROWS, UPLOAD_SESSION_ENTRIES
+)
+from utils.data_loader import DATE_COLUMNS, compact_dtypes, memory_footprint
+from utils.helpers import create_loan_status_column
+
+
+class UploadError(ValueError):
+    """File upload không hợp lệ hoặc vượt giới hạn."""
+
+
+def hash_upload(uploaded_file, chunk_size: int = 8 << 20) -> str:
+    """Hash nội dung file upload (blake2b), không copy buffer."""
+    digest = hashlib.blake2b(digest_size=16)
+    buffer = uploaded_file.getbuffer()
+    for start in range(0, len(buffer), chunk_size):
+        digest.update(buffer[start:start + chunk_size])
+    return digest.hexdigest()
+
+
+def _coerce_chunk(chunk: pd.DataFrame, schema: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Ép một chunk về dtype của dataset chính.
+
+    Raises:
+        UploadError: nếu cột số của schema chứa giá trị không phải số
+    """
+    for col in DATE_COLUMNS:
+        if col in chunk.columns:
+            chunk[col] = pd.to_datetime(chunk[col], errors='coerce')
+
+    for col in chunk.columns:
+        dtype = schema.get(col)
+        if dtype is None or col in DATE_COLUMNS:
+            continue
+        series = chunk[col]
+        if isinstance(dtype, pd.CategoricalDtype):
+            chunk[col] = series.astype('category')
+        elif pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_numeric_dtype(series):
+            values = pd.to_numeric(series, errors='coerce')
+            invalid = values.isna() & series.notna()
+            if invalid.any():
+                raise UploadError(
+                    f"Column '{col}' must be numeric, found {series[invalid].iloc[0]!r}"
+                )
+            chunk[col] = values
+
+    # Các cột còn lại (và cột số) được nén như khi load dataset chính
+    return compact_dtypes(chunk)
+
+
+def _concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Nối các chunk đã nén; cột category được gộp categories."""
+    if len(chunks) == 1:
+        return chunks[0]
+    columns = {}
+    for col in chunks[0].columns:
+        parts = [chunk[col] for chunk in chunks]
+        if any(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            columns[col] = pd.Series(pd.api.types.union_categoricals(
+                [part.astype('category').array for part in parts], ignore_order=True
+            ))
+        else:
+            columns[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def parse_upload(uploaded_file, reference: Optional[pd.DataFrame] = None,
+                 max_rows: int = UPLOAD_MAX_ROWS, max_memory_mb: float = UPLOAD_MAX_MEMORY_MB,
+                 chunk_rows: int = UPLOAD_CHUNK_ROWS) -> pd.DataFrame:
+    """
+    Parse file CSV upload theo từng chunk.
+
+    Mỗi chunk được ép dtype theo `reference` (dataset chính) và nén ngay,
+    nên bộ nhớ tạm chỉ là một chunk dạng thô; việc đọc dừng sớm khi vượt
+    số dòng hoặc bộ nhớ cho phép.
+
+    Args:
+        uploaded_file: File object (vd. UploadedFile của Streamlit)
+        reference: DataFrame có schema chuẩn, None để tự suy dtype
+
+    Returns:
+        DataFrame đã nén dtype và có cột loan_status
+
+    Raises:
+        UploadError: nếu file rỗng, sai kiểu dữ liệu hoặc vượt giới hạn
+    """
+    schema = dict(reference.dtypes) if reference is not None else {}
+    uploaded_file.seek(0)
+
+    chunks, rows, before, after = [], 0, 0, 0
+    try:
+        reader = pd.read_csv(uploaded_file, chunksize=chunk_rows)
+        for chunk in reader:
+            rows += len(chunk)
+            if rows > max_rows:
+                raise UploadError(f"File has more than {max_rows:,} rows")
+            if chunks and list(chunk.columns) != list(chunks[0].columns):
+                raise UploadError("Inconsistent columns in file")
+            before += memory_footprint(chunk)
+            chunk = _coerce_chunk(chunk, schema)
+            after += memory_footprint(chunk)
+            if after > max_memory_mb * 1024 * 1024:
+                raise UploadError(f"Parsed data exceeds {max_memory_mb:,.0f} MB")
+            chunks.append(chunk)
+    except pd.errors.EmptyDataError:
+        raise UploadError("File is empty")
+    except pd.errors.ParserError as e:
+        raise UploadError(f"Invalid CSV: {e}")
+    finally:
+        uploaded_file.seek(0)
+
+    if not chunks:
+        raise UploadError("File has no rows")
+
+    df = compact_dtypes(_concat_chunks(chunks))
+    df.attrs['memory'] = {'before': before, 'after': memory_footprint(df)}
+    return create_loan_status_column(df)
+
+
+def load_upload(uploaded_file, reference: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    DataFrame của file upload, cache trong session theo hash nội dung.
+
+    File đã parse (theo file_id của widget) không bị hash hay parse lại ở
+    các lần rerun; file lỗi cũng được nhớ để không parse lại. Fingerprint
+    của DataFrame là hash nội dung nên các cache dùng chung (filter, cube)
+    nhận ra cùng một file dù upload lại.
+
+    Raises:
+        UploadError: như parse_upload
+    """
+    if uploaded_file.size > UPLOAD_MAX_MB * 1024 * 1024:
+        raise UploadError(f"File is larger than {UPLOAD_MAX_MB} MB")
+
+    hashes: Dict[str, str] = st.session_state.setdefault('upload_hashes', {})
+    cache: OrderedDict = st.session_state.setdefault('upload_cache', OrderedDict())
+
+    file_id = getattr(uploaded_file, 'file_id', None)
+    content_hash = hashes.get(file_id) if file_id is not None else None
+    if content_hash is None:
+        content_hash = hash_upload(uploaded_file)
+        if file_id is not None:
+            hashes[file_id] = content_hash
+
+    if content_hash in cache:
+        cache.move_to_end(content_hash)
+    else:
+        try:
+            result = parse_upload(uploaded_file, reference)
+            result.attrs['fingerprint'] = f"upload-{content_hash}"
+        except UploadError as e:
+            result = e
+        cache[content_hash] = result
+        while len(cache) > UPLOAD_SESSION_ENTRIES:
+            cache.popitem(last=False)
+
+    result = cache[content_hash]
+    if isinstance(result, UploadError):
+        raise result
+    return result